@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import random
+from typing import Any, Iterator
+
+from lightparse.utils.lexicon import food_index, meal_rules, symptom_index
+
+
+_QUANTITIES = ["1", "2", "3", "half", "1/2", "1.5"]
+_UNITS = ["", "", "cup", "bowl", "plate", "slice", "piece"]
+_EN_MEAL_LEADS = ["had {foods} for {meal}", "{meal}: {foods}", "ate {foods}", "{foods} at my favorite restaurant"]
+_HI_MEAL_LEADS = ["aaj {meal} mein {foods}", "{meal} mein {foods} khaya", "aaj {meal} {foods}"]
+_SKIPS = ["skipped {meal}", "{meal} skip kiya"]
+_SYMPTOM_LEADS = ["{symptom}", "felt {symptom}", "some {symptom}", "bit of {symptom}"]
+_NEGATED = ["no {symptom}", "not {symptom}", "without {symptom}", "{symptom} not today"]
+_TIMES = ["", "", "in the morning", "by evening", "at night", "after lunch", "subah", "raat ko", "post workout"]
+_NOISE = ["bp 120/80", "steps 8000", "weight 72", "mood a bit low", "slept ok 😴", "work was busy"]
+_JOINERS = [" + ", " & ", ", ", " and "]
+
+
+def _food_phrase(rng: random.Random, foods: list[str]) -> str:
+    food = rng.choice(foods)
+    style = rng.random()
+    if style < 0.4:
+        unit = rng.choice(_UNITS)
+        return " ".join(p for p in (rng.choice(_QUANTITIES), unit, food) if p)
+    if style < 0.55:
+        return f"{food} ({rng.randint(1, 3)} {rng.choice(['cup', 'bowl', 'plate'])})"
+    return food
+
+
+def _sentence(rng: random.Random, foods: list[str], symptoms: list[str], meals: list[str]) -> str:
+    kind = rng.random()
+    if kind < 0.45:
+        items = _JOINERS[rng.randrange(len(_JOINERS))].join(_food_phrase(rng, foods) for _ in range(rng.randint(1, 3)))
+        leads = _HI_MEAL_LEADS if rng.random() < 0.4 else _EN_MEAL_LEADS
+        return rng.choice(leads).format(foods=items, meal=rng.choice(meals))
+    if kind < 0.8:
+        template = rng.choice(_NEGATED) if rng.random() < 0.3 else rng.choice(_SYMPTOM_LEADS)
+        out = template.format(symptom=rng.choice(symptoms))
+        if rng.random() < 0.35:
+            out += f" {rng.randint(1, 10)}/10"
+        time = rng.choice(_TIMES)
+        return f"{out} {time}" if time else out
+    if kind < 0.88:
+        return rng.choice(_SKIPS).format(meal=rng.choice(meals[:3]))
+    return rng.choice(_NOISE)
+
+
+def generate_corpus(n: int, seed: int = 0) -> Iterator[dict[str, Any]]:
+    """Yield `n` deterministic synthetic journal entries.
+
+    Vocabulary comes from the parsers' own lexicons, mixed with English and
+    Hinglish templates, quantities, severities, time hints and negations.
+    """
+
+    rng = random.Random(seed)
+    foods = list(food_index())
+    meals = list(meal_rules()["keywords"])
+    symptoms = list(symptom_index())
+
+    for i in range(n):
+        sentences = [_sentence(rng, foods, symptoms, meals) for _ in range(rng.randint(1, 4))]
+        text = ". ".join(sentences)
+        if rng.random() < 0.5:
+            text = text.capitalize() + "."
+        yield {"entry_id": f"bench_{i:06d}", "text": text}
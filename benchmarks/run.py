@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from benchmarks.corpus import generate_corpus
+from lightparse.cli import measure_startup
+from lightparse.parsers import food
+from lightparse.parsers.food import FoodParser
+from lightparse.parsers.symptom import SymptomParser
+from lightparse.pipeline.light_pipeline import LightParsePipeline
+
+
+_SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def _summarize(latencies: list[float], total: float) -> dict[str, float]:
+    latencies.sort()
+    n = len(latencies)
+    return {
+        "entries": n,
+        "total_s": round(total, 6),
+        "entries_per_s": round(n / total, 1) if total > 0 else 0.0,
+        "p50_us": round(_percentile(latencies, 50) * 1e6, 2),
+        "p99_us": round(_percentile(latencies, 99) * 1e6, 2),
+        "max_us": round(latencies[-1] * 1e6, 2) if latencies else 0.0,
+    }
+
+
+def bench_per_entry(func: Callable[[Any], Any], items: Iterable[Any], repeat: int = 1) -> dict[str, float]:
+    """Time `func` on each item, `repeat` passes; report throughput and latency percentiles."""
+
+    items = list(items)
+    latencies: list[float] = []
+    clock = time.perf_counter
+    started = clock()
+    for _ in range(repeat):
+        for item in items:
+            t0 = clock()
+            func(item)
+            latencies.append(clock() - t0)
+    return _summarize(latencies, clock() - started)
+
+
+def bench_cli(entries: list[dict[str, Any]], workers: int = 1) -> dict[str, float]:
+    """Run the `light_parse` CLI end to end in a fresh interpreter."""
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "in.jsonl"
+        out = Path(tmp) / "out.jsonl"
+        with src.open("w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(p for p in (str(_SRC_DIR), env.get("PYTHONPATH")) if p)
+        cmd = [sys.executable, "-m", "lightparse.cli", "--in", str(src), "--out", str(out), "--workers", str(workers)]
+
+        started = time.perf_counter()
+        subprocess.run(cmd, env=env, check=True, stderr=subprocess.DEVNULL)
+        total = time.perf_counter() - started
+
+    n = len(entries)
+    return {
+        "entries": n,
+        "workers": workers,
+        "total_s": round(total, 6),
+        "entries_per_s": round(n / total, 1) if total > 0 else 0.0,
+    }
+
+
+def meal_rules_per_pattern(lowered: str) -> tuple[str, list[str]]:
+    """The meal rules applied one pattern at a time, as before the merged scanner.
+
+    Kept as the reference `food._scan_meal_rules` is measured and checked against.
+    """
+
+    rules = food._meal_rules()
+    meal = "unknown"
+    for candidate, kws in rules.keywords.items():
+        if any(re.search(rf"\b{re.escape(kw)}\b", lowered) for kw in kws):
+            meal = candidate
+            break
+    else:
+        for candidate, pat in rules.hinglish:
+            if pat.search(lowered):
+                meal = candidate
+                break
+    return meal, [m for m, pat in rules.skipped if pat.search(lowered)]
+
+
+def run_benchmarks(
+    n: int,
+    seed: int,
+    repeat: int,
+    cli_workers: list[int],
+    startup_runs: int = 0,
+) -> dict[str, Any]:
+    entries = list(generate_corpus(n, seed=seed))
+    texts = [e["text"] for e in entries]
+    lowered = [t.lower() for t in texts]
+
+    # Warm up lazily built state so the first measured call isn't an outlier.
+    for entry in entries[:50]:
+        LightParsePipeline().run(entry)
+
+    pipeline = LightParsePipeline(parser_version="v1")
+    results: dict[str, Any] = {
+        "food_parser": bench_per_entry(FoodParser.parse, texts, repeat),
+        "symptom_parser": bench_per_entry(SymptomParser.parse, texts, repeat),
+        "pipeline_run": bench_per_entry(pipeline.run, entries, repeat),
+        # Microbenchmark of the meal rules alone: merged scanner vs one search per pattern.
+        "meal_rules": bench_per_entry(food._scan_meal_rules, lowered, repeat),
+        "meal_rules_per_pattern": bench_per_entry(meal_rules_per_pattern, lowered, repeat),
+    }
+    for workers in cli_workers:
+        results[f"cli_workers_{workers}"] = bench_cli(entries, workers)
+    if startup_runs:
+        results["cli_startup"] = measure_startup(startup_runs)
+
+    return {
+        "meta": {
+            "corpus_size": n,
+            "seed": seed,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Return a line per benchmark that regressed by more than `tolerance` against baseline.
+
+    Throughput rows regress when entries/s drops; the startup row regresses
+    when time to first output grows.
+    """
+
+    regressions = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        if base.get("first_output_p50_ms") and "first_output_p50_ms" in cur:
+            ratio = cur["first_output_p50_ms"] / base["first_output_p50_ms"]
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    f"{name}: {cur['first_output_p50_ms']} vs {base['first_output_p50_ms']} ms to first output ({ratio:.0%})"
+                )
+            continue
+        if not base.get("entries_per_s"):
+            continue
+        ratio = cur["entries_per_s"] / base["entries_per_s"]
+        if ratio < 1 - tolerance:
+            regressions.append(f"{name}: {cur['entries_per_s']} vs {base['entries_per_s']} entries/s ({ratio:.0%})")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="benchmarks.run")
+    parser.add_argument("--entries", type=int, default=5000, help="synthetic corpus size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the corpus for per-entry benchmarks")
+    parser.add_argument("--cli-workers", default="1,4", help="comma-separated worker counts for the CLI run ('' to skip)")
+    parser.add_argument("--startup-runs", type=int, default=5, help="fresh CLI processes timed for startup (0 to skip)")
+    parser.add_argument("--out", default=None, help="write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="previous results JSON to compare throughput against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed throughput drop vs baseline")
+    args = parser.parse_args(argv)
+
+    cli_workers = [int(w) for w in args.cli_workers.split(",") if w.strip()]
+    report = run_benchmarks(args.entries, args.seed, args.repeat, cli_workers, args.startup_runs)
+
+    payload = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(payload + "\n", encoding="utf-8")
+    else:
+        print(payload)
+
+    for name, row in report["results"].items():
+        if "first_output_p50_ms" in row:
+            print(f"{name}: first output p50 {row['first_output_p50_ms']}ms", file=sys.stderr)
+            continue
+        latency = f", p50 {row['p50_us']}us, p99 {row['p99_us']}us" if "p50_us" in row else ""
+        print(f"{name}: {row['entries_per_s']} entries/s{latency}", file=sys.stderr)
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"regression: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -63,4 +63,16 @@ USE_TZ = True
 STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# "jsonl" (append-only log) or "sqlite" (indexed tables; point LIGHTPARSE_STORE_PATH
+# at a .sqlite3 file and fill it with `manage.py migrate_store_to_sqlite`).
+LIGHTPARSE_STORE_BACKEND = "jsonl"
 LIGHTPARSE_STORE_PATH = str((BASE_DIR.parent / "data" / "parsed_store.jsonl").resolve())
+LIGHTPARSE_PAGE_SIZE = 50
+LIGHTPARSE_UPLOAD_BATCH_SIZE = 1000
+
+# POST /api/parse: entries per pipeline batch, how long to wait for a batch to
+# fill, queued entries before requests get a 503, and entries per request.
+LIGHTPARSE_API_MAX_BATCH = 64
+LIGHTPARSE_API_MAX_WAIT_MS = 5
+LIGHTPARSE_API_QUEUE_SIZE = 4096
+LIGHTPARSE_API_MAX_ENTRIES = 1000
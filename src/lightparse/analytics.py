@@ -0,0 +1,419 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from itertools import product
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Iterable, Optional
+
+from lightparse.store import StoredEntry, backend_for_path, jsonl
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is the optional "analytics" extra
+    np = None  # type: ignore[assignment]
+
+
+_ItemSet = tuple[tuple[str, ...], tuple[str, ...]]
+
+
+@dataclass(frozen=True)
+class Association:
+    food: str
+    symptom: str
+    count: int
+    food_count: int
+    symptom_count: int
+    entries: int
+
+    @property
+    def p_symptom_given_food(self) -> float:
+        return self.count / self.food_count
+
+    @property
+    def p_food_given_symptom(self) -> float:
+        return self.count / self.symptom_count
+
+    @property
+    def lift(self) -> float:
+        """P(food and symptom) / (P(food) P(symptom)); above 1 means they co-occur more than chance."""
+
+        return self.count * self.entries / (self.food_count * self.symptom_count)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "p_symptom_given_food": round(self.p_symptom_given_food, 6),
+            "p_food_given_symptom": round(self.p_food_given_symptom, 6),
+            "lift": round(self.lift, 6),
+        }
+
+
+class _PairCounts:
+    """Food, symptom and pair counts in `Counter`s, updated one row at a time."""
+
+    def __init__(self) -> None:
+        self.food_counts: Counter[str] = Counter()
+        self.symptom_counts: Counter[str] = Counter()
+        self.pair_counts: Counter[tuple[str, str]] = Counter()
+
+    def apply(self, items: _ItemSet, sign: int) -> None:
+        foods, symptoms = items
+        food_counts, symptom_counts, pair_counts = self.food_counts, self.symptom_counts, self.pair_counts
+        for f in foods:
+            food_counts[f] += sign
+        for s in symptoms:
+            symptom_counts[s] += sign
+        for pair in product(foods, symptoms):
+            pair_counts[pair] += sign
+        if sign < 0:
+            # Drop names and pairs that no longer occur.
+            for counter, keys in (
+                (food_counts, foods),
+                (symptom_counts, symptoms),
+                (pair_counts, product(foods, symptoms)),
+            ):
+                for k in keys:
+                    if counter[k] <= 0:
+                        del counter[k]
+
+    def associations(self, entries: int, min_count: int) -> list[Association]:
+        foods, symptoms = self.food_counts, self.symptom_counts
+        out = [
+            Association(food, symptom, count, foods[food], symptoms[symptom], entries)
+            for (food, symptom), count in self.pair_counts.items()
+            if count >= min_count
+        ]
+        out.sort(key=lambda a: (-a.lift, -a.count, a.food, a.symptom))
+        return out
+
+
+# Rows buffered before `_MatrixCounts` folds them into the matrix.
+_MATRIX_BATCH = 4096
+
+
+class _MatrixCounts:
+    """Food, symptom and pair counts in dense NumPy arrays.
+
+    Names get a row or column of C on first sight. Added and replaced rows
+    are buffered and folded in a batch at a time: the batch's food × symptom
+    pairs are expanded with array operations and scattered into C with
+    `np.add.at`, which is Fᵀ diag(sign) S for the batch without building F
+    and S.
+    """
+
+    def __init__(self) -> None:
+        self._food_ids: dict[str, int] = {}
+        self._symptom_ids: dict[str, int] = {}
+        self._matrix = np.zeros((64, 16), dtype=np.int64)
+        self._food_totals = np.zeros(64, dtype=np.int64)
+        self._symptom_totals = np.zeros(16, dtype=np.int64)
+        self._pending: list[_ItemSet] = []
+        self._signs: list[int] = []
+
+    def apply(self, items: _ItemSet, sign: int) -> None:
+        self._pending.append(items)
+        self._signs.append(sign)
+        if len(self._pending) >= _MATRIX_BATCH:
+            self._flush()
+
+    @staticmethod
+    def _ids(names: dict[str, int], rows: list[tuple[str, ...]]) -> tuple[Any, Any]:
+        """Row numbers and name ids of every name in `rows`, registering new names."""
+
+        flat = [name for row in rows for name in row]
+        for name in set(flat).difference(names):
+            names[name] = len(names)
+        row_of = np.repeat(np.arange(len(rows)), [len(row) for row in rows])
+        return row_of, np.fromiter(map(names.__getitem__, flat), dtype=np.intp, count=len(flat))
+
+    def _grow(self) -> None:
+        nf, ns = self._matrix.shape
+        need_f, need_s = len(self._food_ids), len(self._symptom_ids)
+        if need_f <= nf and need_s <= ns:
+            return
+        while nf < need_f:
+            nf *= 2
+        while ns < need_s:
+            ns *= 2
+        matrix = np.zeros((nf, ns), dtype=np.int64)
+        matrix[: self._matrix.shape[0], : self._matrix.shape[1]] = self._matrix
+        food_totals = np.zeros(nf, dtype=np.int64)
+        food_totals[: len(self._food_totals)] = self._food_totals
+        symptom_totals = np.zeros(ns, dtype=np.int64)
+        symptom_totals[: len(self._symptom_totals)] = self._symptom_totals
+        self._matrix, self._food_totals, self._symptom_totals = matrix, food_totals, symptom_totals
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        rows, signs = self._pending, np.asarray(self._signs, dtype=np.int64)
+        self._pending, self._signs = [], []
+
+        food_rows, food_ids = self._ids(self._food_ids, [foods for foods, _ in rows])
+        symptom_rows, symptom_ids = self._ids(self._symptom_ids, [symptoms for _, symptoms in rows])
+        self._grow()
+
+        np.add.at(self._food_totals, food_ids, signs[food_rows])
+        np.add.at(self._symptom_totals, symptom_ids, signs[symptom_rows])
+
+        # Expand each row into its food × symptom pairs without a Python loop:
+        # every food occurrence is repeated once per symptom in its row and
+        # paired with that row's symptoms in order.
+        per_row = np.bincount(symptom_rows, minlength=len(rows))
+        first = np.cumsum(per_row) - per_row
+        reps = per_row[food_rows]
+        offsets = np.arange(reps.sum()) - np.repeat(np.cumsum(reps) - reps, reps)
+        pair_foods = np.repeat(food_ids, reps)
+        pair_symptoms = symptom_ids[np.repeat(first[food_rows], reps) + offsets]
+        np.add.at(self._matrix, (pair_foods, pair_symptoms), np.repeat(signs[food_rows], reps))
+
+    @property
+    def food_counts(self) -> Counter[str]:
+        self._flush()
+        totals = self._food_totals
+        return Counter({name: int(totals[i]) for name, i in self._food_ids.items() if totals[i] > 0})
+
+    @property
+    def symptom_counts(self) -> Counter[str]:
+        self._flush()
+        totals = self._symptom_totals
+        return Counter({name: int(totals[i]) for name, i in self._symptom_ids.items() if totals[i] > 0})
+
+    def associations(self, entries: int, min_count: int) -> list[Association]:
+        self._flush()
+        nf, ns = len(self._food_ids), len(self._symptom_ids)
+        matrix = self._matrix[:nf, :ns]
+        fi, si = np.nonzero(matrix >= max(min_count, 1))
+        if not len(fi):
+            return []
+
+        counts = matrix[fi, si]
+        food_totals, symptom_totals = self._food_totals[fi], self._symptom_totals[si]
+        lift = (counts * entries) / (food_totals * symptom_totals)
+
+        food_names, symptom_names = list(self._food_ids), list(self._symptom_ids)
+        # Name ranks stand in for the names, so the tie-breaks sort numerically.
+        food_rank = np.argsort(np.argsort(np.array(food_names, dtype=object)))
+        symptom_rank = np.argsort(np.argsort(np.array(symptom_names, dtype=object)))
+        order = np.lexsort((symptom_rank[si], food_rank[fi], -counts, -lift))
+
+        return [
+            Association(food_names[f], symptom_names[s], int(c), int(fc), int(sc), entries)
+            for f, s, c, fc, sc in zip(
+                fi[order].tolist(),
+                si[order].tolist(),
+                counts[order].tolist(),
+                food_totals[order].tolist(),
+                symptom_totals[order].tolist(),
+            )
+        ]
+
+
+class CooccurrenceIndex:
+    """Sparse entry × food and entry × symptom incidence, with their product kept current.
+
+    Each row holds one entry's set of foods and set of symptoms, i.e. its row
+    in both incidence matrices. The co-occurrence matrix C = Fᵀ S is updated
+    as rows change. Adding a row adds one to C[f, s] for each of its
+    food × symptom pairs, and replacing a row first subtracts its old pairs.
+    C is never recomputed from the entries, so a refresh costs only the new
+    rows and `associations()` costs one pass over the non-zero pairs.
+
+    With NumPy installed, C is a dense array updated a batch of rows at a
+    time with array operations; without it, pairs are counted in `Counter`s.
+    `dense` forces one or the other.
+
+    Only reported symptoms count; negated ones ("no headache") are ignored.
+    """
+
+    def __init__(self, dense: Optional[bool] = None) -> None:
+        if dense is None:
+            dense = np is not None
+        if dense and np is None:
+            raise RuntimeError("dense co-occurrence counts need NumPy (pip install light-parse[analytics])")
+        self._rows: dict[str, int] = {}
+        self._row_items: list[_ItemSet] = []
+        # Entries share item-set tuples, which keeps per-row memory small.
+        self._itemsets: dict[_ItemSet, _ItemSet] = {}
+        self._counts: Any = _MatrixCounts() if dense else _PairCounts()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def food_counts(self) -> Counter[str]:
+        return self._counts.food_counts
+
+    @property
+    def symptom_counts(self) -> Counter[str]:
+        return self._counts.symptom_counts
+
+    def add(self, entry_id: str, foods: Iterable[str], symptoms: Iterable[str]) -> None:
+        key = (tuple(sorted(set(foods))), tuple(sorted(set(symptoms))))
+        items = self._itemsets.setdefault(key, key)
+
+        row = self._rows.get(entry_id)
+        if row is None:
+            self._rows[entry_id] = len(self._row_items)
+            self._row_items.append(items)
+        else:
+            old = self._row_items[row]
+            if old is items:
+                return
+            self._counts.apply(old, -1)
+            self._row_items[row] = items
+        self._counts.apply(items, 1)
+
+    def add_entry(self, entry: StoredEntry) -> None:
+        self.add(
+            entry.entry_id,
+            (str(f["name"]) for f in entry.foods if f.get("name")),
+            (str(s["name"]) for s in entry.symptoms if s.get("name") and s.get("negated") is not True),
+        )
+
+    def add_entries(self, entries: Iterable[StoredEntry]) -> None:
+        for entry in entries:
+            self.add_entry(entry)
+
+    def associations(self, min_count: int = 1) -> list[Association]:
+        """Every food × symptom pair seen together at least `min_count` times, highest lift first."""
+
+        return self._counts.associations(len(self._rows), min_count)
+
+
+def _file_signature(path: Path) -> tuple[int, ...]:
+    sig: list[int] = []
+    for p in (path, path.with_name(path.name + "-wal")):
+        try:
+            st = p.stat()
+        except OSError:
+            sig += [0, 0]
+        else:
+            sig += [st.st_size, st.st_mtime_ns]
+    return tuple(sig)
+
+
+class StoreCooccurrence:
+    """A `CooccurrenceIndex` that follows a parsed store.
+
+    Each call reads only what changed. For a JSONL store that means the
+    records appended to the log since the last call; a compacted log is read
+    again from the start. A SQLite store is read again whenever its files
+    change.
+    """
+
+    def __init__(self, path: Path, backend: Optional[ModuleType] = None) -> None:
+        self.path = Path(path)
+        self.backend = backend or backend_for_path(self.path)
+        self.index = CooccurrenceIndex()
+        self._source: Any = None
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        if not self.path.exists():
+            self.index, self._source, self._offset = CooccurrenceIndex(), None, 0
+            return
+
+        if self.backend is jsonl:
+            st = self.path.stat()
+            if st.st_ino != self._source or st.st_size < self._offset:
+                self.index, self._source, self._offset = CooccurrenceIndex(), st.st_ino, 0
+            for offset, entry in jsonl.iter_log(self.path, self._offset):
+                if entry is not None:
+                    self.index.add_entry(entry)
+                self._offset = offset
+            return
+
+        signature = _file_signature(self.path)
+        if signature != self._source:
+            index = CooccurrenceIndex()
+            index.add_entries(self.backend.iter_entries(self.path))
+            self.index, self._source = index, signature
+
+    def associations(self, min_count: int = 1) -> tuple[int, list[Association]]:
+        """Bring the index up to date and return `(entry count, associations)`."""
+
+        with self._lock:
+            self._refresh()
+            return len(self.index), self.index.associations(min_count)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="light_parse cooccur")
+    parser.add_argument("--store", required=True, help="parsed store (JSONL, or SQLite by .sqlite3/.db suffix)")
+    parser.add_argument("--min-count", type=int, default=3, help="ignore pairs seen together fewer times")
+    parser.add_argument("--top", type=int, default=25, help="rows to print (0 = all)")
+    parser.add_argument("--json", action="store_true", help="print the rows as JSON lines")
+    parser.add_argument(
+        "--window",
+        default=None,
+        help="link symptoms to foods the same user logged up to this long before (e.g. 6h) instead of the same entry",
+    )
+    parser.add_argument("--min-lag", default="0", help="with --window, ignore foods logged less than this long before")
+    args = parser.parse_args(argv)
+
+    store = Path(args.store)
+    if not store.exists():
+        parser.error(f"store not found: {store}")
+    if args.min_count < 1:
+        parser.error("--min-count must be >= 1")
+
+    if args.window is not None:
+        return _window_report(parser, args, store)
+
+    started = time.perf_counter()
+    entries, rows = StoreCooccurrence(store).associations(args.min_count)
+    elapsed = time.perf_counter() - started
+    if args.top:
+        rows = rows[: args.top]
+
+    if args.json:
+        for a in rows:
+            print(json.dumps(a.to_dict(), ensure_ascii=False))
+    else:
+        print(f"{'food':<20} {'symptom':<20} {'count':>7} {'P(s|f)':>7} {'P(f|s)':>7} {'lift':>7}")
+        for a in rows:
+            print(
+                f"{a.food:<20} {a.symptom:<20} {a.count:>7} "
+                f"{a.p_symptom_given_food:>7.3f} {a.p_food_given_symptom:>7.3f} {a.lift:>7.2f}"
+            )
+    print(f"light_parse cooccur: {entries} entries in {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+
+def _window_report(parser: argparse.ArgumentParser, args: argparse.Namespace, store: Path) -> int:
+    from lightparse.correlate import lagged_associations, parse_duration
+
+    try:
+        min_lag, max_lag = parse_duration(args.min_lag), parse_duration(args.window)
+    except ValueError as e:
+        parser.error(str(e))
+    if min_lag > max_lag:
+        parser.error("--min-lag must not exceed --window")
+
+    started = time.perf_counter()
+    report = lagged_associations(backend_for_path(store).iter_entries(store), min_lag, max_lag, args.min_count)
+    elapsed = time.perf_counter() - started
+    rows = report.pairs[: args.top] if args.top else report.pairs
+
+    if args.json:
+        for p in rows:
+            print(json.dumps({**asdict(p), "share": round(p.share, 6)}, ensure_ascii=False))
+    else:
+        print(f"{'food':<20} {'symptom':<20} {'count':>7} {'share':>7}")
+        for p in rows:
+            print(f"{p.food:<20} {p.symptom:<20} {p.count:>7} {p.share:>7.3f}")
+    print(
+        f"light_parse cooccur: {report.symptom_events} symptom reports from {report.users} users in {elapsed:.2f}s"
+        + (f", {report.skipped_entries} entries without a timestamp skipped" if report.skipped_entries else ""),
+        file=sys.stderr,
+    )
+    return 0
@@ -1,50 +1,390 @@
+from __future__ import annotations
+
 import argparse
 import json
+import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Iterable
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, TextIO
+
+from lightparse.pipeline.light_pipeline import LightParsePipeline, ParsedEntry
+from lightparse.pipeline.parallel import chunked, init_worker, iter_pool_chunks, make_pipeline, worker_pipeline
+
+if TYPE_CHECKING:
+    from lightparse.pipeline.instrument import Instrumentation
+
+
+# Small invocations are dominated by startup, so multiprocessing, cProfile and
+# the stats sinks are imported only by the code paths that use them.
+
+
+_PARSER_VERSION = "v1"
+
+
+_STDIO = "-"
+
+
+# `light_parse <name> ...` hands off to `<module>.main`; imported only when used.
+_SUBCOMMANDS = {"reparse": "lightparse.reparse", "export": "lightparse.export", "cooccur": "lightparse.analytics"}
+
+
+_SELFTEST_ENTRY = {"entry_id": "selftest", "text": "2 eggs for breakfast. mild headache 3/10 by noon"}
+
+
+@contextmanager
+def _open_input(path: str) -> Iterator[TextIO]:
+    if path == _STDIO:
+        yield sys.stdin
+        return
+    with Path(path).open("r", encoding="utf-8") as f:
+        yield f
+
+
+@contextmanager
+def _open_output(path: str) -> Iterator[TextIO]:
+    if path == _STDIO:
+        yield sys.stdout
+        sys.stdout.flush()
+        return
+    with Path(path).open("w", encoding="utf-8") as f:
+        yield f
+
+
+def _read_lines(f: TextIO) -> Iterator[tuple[int, str]]:
+    for line_num, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        yield line_num, line
+
+
+def _decode_line(line_num: int, line: str) -> dict[str, Any]:
+    try:
+        obj = json.loads(line)
+    except json.JSONDecodeError as e:
+        return {"entry_id": None, "text": "", "_parse_error": f"json_decode_error_line_{line_num}:{e.msg}"}
+    if not isinstance(obj, dict):
+        return {"entry_id": None, "text": "", "_parse_error": f"invalid_entry_line_{line_num}"}
+    return obj
+
+
+def _decode_lines(
+    lines: Iterable[tuple[int, str]], inst: Optional[Instrumentation]
+) -> Iterator[tuple[int, dict[str, Any]]]:
+    if inst is None:
+        for line_num, line in lines:
+            yield line_num, _decode_line(line_num, line)
+        return
+
+    clock = time.perf_counter
+    for line_num, line in lines:
+        started = clock()
+        entry = _decode_line(line_num, line)
+        inst.add_time("json_decode", clock() - started)
+        yield line_num, entry
+
+
+def _write_jsonl(
+    f: TextIO,
+    rows: Iterable[str],
+    flush_every: int = 0,
+    inst: Optional[Instrumentation] = None,
+) -> int:
+    """Write already-serialized JSON rows as they arrive and return how many were written."""
+
+    clock = time.perf_counter
+    count = 0
+    for row in rows:
+        if inst is not None:
+            started = clock()
+        f.write(row)
+        f.write("\n")
+        count += 1
+        if flush_every and count % flush_every == 0:
+            f.flush()
+        if inst is not None:
+            inst.add_time("write", clock() - started)
+    return count
+
+
+def _parse_line(pipeline: LightParsePipeline, entry: dict[str, Any]) -> str:
+    inst = pipeline.instrumentation
+    result = pipeline.run_record(entry)
+    parse_err = entry.get("_parse_error")
+    if parse_err:
+        result.parse_errors.append(parse_err)
+    if inst is None:
+        return result.to_json()
+    started = time.perf_counter()
+    row = result.to_json()
+    inst.add_time("serialize", time.perf_counter() - started)
+    return row
+
+
+def _iter_parsed(pipeline: LightParsePipeline, lines: Iterable[tuple[int, str]]) -> Iterator[str]:
+    """Parse raw lines and yield one serialized JSON result per line.
 
-from lightparse.pipeline.light_pipeline import LightParsePipeline
+    Results go straight from the parser records to JSON, without building
+    per-item dicts. Anything that fails outside the parsers (the parse cache,
+    serialization) becomes an error record for that line only.
+    """
 
+    for line_num, entry in _decode_lines(lines, pipeline.instrumentation):
+        try:
+            yield _parse_line(pipeline, entry)
+        except Exception as e:  # noqa: BLE001
+            error = ParsedEntry(
+                entry_id=entry.get("entry_id"),
+                foods=(),
+                symptoms=(),
+                parse_errors=[f"pipeline_error_line_{line_num}:{type(e).__name__}"],
+                parser_version=pipeline.parser_version,
+            )
+            yield error.to_json()
 
-def _read_jsonl(path: Path) -> Iterable[dict[str, Any]]:
-    with path.open("r", encoding="utf-8") as f:
-        for line_num, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                yield json.loads(line)
-            except json.JSONDecodeError as e:
-                yield {"entry_id": None, "text": "", "_parse_error": f"json_decode_error_line_{line_num}:{e.msg}"}
 
+def _parse_chunk(chunk: list[tuple[int, str]]) -> tuple[list[str], Optional[dict[str, Any]]]:
+    """Worker entry point: parse a chunk of raw lines, one JSON result per line.
 
-def _write_jsonl(path: Path, rows: Iterable[dict[str, Any]]) -> None:
-    with path.open("w", encoding="utf-8") as f:
-        for row in rows:
-            f.write(json.dumps(row, ensure_ascii=False))
-            f.write("\n")
+    Also returns the worker's instrumentation snapshot for the chunk (None
+    when instrumentation is off) so the parent can merge it.
+    """
+
+    pipeline = worker_pipeline()
+    results = list(_iter_parsed(pipeline, chunk))
+    if pipeline.cache is not None:
+        pipeline.cache.flush()
+
+    snapshot = None
+    if pipeline.instrumentation is not None:
+        snapshot = pipeline.instrumentation.snapshot()
+        pipeline.instrumentation.reset()
+    return results, snapshot
+
+
+def _iter_results(
+    lines: Iterable[tuple[int, str]],
+    pipeline: Optional[LightParsePipeline],
+    workers: int,
+    chunk_size: int,
+    unordered: bool,
+    cache_size: int,
+    cache_path: Optional[str],
+    inst: Optional[Instrumentation] = None,
+) -> Iterator[str]:
+    """Parse in-process with `pipeline`, or in a pool of `workers` when it is None.
+
+    In pool mode, worker instrumentation snapshots are merged into `inst`.
+    """
+
+    if pipeline is not None:
+        yield from _iter_parsed(pipeline, lines)
+        return
+
+    from multiprocessing import Pool
+
+    slowest = inst.slowest_n if inst is not None else None
+    initargs = (_PARSER_VERSION, cache_size, cache_path, slowest)
+    with Pool(processes=workers, initializer=init_worker, initargs=initargs) as pool:
+        for results, snapshot in iter_pool_chunks(pool, _parse_chunk, chunked(lines, chunk_size), workers * 2, unordered):
+            if inst is not None and snapshot is not None:
+                inst.merge(snapshot)
+            yield from results
+
+
+def _print_stage_report(snapshot: dict[str, Any]) -> None:
+    stages = snapshot["stages"]
+    total = sum(row["seconds"] for row in stages.values()) or 1.0
+    for name, row in sorted(stages.items(), key=lambda kv: kv[1]["seconds"], reverse=True):
+        print(
+            f"light_parse: stage {name} {row['seconds']:.3f}s ({row['seconds'] / total:.0%}, {row['calls']} calls)",
+            file=sys.stderr,
+        )
+    for name, row in snapshot.get("caches", {}).items():
+        print(
+            f"light_parse: {name} cache hit rate {row['hit_rate']:.1%} "
+            f"(hits={row['hits']} misses={row['misses']} evictions={row['evictions']})",
+            file=sys.stderr,
+        )
+    for row in snapshot["slowest"][:5]:
+        print(f"light_parse: slow entry {row['entry_id']} {row['ms']:.2f}ms", file=sys.stderr)
+
+
+def _percentile_ms(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[k] * 1000, 2)
+
+
+def measure_startup(runs: int = 5) -> dict[str, Any]:
+    """Time fresh `light_parse` processes from launch to their first output line.
+
+    Each run pipes one entry through `--in - --out -`. A bare interpreter is
+    timed the same way so the package's own startup cost can be read off.
+    """
+
+    import os
+    import subprocess
+
+    env = dict(os.environ)
+    src_dir = str(Path(__file__).resolve().parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src_dir, env.get("PYTHONPATH")) if p)
+    cmd = [sys.executable, "-m", "lightparse.cli", "--in", _STDIO, "--out", _STDIO]
+    payload = json.dumps(_SELFTEST_ENTRY) + "\n"
+
+    bare: list[float] = []
+    first_output: list[float] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], env=env, check=True)
+        bare.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            cmd, env=env, text=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        assert proc.stdin is not None and proc.stdout is not None
+        proc.stdin.write(payload)
+        proc.stdin.close()
+        line = proc.stdout.readline()
+        first_output.append(time.perf_counter() - started)
+        proc.stdout.close()
+        if proc.wait() != 0 or not line or json.loads(line).get("entry_id") != _SELFTEST_ENTRY["entry_id"]:
+            raise RuntimeError("light_parse self-test produced no valid output")
+
+    interpreter_ms = _percentile_ms(bare, 50)
+    first_output_ms = _percentile_ms(first_output, 50)
+    return {
+        "runs": runs,
+        "interpreter_p50_ms": interpreter_ms,
+        "first_output_p50_ms": first_output_ms,
+        "first_output_min_ms": _percentile_ms(first_output, 0),
+        "first_output_max_ms": _percentile_ms(first_output, 100),
+        "startup_overhead_p50_ms": round(first_output_ms - interpreter_ms, 2),
+    }
 
 
 def main(argv: list[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in _SUBCOMMANDS:
+        import importlib
+
+        return importlib.import_module(_SUBCOMMANDS[argv[0]]).main(argv[1:])
+
     parser = argparse.ArgumentParser(prog="light_parse")
-    parser.add_argument("--in", dest="in_path", required=True)
-    parser.add_argument("--out", dest="out_path", required=True)
+    parser.add_argument("--in", dest="in_path", help="input JSONL path, or - for stdin")
+    parser.add_argument("--out", dest="out_path", help="output JSONL path, or - for stdout")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes (1 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="lines handed to a worker at a time")
+    parser.add_argument("--unordered", action="store_true", help="emit chunks as they finish instead of input order")
+    parser.add_argument("--flush-every", type=int, default=1000, help="flush output every N entries (0 = leave to buffering)")
+    parser.add_argument("--cache-size", type=int, default=10_000, help="in-process parse cache entries per process (0 = off)")
+    parser.add_argument("--cache-path", default=None, help="optional SQLite file for a persistent parse cache")
+    parser.add_argument("--stats", action="store_true", help="report per-stage timings and the slowest entries on stderr")
+    parser.add_argument("--stats-json", default=None, help="append an instrumentation snapshot to this JSON log")
+    parser.add_argument("--stats-prom", default=None, help="write instrumentation in Prometheus text format to this file")
+    parser.add_argument("--slowest", type=int, default=10, help="how many of the slowest entries to keep")
+    parser.add_argument("--profile", default=None, help="run under cProfile and dump stats to this file")
+    parser.add_argument(
+        "--selftest-startup",
+        type=int,
+        nargs="?",
+        const=5,
+        metavar="RUNS",
+        help="time launch-to-first-output of fresh light_parse processes and print JSON",
+    )
     args = parser.parse_args(argv)
 
-    in_path = Path(args.in_path)
-    out_path = Path(args.out_path)
+    if args.selftest_startup is not None:
+        if args.selftest_startup < 1:
+            parser.error("--selftest-startup needs at least 1 run")
+        report = measure_startup(args.selftest_startup)
+        print(json.dumps(report))
+        print(
+            f"light_parse: first output in {report['first_output_p50_ms']}ms "
+            f"({report['startup_overhead_p50_ms']}ms over a bare interpreter)",
+            file=sys.stderr,
+        )
+        return 0
+
+    if args.in_path is None or args.out_path is None:
+        parser.error("--in and --out are required")
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be >= 1")
+    if args.flush_every < 0:
+        parser.error("--flush-every must be >= 0")
+    if args.cache_size < 0:
+        parser.error("--cache-size must be >= 0")
+    if args.slowest < 0:
+        parser.error("--slowest must be >= 0")
+
+    inst = None
+    if args.stats or args.stats_json or args.stats_prom:
+        from lightparse.pipeline.instrument import Instrumentation, JsonLogSink, PrometheusTextSink
+
+        sinks: list[Any] = []
+        if args.stats_json:
+            sinks.append(JsonLogSink(Path(args.stats_json)))
+        if args.stats_prom:
+            sinks.append(PrometheusTextSink(Path(args.stats_prom)))
+        inst = Instrumentation(slowest=args.slowest, sinks=sinks)
+
+    pipeline = make_pipeline(_PARSER_VERSION, args.cache_size, args.cache_path, inst) if args.workers == 1 else None
+
+    profiler = None
+    if args.profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    started = time.perf_counter()
+    try:
+        with _open_input(args.in_path) as src, _open_output(args.out_path) as dst:
+            results = _iter_results(
+                _read_lines(src),
+                pipeline,
+                args.workers,
+                args.chunk_size,
+                args.unordered,
+                args.cache_size,
+                args.cache_path,
+                inst,
+            )
+            count = _write_jsonl(dst, results, flush_every=args.flush_every, inst=inst)
+    finally:
+        if pipeline is not None and pipeline.cache is not None:
+            pipeline.cache.close()
+        if profiler is not None:
+            profiler.disable()
+    elapsed = time.perf_counter() - started
+
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f"light_parse: {count} entries in {elapsed:.2f}s ({rate:.1f} entries/s)", file=sys.stderr)
+    if pipeline is not None and pipeline.cache is not None:
+        stats = pipeline.cache.stats()
+        print(
+            f"light_parse: cache hits={stats['hits']} disk_hits={stats['disk_hits']} "
+            f"misses={stats['misses']} evictions={stats['evictions']}",
+            file=sys.stderr,
+        )
 
-    pipeline = LightParsePipeline(parser_version="v1")
+    if inst is not None:
+        snapshot = inst.emit()
+        if args.stats:
+            _print_stage_report(snapshot)
 
-    outputs: list[dict[str, Any]] = []
-    for entry in _read_jsonl(in_path):
-        result = pipeline.run(entry)
-        parse_err = entry.get("_parse_error")
-        if parse_err:
-            result["parse_errors"].append(parse_err)
-        outputs.append(result)
+    if profiler is not None:
+        # Only the parent process is profiled; with --workers the parse time
+        # shows up as waiting on the pool.
+        import pstats
 
-    _write_jsonl(out_path, outputs)
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
     return 0
 
 
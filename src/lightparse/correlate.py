@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import re
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+from lightparse.store import StoredEntry
+from lightparse.utils.timestamps import epoch_seconds
+
+
+# Entries without a user_id are treated as one user's journal.
+_DEFAULT_USER = ""
+
+_DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$", re.IGNORECASE)
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(text: str) -> float:
+    """Seconds in `"90"`, `"90s"`, `"30m"`, `"6h"` or `"1.5d"`."""
+
+    m = _DURATION_RE.match(text)
+    if m is None:
+        raise ValueError(f"not a duration: {text!r}")
+    return float(m.group(1)) * _DURATION_UNITS[m.group(2).lower()]
+
+
+@dataclass
+class _Events:
+    """One user's food and symptom events as parallel arrays, sorted by time on `seal()`."""
+
+    food_ts: array = field(default_factory=lambda: array("d"))
+    food_names: list[str] = field(default_factory=list)
+    symptom_ts: array = field(default_factory=lambda: array("d"))
+    symptom_names: list[str] = field(default_factory=list)
+
+    def seal(self) -> None:
+        self.food_ts, self.food_names = _by_time(self.food_ts, self.food_names)
+        self.symptom_ts, self.symptom_names = _by_time(self.symptom_ts, self.symptom_names)
+
+
+def _by_time(ts: array, names: list[str]) -> tuple[array, list[str]]:
+    order = sorted(range(len(ts)), key=ts.__getitem__)
+    return array("d", (ts[i] for i in order)), [names[i] for i in order]
+
+
+@dataclass(frozen=True)
+class LaggedPair:
+    food: str
+    symptom: str
+    # Symptom reports with this food logged within the window before them.
+    count: int
+    symptom_count: int
+
+    @property
+    def share(self) -> float:
+        """Fraction of this symptom's reports preceded by the food."""
+
+        return self.count / self.symptom_count
+
+
+@dataclass
+class WindowReport:
+    users: int = 0
+    symptom_events: int = 0
+    skipped_entries: int = 0
+    pairs: list[LaggedPair] = field(default_factory=list)
+
+
+def collect_events(entries: Iterable[StoredEntry]) -> tuple[dict[str, _Events], int]:
+    """Group reported foods and symptoms per user in one pass; return `(events, entries without a timestamp)`."""
+
+    users: dict[str, _Events] = {}
+    skipped = 0
+    for entry in entries:
+        ts = epoch_seconds(entry.timestamp) if entry.timestamp is not None else None
+        if ts is None:
+            skipped += 1
+            continue
+        events = users.get(entry.user_id or _DEFAULT_USER)
+        if events is None:
+            events = users[entry.user_id or _DEFAULT_USER] = _Events()
+        for name in {str(f["name"]) for f in entry.foods if f.get("name")}:
+            events.food_ts.append(ts)
+            events.food_names.append(name)
+        for name in {str(s["name"]) for s in entry.symptoms if s.get("name") and s.get("negated") is not True}:
+            events.symptom_ts.append(ts)
+            events.symptom_names.append(name)
+
+    for events in users.values():
+        events.seal()
+    return users, skipped
+
+
+def iter_window_links(events: _Events, min_lag: float, max_lag: float) -> Iterator[tuple[str, Counter[str]]]:
+    """Yield `(symptom, foods in window)` for each symptom event of one user.
+
+    The window holds the foods logged between `max_lag` and `min_lag`
+    seconds before the symptom. Symptom times only increase, so both window
+    edges only move forward: each food enters and leaves the window once,
+    and the join is linear in the number of events. Each yielded counter is
+    the live window, so read it before advancing.
+    """
+
+    food_ts, food_names = events.food_ts, events.food_names
+    window: Counter[str] = Counter()
+    lo = hi = 0
+    n = len(food_ts)
+    for t, symptom in zip(events.symptom_ts, events.symptom_names):
+        while hi < n and food_ts[hi] <= t - min_lag:
+            window[food_names[hi]] += 1
+            hi += 1
+        while lo < hi and food_ts[lo] < t - max_lag:
+            name = food_names[lo]
+            window[name] -= 1
+            if not window[name]:
+                del window[name]
+            lo += 1
+        yield symptom, window
+
+
+def lagged_associations(
+    entries: Iterable[StoredEntry], min_lag: float = 0.0, max_lag: float = 6 * 3600, min_count: int = 1
+) -> WindowReport:
+    """Link each reported symptom to the foods the same user logged `min_lag`..`max_lag` seconds earlier."""
+
+    if min_lag > max_lag:
+        raise ValueError("min_lag must not exceed max_lag")
+
+    users, skipped = collect_events(entries)
+    report = WindowReport(users=len(users), skipped_entries=skipped)
+
+    pair_counts: Counter[tuple[str, str]] = Counter()
+    symptom_counts: Counter[str] = Counter()
+    for events in users.values():
+        for symptom, window in iter_window_links(events, min_lag, max_lag):
+            symptom_counts[symptom] += 1
+            for food in window:
+                pair_counts[food, symptom] += 1
+
+    report.symptom_events = sum(symptom_counts.values())
+    report.pairs = sorted(
+        (
+            LaggedPair(food, symptom, count, symptom_counts[symptom])
+            for (food, symptom), count in pair_counts.items()
+            if count >= min_count
+        ),
+        key=lambda p: (-p.share, -p.count, p.food, p.symptom),
+    )
+    return report
+
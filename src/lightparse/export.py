@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import math
+import os
+import shutil
+import struct
+import sys
+import time
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from lightparse.store import backend_for_path
+
+
+_FORMAT = "lightparse-columnar-1"
+
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+# array typecode -> NumPy dtype descr, as written (always little-endian).
+_DESCR = {"b": "|i1", "B": "|b1", "i": "<i4", "f": "<f4", "d": "<f8"}
+_TYPECODE = {descr: code for code, descr in _DESCR.items()}
+
+_NULL = -1
+
+_QUANTITY_WORDS = {"half": 0.5, "1/2": 0.5}
+
+
+class _Dictionary:
+    """Assigns dense int codes to strings in first-seen order."""
+
+    def __init__(self) -> None:
+        self.codes: dict[str, int] = {}
+        self.values: list[str] = []
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NULL
+        c = self.codes.get(value)
+        if c is None:
+            c = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+
+@dataclass
+class _Table:
+    columns: dict[str, array]
+    dictionaries: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def rows(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+
+@dataclass
+class ExportReport:
+    entries: int = 0
+    food_rows: int = 0
+    symptom_rows: int = 0
+    elapsed: float = 0.0
+
+
+def _quantity_value(raw: Any) -> float:
+    if raw is None:
+        return math.nan
+    text = str(raw).strip().lower()
+    if text in _QUANTITY_WORDS:
+        return _QUANTITY_WORDS[text]
+    try:
+        return float(text)
+    except ValueError:
+        return math.nan
+
+
+def _npy_header(descr: str, rows: int) -> bytes:
+    header = repr({"descr": descr, "fortran_order": False, "shape": (rows,)}).encode("latin1")
+    # Pad so the data starts on a 64-byte boundary, as NumPy does.
+    pad = 64 - (len(_NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header += b" " * (pad % 64) + b"\n"
+    return _NPY_MAGIC + struct.pack("<H", len(header)) + header
+
+
+def write_npy(path: Path, values: Union[array, list[str]]) -> None:
+    """Write a 1-D `.npy` file from a stdlib `array` or a list of strings.
+
+    Strings become a fixed-width `<U` column, so NumPy can load (and mmap)
+    every file without the export needing NumPy itself.
+    """
+
+    with path.open("wb") as f:
+        if isinstance(values, array):
+            data = values
+            if sys.byteorder == "big" and data.itemsize > 1:
+                data = array(data.typecode, data)
+                data.byteswap()
+            f.write(_npy_header(_DESCR[values.typecode], len(values)))
+            data.tofile(f)
+            return
+
+        width = max((len(v) for v in values), default=0) or 1
+        f.write(_npy_header(f"<U{width}", len(values)))
+        for v in values:
+            f.write(v.ljust(width, "\0").encode("utf-32-le"))
+
+
+def read_npy(path: Path) -> Union[array, list[str]]:
+    """Load a file written by `write_npy` without NumPy."""
+
+    with path.open("rb") as f:
+        if f.read(len(_NPY_MAGIC)) != _NPY_MAGIC:
+            raise ValueError(f"{path} is not a version 1.0 .npy file")
+        (header_len,) = struct.unpack("<H", f.read(2))
+        header = ast.literal_eval(f.read(header_len).decode("latin1"))
+        data = f.read()
+
+    descr = header["descr"]
+    if descr.startswith("<U"):
+        width = int(descr[2:])
+        size = width * 4
+        return [data[i : i + size].decode("utf-32-le").rstrip("\0") for i in range(0, len(data), size)]
+
+    values = array(_TYPECODE[descr])
+    values.frombytes(data)
+    if sys.byteorder == "big" and values.itemsize > 1:
+        values.byteswap()
+    return values
+
+
+def export_store(store: Path, out_dir: Path) -> ExportReport:
+    """Flatten a parsed store into dictionary-encoded columnar tables.
+
+    Writes one `.npy` per column under `foods/` and `symptoms/`, the string
+    dictionaries under `dict/`, and a `manifest.json` describing them. Every
+    row carries an `entry` code into `dict/entry_id.npy`; null strings are
+    coded -1, null quantities are NaN and null severities -1.
+    """
+
+    started = time.perf_counter()
+    report = ExportReport()
+
+    dicts = {name: _Dictionary() for name in ("entry_id", "food_name", "unit", "meal", "symptom_name", "time_hint")}
+    foods = _Table(
+        columns={
+            "entry": array("i"),
+            "name": array("i"),
+            "quantity": array("d"),
+            "unit": array("i"),
+            "meal": array("i"),
+            "confidence": array("f"),
+        },
+        dictionaries={"entry": "entry_id", "name": "food_name", "unit": "unit", "meal": "meal"},
+    )
+    symptoms = _Table(
+        columns={
+            "entry": array("i"),
+            "name": array("i"),
+            "severity": array("b"),
+            "time_hint": array("i"),
+            "negated": array("B"),
+            "confidence": array("f"),
+        },
+        dictionaries={"entry": "entry_id", "name": "symptom_name", "time_hint": "time_hint"},
+    )
+
+    fc, sc = foods.columns, symptoms.columns
+    for entry in backend_for_path(store).iter_entries(store):
+        report.entries += 1
+        entry_code = dicts["entry_id"].code(entry.entry_id)
+
+        for f in entry.foods:
+            fc["entry"].append(entry_code)
+            fc["name"].append(dicts["food_name"].code(str(f.get("name"))))
+            fc["quantity"].append(_quantity_value(f.get("quantity")))
+            unit = f.get("unit")
+            fc["unit"].append(dicts["unit"].code(str(unit) if unit is not None else None))
+            fc["meal"].append(dicts["meal"].code(str(f.get("meal") or "unknown")))
+            fc["confidence"].append(float(f.get("confidence") or 0.0))
+
+        for s in entry.symptoms:
+            sc["entry"].append(entry_code)
+            sc["name"].append(dicts["symptom_name"].code(str(s.get("name"))))
+            severity = s.get("severity")
+            sc["severity"].append(int(severity) if isinstance(severity, int) and 0 <= severity <= 10 else _NULL)
+            hint = s.get("time_hint")
+            sc["time_hint"].append(dicts["time_hint"].code(str(hint) if hint is not None else None))
+            sc["negated"].append(1 if s.get("negated") else 0)
+            sc["confidence"].append(float(s.get("confidence") or 0.0))
+
+    report.food_rows = foods.rows
+    report.symptom_rows = symptoms.rows
+
+    # Build next to the destination and swap it in, so readers never see a
+    # half-written export.
+    tmp = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    manifest: dict[str, Any] = {"format": _FORMAT, "source": str(store), "entries": report.entries, "tables": {}}
+    for table_name, table in (("foods", foods), ("symptoms", symptoms)):
+        (tmp / table_name).mkdir(parents=True)
+        for col, values in table.columns.items():
+            write_npy(tmp / table_name / f"{col}.npy", values)
+        manifest["tables"][table_name] = {
+            "rows": table.rows,
+            "columns": {col: _DESCR[values.typecode] for col, values in table.columns.items()},
+            "dictionaries": table.dictionaries,
+        }
+
+    (tmp / "dict").mkdir()
+    for name, d in dicts.items():
+        write_npy(tmp / "dict" / f"{name}.npy", d.values)
+    manifest["dictionaries"] = {name: len(d.values) for name, d in dicts.items()}
+    (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+
+    if out_dir.exists():
+        old = out_dir.with_name(out_dir.name + ".old")
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(out_dir, old)
+        os.replace(tmp, out_dir)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(tmp, out_dir)
+
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="light_parse export")
+    parser.add_argument("--store", required=True, help="parsed store to export (JSONL, or SQLite by .sqlite3/.db suffix)")
+    parser.add_argument("--out", required=True, help="directory to write the columnar export to")
+    args = parser.parse_args(argv)
+
+    store = Path(args.store)
+    if not store.exists():
+        parser.error(f"store not found: {store}")
+
+    report = export_store(store, Path(args.out))
+    print(
+        f"light_parse export: {report.entries} entries, {report.food_rows} food rows, "
+        f"{report.symptom_rows} symptom rows in {report.elapsed:.2f}s",
+        file=sys.stderr,
+    )
+    return 0
@@ -1,31 +1,15 @@
 from __future__ import annotations
 
 import re
+import sys
 from dataclasses import dataclass
-from typing import Optional
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Iterator, Optional
 
-from lightparse.utils.text import normalize_whitespace, split_on_separators, strip_non_text
-
-
-_MEAL_KEYWORDS = {
-    "breakfast": ["breakfast", "bf"],
-    "lunch": ["lunch"],
-    "dinner": ["dinner"],
-    "snack": ["snack", "snacks"],
-}
-
-
-_HINGLISH_MEAL_PATTERNS: list[tuple[str, re.Pattern[str]]] = [
-    ("lunch", re.compile(r"\baaj\s+lunch\b|\blunch\s+mein\b", re.IGNORECASE)),
-    ("dinner", re.compile(r"\baaj\s+dinner\b|\bdinner\s+mein\b", re.IGNORECASE)),
-]
-
-
-_SKIPPED_MEAL_PATTERNS: list[tuple[str, re.Pattern[str]]] = [
-    ("breakfast", re.compile(r"\bskipp?ed\s+breakfast\b|\bbreakfast\s+skip\b", re.IGNORECASE)),
-    ("lunch", re.compile(r"\bskipp?ed\s+lunch\b|\blunch\s+skip\b", re.IGNORECASE)),
-    ("dinner", re.compile(r"\bskipp?ed\s+dinner\b|\bdinner\s+skip\b|\bdinner\s+skip\s+kiya\b|\baaj\s+dinner\s+skip\s+kiya\b", re.IGNORECASE)),
-]
+from lightparse.utils.jsonout import json_opt_str, json_str, json_value
+from lightparse.utils.lexicon import TermIndex, food_index, lexicon_path, load_term_index, meal_rules, parse_word_list
+from lightparse.utils.text import Document, Token, join_tokens, normalize_whitespace
 
 
 _UNIT_RE = r"(?:cup|cups|bowl|bowls|plate|plates|slice|slices|piece|pieces)"
@@ -68,56 +52,47 @@ _FRAGMENT_STOPWORDS = {
 }
 
 
-_FOOD_LEXICON = {
-    "egg",
-    "toast",
-    "dal",
-    "chawal",
-    "dahi",
-    "banana",
-    "almond",
-    "paneer",
-    "salad",
-    "coffee",
-    "oats",
-    "milk",
-    "sushi",
-    "pizza",
-    "diet coke",
-    "coke",
-    "rajma",
-    "idli",
-    "sambar",
-    "chai",
-    "chips",
-    "khichdi",
-    "protein shake",
-    "poha",
-    "chicken wrap",
-    "wrap",
-    "fish curry",
-    "rice",
-    "cookie",
-    "tea",
-    "sugar",
-    "yogurt",
-    "berries",
-    "moong dal dosa",
-    "dosa",
-    "chutney",
-    "avocado",
-    "pasta",
-    "white sauce",
-    "chocolate",
-    "ice cream",
-    "paratha",
-    "curd",
-    "egg biryani",
-    "biryani",
-}
+def _match_multiword(tokens: tuple[Token, ...], i: int) -> Optional[str]:
+    """Return the multiword lexicon food starting at token `i`, or None.
 
+    Longer phrases are tried first. The last word may carry a plural "s"
+    ("ice creams"); `_normalize_food_name` folds it back.
+    """
 
-_MULTIWORD_FOODS = sorted([f for f in _FOOD_LEXICON if " " in f], key=len, reverse=True)
+    lexicon = food_index()
+    if not lexicon.has_prefix(tokens[i].value + " "):
+        return None
+    for n in range(min(lexicon.max_words, len(tokens) - i), 1, -1):
+        phrase = " ".join(t.value for t in tokens[i : i + n])
+        if phrase in lexicon:
+            return phrase
+        if phrase.endswith("s") and phrase[:-1] in lexicon:
+            return phrase[:-1]
+    return None
+
+
+def _respaced(t: Token, gap: bool) -> Token:
+    return t._replace(spaced=True) if gap and not t.spaced else t
+
+
+def _drop_parenthesized(tokens: list[Token]) -> list[Token]:
+    """Token equivalent of replacing each `(...)` group with a space."""
+
+    out: list[Token] = []
+    gap = False
+    i = 0
+    while i < len(tokens):
+        t = tokens[i]
+        if t.value == "(":
+            close = next((k for k in range(i + 1, len(tokens)) if tokens[k].value == ")"), -1)
+            if close != -1:
+                i = close + 1
+                gap = True
+                continue
+        out.append(_respaced(t, gap))
+        gap = False
+        i += 1
+    return out
 
 
 def _singularize(name: str) -> str:
@@ -129,6 +104,12 @@ def _singularize(name: str) -> str:
     return name
 
 
+# Distinct fragment texts seen by `_normalize_food_name` are few compared with
+# calls, so results are memoized; the least recently used are evicted past this.
+_NAME_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def _normalize_food_name(raw: str) -> str:
     n = normalize_whitespace(raw.lower())
     n = re.sub(r"[^a-z0-9\s\-']", "", n)
@@ -141,52 +122,141 @@ def _normalize_food_name(raw: str) -> str:
     return n
 
 
-def _detect_meal(text: str) -> str:
-    t = text.lower()
+@dataclass(frozen=True)
+class _MealRules:
+    keywords: dict[str, list[str]]
+    hinglish: list[tuple[str, re.Pattern[str]]]
+    skipped: list[tuple[str, re.Pattern[str]]]
+    # Meal rules in priority order (keywords per meal, then Hinglish
+    # patterns) and skipped-meal rules, as (scanner group, meal) pairs.
+    meal_groups: list[tuple[str, str]]
+    skipped_groups: list[tuple[str, str]]
+    scanner: re.Pattern[str]
+
+
+@lru_cache(maxsize=None)
+def _meal_rules() -> _MealRules:
+    """The rules from meals.json, compiled on first parse rather than at import.
+
+    Every rule is one named group in a single scanner. Its leading lookahead
+    finds each offset where any rule matches; every rule is then tried there
+    as an optional lookahead, so all the rules starting at one offset ("dinner
+    skip" is both a keyword and a skipped meal) are captured by one match and
+    nothing is consumed.
+    """
+
+    raw = meal_rules()
+    keywords: dict[str, list[str]] = raw["keywords"]
+    hinglish = [(meal, re.compile(pattern, re.IGNORECASE)) for meal, pattern in raw["hinglish_patterns"]]
+    skipped = [(meal, re.compile(pattern, re.IGNORECASE)) for meal, pattern in raw["skipped_patterns"]]
+
+    # Rules only ever see lowered text, so keywords are as case-insensitive as
+    # the patterns and the scanner can be compiled with one set of flags.
+    table = [
+        *(
+            (f"kw_{i}", meal, "|".join(r"\b" + re.escape(kw) + r"\b" for kw in kws))
+            for i, (meal, kws) in enumerate(keywords.items())
+            if kws
+        ),
+        *((f"hinglish_{i}", meal, pat.pattern) for i, (meal, pat) in enumerate(hinglish)),
+        *((f"skipped_{i}", meal, pat.pattern) for i, (meal, pat) in enumerate(skipped)),
+    ]
+    any_rule = "|".join(pattern for _, _, pattern in table)
+    each_rule = "".join(f"(?:(?=(?P<{group}>{pattern})))?" for group, _, pattern in table)
+
+    return _MealRules(
+        keywords=keywords,
+        hinglish=hinglish,
+        skipped=skipped,
+        meal_groups=[(g, meal) for g, meal, _ in table if not g.startswith("skipped_")],
+        skipped_groups=[(g, meal) for g, meal, _ in table if g.startswith("skipped_")],
+        scanner=re.compile(f"(?=(?:{any_rule})){each_rule}", re.IGNORECASE),
+    )
+
+
+def _scan_meal_rules(lowered: str) -> tuple[str, list[str]]:
+    """Return `(meal, skipped meals)` from a single pass over the entry.
+
+    The meal is the first of the meal rules, in priority order, that matched
+    anywhere; skipped meals keep their pattern order.
+    """
+
+    rules = _meal_rules()
+    hits: set[str] = set()
+    for m in rules.scanner.finditer(lowered):
+        hits.update(group for group, value in m.groupdict().items() if value is not None)
+    if not hits:
+        return "unknown", []
+
+    meal = next((meal for group, meal in rules.meal_groups if group in hits), "unknown")
+    return meal, [meal for group, meal in rules.skipped_groups if group in hits]
+
+
+# The surface-form index is cached by the contents of foods.txt alone: bump
+# the version when `_singularize` changes which spellings fold to a food.
+_SURFACE_FORMS_INDEX = "food_forms_v1"
+
+
+def _surface_forms(raw: str) -> Iterator[tuple[str, str]]:
+    """Every single-word food and each spelling `_singularize` folds into it."""
 
-    for meal, kws in _MEAL_KEYWORDS.items():
-        for kw in kws:
-            if re.search(rf"\b{re.escape(kw)}\b", t):
-                return meal
+    for food, _ in parse_word_list(raw):
+        if " " in food:
+            continue
+        forms = [food, food + "s"]
+        if food.endswith("y"):
+            forms.append(food[:-1] + "ies")
+        for form in forms:
+            if _singularize(form) == food:
+                yield form, food
 
-    for meal, pat in _HINGLISH_MEAL_PATTERNS:
-        if pat.search(text):
-            return meal
 
-    return "unknown"
+@lru_cache(maxsize=None)
+def _food_forms() -> TermIndex:
+    """Surface form (plural or not) to lexicon food, compiled next to the food index."""
 
+    return load_term_index(_SURFACE_FORMS_INDEX, lexicon_path("foods.txt"), _surface_forms)
+
+
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
+def _food_for_word(word: str) -> Optional[str]:
+    """The lexicon food a single word is a surface form of, or None.
+
+    One lookup in the surface-form index, memoized per distinct word.
+    """
 
-def _extract_known_foods(fragment: str) -> list[str]:
+    name = _food_forms().get(word)
+    return sys.intern(name) if name is not None else None
+
+
+def _extract_known_foods(tokens: list[Token]) -> list[str]:
     """Extract foods from a fragment by lexicon matching only.
 
     This intentionally avoids free-form NLP and only returns items found in the
     fixed lexicon.
     """
 
-    f = normalize_whitespace(fragment.lower())
-    f = re.sub(r"[^a-z0-9\s\-']", " ", f)
-    f = normalize_whitespace(f)
-    if not f:
-        return []
-
+    # Word tokens are already lowercase and stripped of punctuation, so
+    # singularizing is all `_normalize_food_name` would still do.
     found: list[str] = []
-
-    for phrase in _MULTIWORD_FOODS:
-        if re.search(rf"\b{re.escape(phrase)}\b", f):
-            found.append(_normalize_food_name(phrase))
-            f = re.sub(rf"\b{re.escape(phrase)}\b", " ", f)
-            f = normalize_whitespace(f)
-
-    tokens = [t for t in f.split(" ") if t and t not in _FRAGMENT_STOPWORDS]
     for t in tokens:
-        n = _normalize_food_name(t)
-        if n in _FOOD_LEXICON:
+        if not t.is_word or t.value in _FRAGMENT_STOPWORDS:
+            continue
+        n = _food_for_word(t.value)
+        if n is not None:
             found.append(n)
 
     return found
 
 
-@dataclass(frozen=True)
+_FOOD_JSON = '{"name": %s, "quantity": %s, "unit": %s, "meal": %s, "confidence": %s}'
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+@dataclass(frozen=True, slots=True)
 class FoodItem:
     name: str
     quantity: Optional[str]
@@ -194,6 +264,12 @@ class FoodItem:
     meal: str
     confidence: float
 
+    @classmethod
+    def make(cls, name: str, quantity: Optional[str], unit: Optional[str], meal: str, confidence: float) -> FoodItem:
+        """Build an item with its repeated strings interned, so bulk runs share them."""
+
+        return cls(sys.intern(name), _intern(quantity), _intern(unit), sys.intern(meal), confidence)
+
     def to_dict(self) -> dict:
         return {
             "name": self.name,
@@ -203,57 +279,114 @@ class FoodItem:
             "confidence": self.confidence,
         }
 
+    def to_json(self) -> str:
+        return _FOOD_JSON % (
+            json_str(self.name),
+            json_opt_str(self.quantity),
+            json_opt_str(self.unit),
+            json_str(self.meal),
+            json_value(self.confidence),
+        )
+
+
+def _lru_stats(info: Any) -> dict[str, int]:
+    # Every miss inserts one entry, so whatever is no longer held was evicted.
+    return {"hits": info.hits, "misses": info.misses, "evictions": info.misses - info.currsize, "size": info.currsize}
+
 
 class FoodParser:
+    @classmethod
+    def lexicon_payload(cls) -> dict:
+        """Everything this parser matches against, for fingerprinting."""
+
+        rules = _meal_rules()
+        return {
+            "foods": food_index().digest,
+            "meal_keywords": rules.keywords,
+            "stopwords": sorted(_FRAGMENT_STOPWORDS),
+            "meal_patterns": [(m, p.pattern) for m, p in rules.hinglish],
+            "skipped_patterns": [(m, p.pattern) for m, p in rules.skipped],
+        }
+
+    @classmethod
+    def name_cache_stats(cls) -> dict[str, int]:
+        """Counters for the memoized food-name normalization in this process."""
+
+        return _lru_stats(_normalize_food_name.cache_info())
+
+    @classmethod
+    def word_cache_stats(cls) -> dict[str, int]:
+        """Counters for the memoized per-word surface-form lookups in this process."""
+
+        return _lru_stats(_food_for_word.cache_info())
+
     @classmethod
     def parse(cls, text: str) -> list[dict]:
-        text = strip_non_text(text)
-        meal = _detect_meal(text)
+        return cls.parse_document(Document.from_text(text))
+
+    @classmethod
+    def parse_document(cls, doc: Document) -> list[dict]:
+        return [f.to_dict() for f in cls.parse_items(doc)]
+
+    @classmethod
+    def parse_items(cls, doc: Document) -> list[FoodItem]:
+        lexicon = food_index()
+        meal, skipped = _scan_meal_rules(doc.lowered)
         foods: list[FoodItem] = []
 
-        for skipped_meal, pat in _SKIPPED_MEAL_PATTERNS:
-            if pat.search(text):
-                foods.append(
-                    FoodItem(
-                        name="skipped_meal",
-                        quantity=None,
-                        unit=None,
-                        meal=skipped_meal,
-                        confidence=1.0,
-                    )
+        for skipped_meal in skipped:
+            foods.append(
+                FoodItem.make(
+                    name="skipped_meal",
+                    quantity=None,
+                    unit=None,
+                    meal=skipped_meal,
+                    confidence=1.0,
                 )
-
-        lowered = text.lower()
-        for phrase in _MULTIWORD_FOODS:
-            if phrase in lowered:
-                foods.append(
-                    FoodItem(
-                        name=_normalize_food_name(phrase),
-                        quantity=None,
-                        unit=None,
-                        meal=meal,
-                        confidence=0.85,
+            )
+
+        # Multiword foods are emitted ahead of everything else, longest
+        # lexicon phrase first, as when they were matched phrase by phrase.
+        multiword: list[tuple[int, FoodItem]] = []
+        for fragment in doc.fragments:
+            tokens: list[Token] = []
+            gap = False
+            i = 0
+            while i < len(fragment):
+                phrase = _match_multiword(fragment, i)
+                if phrase is not None:
+                    n = phrase.count(" ") + 1
+                    multiword.append(
+                        (
+                            len(phrase),
+                            FoodItem.make(
+                                name=_normalize_food_name(" ".join(t.value for t in fragment[i : i + n])),
+                                quantity=None,
+                                unit=None,
+                                meal=meal,
+                                confidence=0.85,
+                            ),
+                        )
                     )
-                )
-                lowered = lowered.replace(phrase, " ")
-
-        parts = split_on_separators(lowered)
-        for part in parts:
-            if not part:
-                continue
+                    i += n
+                    gap = True
+                    continue
+                tokens.append(_respaced(fragment[i], gap))
+                gap = False
+                i += 1
 
-            part = normalize_whitespace(part)
-            if not part:
+            if not tokens:
                 continue
+            part = join_tokens(tokens)
 
             m2 = _NAME_THEN_QTY_UNIT.search(part)
             if m2:
                 name = _normalize_food_name(m2.group("name"))
                 qty = m2.group("qty")
                 unit = m2.group("unit")
-                if name in _FOOD_LEXICON:
+                if name in lexicon:
                     foods.append(
-                        FoodItem(
+                        FoodItem.make(
                             name=name,
                             quantity=qty,
                             unit=unit.lower() if unit else None,
@@ -269,9 +402,9 @@ class FoodParser:
                 unit = m.group("unit")
                 raw_name = m.group("name")
                 name = _normalize_food_name(raw_name)
-                if name in _FOOD_LEXICON:
+                if name in lexicon:
                     foods.append(
-                        FoodItem(
+                        FoodItem.make(
                             name=name,
                             quantity=qty,
                             unit=unit.lower() if unit else None,
@@ -284,12 +417,11 @@ class FoodParser:
             par = _QTY_IN_PARENS.search(part)
             par_qty = par.group("qty") if par else None
             par_unit = par.group("unit") if par else None
-            cleaned = re.sub(r"\([^)]*\)", " ", part)
-            cleaned = normalize_whitespace(cleaned)
+            cleaned = join_tokens(_drop_parenthesized(tokens))
 
-            if cleaned in _FOOD_LEXICON:
+            if cleaned in lexicon:
                 foods.append(
-                    FoodItem(
+                    FoodItem.make(
                         name=_normalize_food_name(cleaned),
                         quantity=par_qty,
                         unit=par_unit.lower() if par_unit else None,
@@ -300,9 +432,9 @@ class FoodParser:
                 continue
 
             cleaned = _normalize_food_name(cleaned)
-            if cleaned in _FOOD_LEXICON:
+            if cleaned in lexicon:
                 foods.append(
-                    FoodItem(
+                    FoodItem.make(
                         name=cleaned,
                         quantity=par_qty,
                         unit=par_unit.lower() if par_unit else None,
@@ -311,10 +443,10 @@ class FoodParser:
                     )
                 )
 
-            if cleaned not in _FOOD_LEXICON:
-                for name in _extract_known_foods(part):
+            if cleaned not in lexicon:
+                for name in _extract_known_foods(tokens):
                     foods.append(
-                        FoodItem(
+                        FoodItem.make(
                             name=name,
                             quantity=par_qty,
                             unit=par_unit.lower() if par_unit else None,
@@ -323,10 +455,11 @@ class FoodParser:
                         )
                     )
 
+        multiword.sort(key=lambda m: -m[0])
         deduped: dict[tuple[str, str, Optional[str], Optional[str]], FoodItem] = {}
-        for f in foods:
+        for f in chain(foods[: len(skipped)], (item for _, item in multiword), foods[len(skipped) :]):
             key = (f.name, f.meal, f.quantity, f.unit)
             if key not in deduped or deduped[key].confidence < f.confidence:
                 deduped[key] = f
 
-        return [f.to_dict() for f in deduped.values()]
+        return list(deduped.values())
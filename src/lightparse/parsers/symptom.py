@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import re
+import sys
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
-from lightparse.utils.text import normalize_whitespace, strip_non_text
+from lightparse.utils.jsonout import json_opt_str, json_str, json_value
+from lightparse.utils.lexicon import symptom_index
+from lightparse.utils.text import Document
 
 
 _SEVERITY_RE = re.compile(r"\b(?P<sev>\d{1,2})\s*/\s*10\b")
@@ -30,60 +34,105 @@ _IGNORE_PATTERNS: list[re.Pattern[str]] = [
 ]
 
 
-_SYMPTOM_LEXICON: dict[str, list[str]] = {
-    "cramps": ["cramps", "cramp"],
-    "bloating": ["bloated", "bloating"],
-    "gas": ["gas", "gassy"],
-    "headache": ["headache"],
-    "migraine": ["migraine"],
-    "back pain": ["back pain"],
-    "stomach pain": ["stomach pain", "stomachache"],
-    "fever": ["fever"],
-    "dizziness": ["dizzy", "dizziness"],
-    "fatigue": ["fatigue", "tired", "low energy"],
-    "nausea": ["nausea", "nauseous"],
-    "sore throat": ["sore throat"],
-    "skin breakout": ["skin breakout", "breakout", "acne"],
-    "jitteriness": ["jittery"],
-    "palpitations": ["heart racing"],
-    "sleepy": ["sleepy"],
-    "heavy": ["felt heavy", "heavy"],
-}
-
-
-_EXCLUDED_TERMS = {
-    "mood",
-    "anxiety",
-}
-
-
-def _infer_time_hint(text: str) -> Optional[str]:
-    for hint, pat in _TIME_HINT_PATTERNS:
-        if pat.search(text):
-            return hint
-    return None
-
-
-def _find_severity(text: str) -> Optional[int]:
-    m = _SEVERITY_RE.search(text)
-    if not m:
+_SEVERITY_BOOSTED = {"migraine", "back pain", "headache", "cramps"}
+
+
+# Negation cues only reach a few tokens forward ("no headache or nausea") and
+# are cut short by contrast words ("no headache but bloated").
+_NEGATION_SCOPE_TOKENS = 3
+_CONTRAST_WORDS = {"but", "though", "although", "however"}
+
+
+_BOUNDARY = re.compile(r"\b")
+
+
+def _match_variant(lowered: str, start: int) -> tuple[int, Optional[str]]:
+    """Return `(end, canonical)` for the longest symptom variant at `start`.
+
+    Candidate ends are word boundaries, tried left to right while the text so
+    far is still a prefix of some variant, so most words cost one memoized
+    prefix probe. The variant may carry a plural "s" ("headaches").
+    Returns `(start, None)` when no variant starts here.
+    """
+
+    lexicon = symptom_index()
+    found: tuple[int, Optional[str]] = (start, None)
+    for b in _BOUNDARY.finditer(lowered, start + 1):
+        end = b.end()
+        phrase = lowered[start:end]
+        canonical = lexicon.get(phrase)
+        if canonical is None and phrase.endswith("s"):
+            canonical = lexicon.get(phrase[:-1])
+        if canonical is not None:
+            # Canonical names are interned so every SymptomItem shares one copy.
+            found = (end, sys.intern(canonical))
+        if not lexicon.has_prefix(phrase):
+            break
+    return found
+
+
+@lru_cache(maxsize=None)
+def _scanner() -> re.Pattern[str]:
+    """Every symptom-side pattern as one alternation, compiled on first parse.
+
+    Alternatives are tried in order at each offset, so vitals are consumed
+    before anything else and "not now" wins over a bare "not". Every other
+    word still produces a match so token distances can be measured without a
+    second pass. Symptom variants are looked up in the lexicon index at each
+    match that starts a word, and take precedence over negation cues and time
+    hints there.
+    """
+
+    return re.compile(
+        "|".join(
+            [
+                "(?P<ignore>" + "|".join(p.pattern for p in _IGNORE_PATTERNS) + ")",
+                "(?P<severity>" + _SEVERITY_RE.pattern + ")",
+                "(?P<post_neg>" + _POST_NEGATION_HINTS.pattern + ")",
+                "(?P<neg>" + _NEGATION_RE.pattern + ")",
+                *[f"(?P<hint_{hint}>{pat.pattern})" for hint, pat in _TIME_HINT_PATTERNS],
+                r"(?P<stop>[.!?;](?!\d)|\n)",
+                r"(?P<word>[a-z0-9']+)",
+            ]
+        )
+    )
+
+
+# Scanner groups at which a symptom variant may start instead.
+_WORD_KINDS = {"post_neg", "neg", "word", *(f"hint_{hint}" for hint, _ in _TIME_HINT_PATTERNS)}
+
+
+_HINT_PRIORITY = {hint: i for i, (hint, _) in enumerate(_TIME_HINT_PATTERNS)}
+
+# Scanner group name -> hint, so every match reuses the same string object.
+_HINT_GROUPS = {f"hint_{hint}": hint for hint in _HINT_PRIORITY}
+
+
+@dataclass
+class _Span:
+    canonical: str
+    token: int
+    negated: bool
+
+
+def _nearest_severity(token: int, marks: list[tuple[int, int]]) -> Optional[int]:
+    if not marks:
         return None
-    try:
-        sev = int(m.group("sev"))
-    except ValueError:
+    return min(marks, key=lambda m: abs(m[0] - token))[1]
+
+
+def _nearest_hint(token: int, marks: list[tuple[int, str]]) -> Optional[str]:
+    """Pick the hint closest to `token`; ties keep the pattern priority order."""
+
+    if not marks:
         return None
-    if 0 <= sev <= 10:
-        return sev
-    return None
+    return min(marks, key=lambda m: (abs(m[0] - token), _HINT_PRIORITY[m[1]]))[1]
 
 
-def _is_negated(around_text: str) -> bool:
-    if _NEGATION_RE.search(around_text):
-        return True
-    return bool(_POST_NEGATION_HINTS.search(around_text))
+_SYMPTOM_JSON = '{"name": %s, "severity": %s, "time_hint": %s, "negated": %s, "confidence": %s}'
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SymptomItem:
     name: str
     severity: Optional[int]
@@ -100,54 +149,130 @@ class SymptomItem:
             "confidence": self.confidence,
         }
 
+    def to_json(self) -> str:
+        return _SYMPTOM_JSON % (
+            json_str(self.name),
+            json_value(self.severity),
+            json_opt_str(self.time_hint),
+            "true" if self.negated else "false",
+            json_value(self.confidence),
+        )
+
 
 class SymptomParser:
+    @classmethod
+    def lexicon_payload(cls) -> dict:
+        """Everything this parser matches against, for fingerprinting."""
+
+        return {
+            "symptoms": symptom_index().digest,
+            "time_hints": [(h, p.pattern) for h, p in _TIME_HINT_PATTERNS],
+            "ignore": [p.pattern for p in _IGNORE_PATTERNS],
+            "negation": [_NEGATION_RE.pattern, _POST_NEGATION_HINTS.pattern],
+        }
+
     @classmethod
     def parse(cls, text: str) -> list[dict]:
-        text = strip_non_text(text)
-        lowered = text.lower()
+        return cls.parse_document(Document.from_text(text))
 
-        for pat in _IGNORE_PATTERNS:
-            lowered = pat.sub(" ", lowered)
+    @classmethod
+    def parse_document(cls, doc: Document) -> list[dict]:
+        return [s.to_dict() for s in cls.parse_items(doc)]
 
-        severity = _find_severity(lowered)
-        time_hint = _infer_time_hint(lowered)
+    @classmethod
+    def parse_items(cls, doc: Document) -> list[SymptomItem]:
+        lowered = doc.lowered
 
         results: list[SymptomItem] = []
-
-        for canonical, variants in _SYMPTOM_LEXICON.items():
-            for v in sorted(variants, key=len, reverse=True):
-                idx = lowered.find(v)
-                if idx == -1:
-                    continue
-
-                left = max(0, idx - 30)
-                right = min(len(lowered), idx + len(v) + 30)
-                around = lowered[left:right]
-                negated = _is_negated(around)
-
-                confidence = 0.85
-                if negated:
-                    confidence = 0.95
-                if severity is not None and canonical in {"migraine", "back pain", "headache", "cramps"}:
-                    confidence = min(1.0, confidence + 0.05)
-
-                results.append(
-                    SymptomItem(
-                        name=canonical,
-                        severity=severity,
-                        time_hint=time_hint,
-                        negated=negated,
-                        confidence=confidence,
-                    )
+        entry_severity: Optional[int] = None
+        entry_hints: set[str] = set()
+
+        # Per-clause state. Severity and time hints are resolved per span from
+        # the nearest mark in the same clause, falling back to the entry-wide
+        # value once the whole text has been scanned.
+        spans: list[_Span] = []
+        severities: list[tuple[int, int]] = []
+        hints: list[tuple[int, str]] = []
+        pending: list[tuple[str, bool, Optional[int], Optional[str]]] = []
+        last_neg: Optional[int] = None
+        token = 0
+
+        def _close_clause() -> None:
+            for span in spans:
+                severity = _nearest_severity(span.token, severities)
+                hint = _nearest_hint(span.token, hints)
+                pending.append((span.canonical, span.negated, severity, hint))
+            spans.clear()
+            severities.clear()
+            hints.clear()
+
+        scanner = _scanner()
+        pos = 0
+        while True:
+            m = scanner.search(lowered, pos)
+            if m is None:
+                break
+            kind = m.lastgroup
+            pos = m.end()
+            if kind == "stop":
+                _close_clause()
+                last_neg = None
+                continue
+            if kind == "ignore":
+                continue
+
+            token += 1
+            canonical = None
+            if kind in _WORD_KINDS:
+                end, canonical = _match_variant(lowered, m.start())
+            if canonical is not None:
+                pos = end
+                negated = last_neg is not None and token - last_neg <= _NEGATION_SCOPE_TOKENS
+                spans.append(_Span(canonical, token, negated))
+            elif kind == "word":
+                if m.group(0) in _CONTRAST_WORDS:
+                    last_neg = None
+            elif kind == "neg":
+                last_neg = token
+            elif kind == "post_neg":
+                for span in spans:
+                    span.negated = True
+                last_neg = token
+            elif kind == "severity":
+                sev = int(m.group("sev"))
+                if 0 <= sev <= 10:
+                    severities.append((token, sev))
+                    if entry_severity is None:
+                        entry_severity = sev
+            else:
+                hint = _HINT_GROUPS[kind]
+                hints.append((token, hint))
+                entry_hints.add(hint)
+
+        _close_clause()
+
+        entry_hint = min(entry_hints, key=_HINT_PRIORITY.__getitem__) if entry_hints else None
+        for canonical, negated, severity, hint in pending:
+            if severity is None:
+                severity = entry_severity
+            if hint is None:
+                hint = entry_hint
+
+            confidence = 0.85
+            if negated:
+                confidence = 0.95
+            if severity is not None and canonical in _SEVERITY_BOOSTED:
+                confidence = min(1.0, confidence + 0.05)
+
+            results.append(
+                SymptomItem(
+                    name=canonical,
+                    severity=severity,
+                    time_hint=hint,
+                    negated=negated,
+                    confidence=confidence,
                 )
-
-                lowered = lowered.replace(v, " ")
-
-        cleaned = normalize_whitespace(lowered)
-        for term in _EXCLUDED_TERMS:
-            if re.search(rf"\b{re.escape(term)}\b", cleaned):
-                pass
+            )
 
         deduped: dict[tuple[str, bool, Optional[int], Optional[str]], SymptomItem] = {}
         for s in results:
@@ -155,4 +280,4 @@ class SymptomParser:
             if key not in deduped or deduped[key].confidence < s.confidence:
                 deduped[key] = s
 
-        return [s.to_dict() for s in deduped.values()]
+        return list(deduped.values())
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from lightparse.parsers.food import FoodItem
+from lightparse.parsers.symptom import SymptomItem
+from lightparse.utils.jsonout import json_array
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+ParsedSignals = tuple[tuple[FoodItem, ...], tuple[SymptomItem, ...]]
+
+
+# Commit the on-disk tier every this many writes; `flush()` commits the rest.
+_DISK_COMMIT_EVERY = 512
+
+
+class ParseCache:
+    """Content-addressed cache of parser output.
+
+    Entries are keyed by a hash of the normalized (lowered) text, the parser
+    version and the lexicon fingerprint, so the same text parsed by the same
+    parser and lexicons is only parsed once, and a lexicon edit misses. A
+    bounded in-process LRU sits in front of an optional SQLite file that
+    survives across runs and can be shared by worker processes. Cached
+    records are immutable, so hits are handed out without copying.
+    """
+
+    def __init__(self, max_entries: int = 10_000, path: Optional[Path] = None) -> None:
+        self.max_entries = max_entries
+        self._lru: OrderedDict[str, ParsedSignals] = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._pending_writes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path is not None:
+            # Imported here so in-memory-only runs don't pay for sqlite3 at startup.
+            import sqlite3
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache (key TEXT PRIMARY KEY, foods TEXT NOT NULL, symptoms TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def key(lowered: str, parser_version: str, fingerprint: str = "") -> str:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(parser_version.encode("utf-8"))
+        h.update(b"\0")
+        h.update(fingerprint.encode("utf-8"))
+        h.update(b"\0")
+        h.update(lowered.encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[ParsedSignals]:
+        value = self._lru.get(key)
+        if value is not None:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return value
+
+        if self._db is not None:
+            row = self._db.execute("SELECT foods, symptoms FROM parse_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value = (
+                    tuple(FoodItem.make(**f) for f in json.loads(row[0])),
+                    tuple(SymptomItem(**s) for s in json.loads(row[1])),
+                )
+                self._remember(key, value)
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, foods: Sequence[FoodItem], symptoms: Sequence[SymptomItem]) -> None:
+        foods, symptoms = tuple(foods), tuple(symptoms)
+        self._remember(key, (foods, symptoms))
+
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR IGNORE INTO parse_cache (key, foods, symptoms) VALUES (?, ?, ?)",
+                (key, json_array(f.to_json() for f in foods), json_array(s.to_json() for s in symptoms)),
+            )
+            self._pending_writes += 1
+            if self._pending_writes >= _DISK_COMMIT_EVERY:
+                self.flush()
+
+    def flush(self) -> None:
+        if self._db is not None and self._pending_writes:
+            self._db.commit()
+            self._pending_writes = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._lru),
+        }
+
+    def _remember(self, key: str, value: ParsedSignals) -> None:
+        if self.max_entries <= 0:
+            return
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Protocol
+
+
+class StatsSink(Protocol):
+    def emit(self, snapshot: dict[str, Any]) -> None: ...
+
+
+# Counters reported for each watched cache; they add up across processes.
+_CACHE_COUNTERS = ("hits", "misses", "evictions")
+
+
+class Instrumentation:
+    """Per-stage wall time, pattern hit counts, cache counters and the slowest entries.
+
+    Attach one to `LightParsePipeline(instrumentation=...)`; when none is
+    attached the pipeline skips every timing call. Snapshots are plain dicts
+    so worker processes can send theirs back to be merged.
+    """
+
+    def __init__(self, slowest: int = 10, sinks: Iterable[StatsSink] = ()) -> None:
+        self.slowest_n = slowest
+        self.sinks = list(sinks)
+        self._cache_probes: dict[str, Callable[[], dict[str, int]]] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        self.entries = 0
+        self.stage_seconds: dict[str, float] = {}
+        self.stage_calls: dict[str, int] = {}
+        self.pattern_hits: Counter[str] = Counter()
+        self.cache_counts: dict[str, Counter[str]] = {}
+        # Probe readings at the last reset; snapshots report growth since then.
+        self._cache_base = {name: probe() for name, probe in self._cache_probes.items()}
+        # Min-heap of (seconds, entry_id), so the fastest of the kept entries is evicted first.
+        self._slowest: list[tuple[float, str]] = []
+
+    def add_time(self, stage: str, seconds: float, calls: int = 1) -> None:
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+        self.stage_calls[stage] = self.stage_calls.get(stage, 0) + calls
+
+    def watch_cache(self, name: str, probe: Callable[[], dict[str, int]]) -> None:
+        """Include a process-wide cache's counters, as read by `probe()`, in snapshots."""
+
+        if name not in self._cache_probes:
+            self._cache_probes[name] = probe
+            self._cache_base[name] = probe()
+
+    def _cache_snapshot(self) -> dict[str, dict[str, Any]]:
+        totals = {name: Counter(counts) for name, counts in self.cache_counts.items()}
+        for name, probe in self._cache_probes.items():
+            now, base = probe(), self._cache_base[name]
+            totals.setdefault(name, Counter()).update({k: now[k] - base.get(k, 0) for k in _CACHE_COUNTERS})
+
+        out: dict[str, dict[str, Any]] = {}
+        for name in sorted(totals):
+            row: dict[str, Any] = {k: totals[name][k] for k in _CACHE_COUNTERS}
+            lookups = row["hits"] + row["misses"]
+            row["hit_rate"] = round(row["hits"] / lookups, 4) if lookups else 0.0
+            out[name] = row
+        return out
+
+    def record_entry(self, entry_id: Any, seconds: float) -> None:
+        self.entries += 1
+        self._keep_slowest(seconds, str(entry_id))
+
+    def _keep_slowest(self, seconds: float, entry_id: str) -> None:
+        if self.slowest_n <= 0:
+            return
+        item = (seconds, entry_id)
+        if len(self._slowest) < self.slowest_n:
+            heapq.heappush(self._slowest, item)
+        elif item > self._slowest[0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def count_hits(self, foods: Iterable[Any], symptoms: Iterable[Any]) -> None:
+        """Count hits from `FoodItem` / `SymptomItem` records."""
+
+        hits = self.pattern_hits
+        for f in foods:
+            hits["food:" + f.name] += 1
+            if f.meal:
+                hits["meal:" + f.meal] += 1
+        for s in symptoms:
+            hits["symptom:" + s.name] += 1
+            if s.negated:
+                hits["negation"] += 1
+            if s.severity is not None:
+                hits["severity"] += 1
+            if s.time_hint:
+                hits["time_hint:" + s.time_hint] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "entries": self.entries,
+            "stages": {
+                name: {"seconds": round(self.stage_seconds[name], 6), "calls": self.stage_calls.get(name, 0)}
+                for name in sorted(self.stage_seconds)
+            },
+            "pattern_hits": dict(sorted(self.pattern_hits.items())),
+            "caches": self._cache_snapshot(),
+            "slowest": [
+                {"entry_id": entry_id, "ms": round(seconds * 1000, 3)}
+                for seconds, entry_id in sorted(self._slowest, reverse=True)
+            ],
+        }
+
+    def merge(self, snapshot: dict[str, Any]) -> None:
+        """Fold a snapshot from another process into this one."""
+
+        for name, row in snapshot.get("stages", {}).items():
+            self.add_time(name, float(row["seconds"]), int(row["calls"]))
+        self.pattern_hits.update(snapshot.get("pattern_hits", {}))
+        for name, row in snapshot.get("caches", {}).items():
+            self.cache_counts.setdefault(name, Counter()).update({k: int(row.get(k, 0)) for k in _CACHE_COUNTERS})
+        for row in snapshot.get("slowest", []):
+            self._keep_slowest(float(row["ms"]) / 1000, str(row["entry_id"]))
+        self.entries += int(snapshot.get("entries", 0))
+
+    def emit(self) -> dict[str, Any]:
+        snapshot = self.snapshot()
+        for sink in self.sinks:
+            sink.emit(snapshot)
+        return snapshot
+
+
+class DictSink:
+    """Keep the latest snapshot in a caller-owned dict."""
+
+    def __init__(self, target: Optional[dict[str, Any]] = None) -> None:
+        self.target = target if target is not None else {}
+
+    def emit(self, snapshot: dict[str, Any]) -> None:
+        self.target.clear()
+        self.target.update(snapshot)
+
+
+class JsonLogSink:
+    """Append each snapshot as one JSON line, stamped with the wall-clock time."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    def emit(self, snapshot: dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"ts": time.time(), **snapshot}, ensure_ascii=False))
+            f.write("\n")
+
+
+def _prom_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class PrometheusTextSink:
+    """Write the snapshot in Prometheus text format, e.g. for node_exporter's textfile collector."""
+
+    def __init__(self, path: Path, prefix: str = "lightparse") -> None:
+        self.path = Path(path)
+        self.prefix = prefix
+
+    def render(self, snapshot: dict[str, Any]) -> str:
+        p = self.prefix
+        lines = [f"# TYPE {p}_entries_total counter", f"{p}_entries_total {snapshot['entries']}"]
+
+        lines.append(f"# TYPE {p}_stage_seconds_total counter")
+        for name, row in snapshot["stages"].items():
+            lines.append(f'{p}_stage_seconds_total{{stage="{_prom_label(name)}"}} {row["seconds"]}')
+        lines.append(f"# TYPE {p}_stage_calls_total counter")
+        for name, row in snapshot["stages"].items():
+            lines.append(f'{p}_stage_calls_total{{stage="{_prom_label(name)}"}} {row["calls"]}')
+
+        lines.append(f"# TYPE {p}_pattern_hits_total counter")
+        for name, count in snapshot["pattern_hits"].items():
+            lines.append(f'{p}_pattern_hits_total{{pattern="{_prom_label(name)}"}} {count}')
+
+        for counter in _CACHE_COUNTERS:
+            lines.append(f"# TYPE {p}_cache_{counter}_total counter")
+            for name, row in snapshot.get("caches", {}).items():
+                lines.append(f'{p}_cache_{counter}_total{{cache="{_prom_label(name)}"}} {row[counter]}')
+
+        lines.append(f"# TYPE {p}_slowest_entry_seconds gauge")
+        for row in snapshot["slowest"]:
+            lines.append(f'{p}_slowest_entry_seconds{{entry_id="{_prom_label(row["entry_id"])}"}} {row["ms"] / 1000}')
+        return "\n".join(lines) + "\n"
+
+    def emit(self, snapshot: dict[str, Any]) -> None:
+        # Scrapers may read at any moment, so replace the file atomically.
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(self.render(snapshot), encoding="utf-8")
+        os.replace(tmp, self.path)
@@ -1,42 +1,193 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, Sequence
 
-from lightparse.parsers.food import FoodParser
-from lightparse.parsers.symptom import SymptomParser
+from lightparse.parsers.food import FoodItem, FoodParser
+from lightparse.parsers.symptom import SymptomItem, SymptomParser
+from lightparse.pipeline.cache import ParseCache
+from lightparse.utils.jsonout import json_array, json_value
+from lightparse.utils.text import Document
+from lightparse.utils.timestamps import normalize_timestamp
+
+if TYPE_CHECKING:
+    from lightparse.pipeline.instrument import Instrumentation
+
+
+@lru_cache(maxsize=1)
+def lexicon_fingerprint() -> str:
+    """Short hash of the parsers' lexicons and rule tables.
+
+    Stored alongside parsed entries so a lexicon change marks them stale even
+    when `parser_version` was not bumped.
+    """
+
+    payload = {"food": FoodParser.lexicon_payload(), "symptom": SymptomParser.lexicon_payload()}
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(blob, digest_size=8).hexdigest()
+
+
+@dataclass(slots=True)
+class ParsedEntry:
+    """Pipeline result for one entry, holding the parsers' records as-is.
+
+    `to_json()` writes the same JSON as `json.dumps(to_dict())` without
+    building the dicts first. `user_id` and `timestamp` are carried over from
+    the input and only written when present.
+    """
+
+    entry_id: Any
+    foods: Sequence[FoodItem]
+    symptoms: Sequence[SymptomItem]
+    parse_errors: list[str]
+    parser_version: str
+    user_id: Optional[str] = None
+    timestamp: Optional[str] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {"entry_id": self.entry_id}
+        if self.user_id is not None:
+            out["user_id"] = self.user_id
+        if self.timestamp is not None:
+            out["timestamp"] = self.timestamp
+        out.update(
+            foods=[f.to_dict() for f in self.foods],
+            symptoms=[s.to_dict() for s in self.symptoms],
+            parse_errors=list(self.parse_errors),
+            parser_version=self.parser_version,
+        )
+        return out
+
+    def to_json(self) -> str:
+        extra = ""
+        if self.user_id is not None:
+            extra += f'"user_id": {json_value(self.user_id)}, '
+        if self.timestamp is not None:
+            extra += f'"timestamp": {json_value(self.timestamp)}, '
+        return (
+            f'{{"entry_id": {json_value(self.entry_id)}, {extra}'
+            f'"foods": {json_array(f.to_json() for f in self.foods)}, '
+            f'"symptoms": {json_array(s.to_json() for s in self.symptoms)}, '
+            f'"parse_errors": {json_array(json_value(e) for e in self.parse_errors)}, '
+            f'"parser_version": {json_value(self.parser_version)}}}'
+        )
 
 
 @dataclass(frozen=True)
 class LightParsePipeline:
     parser_version: str = "v1"
+    cache: Optional[ParseCache] = field(default=None, compare=False, repr=False)
+    instrumentation: Optional[Instrumentation] = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.instrumentation is not None:
+            self.instrumentation.watch_cache("food_names", FoodParser.name_cache_stats)
+            self.instrumentation.watch_cache("food_words", FoodParser.word_cache_stats)
 
     def run(self, entry: dict[str, Any]) -> dict[str, Any]:
+        return self._run_one(entry).to_dict()
+
+    def run_many(self, entries: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        return list(self.iter_run(entries))
+
+    def iter_run(self, entries: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        """Lazily parse `entries`, yielding exactly one result per entry in order."""
+
+        for entry in entries:
+            yield self._run_one(entry).to_dict()
+
+    def iter_records(self, entries: Iterable[dict[str, Any]]) -> Iterator[ParsedEntry]:
+        """Like `iter_run`, but yield `ParsedEntry` records instead of dicts."""
+
+        for entry in entries:
+            yield self._run_one(entry)
+
+    def run_record(self, entry: dict[str, Any]) -> ParsedEntry:
+        """Parse one entry into a `ParsedEntry` record."""
+
+        return self._run_one(entry)
+
+    def _run_one(self, entry: dict[str, Any]) -> ParsedEntry:
+        inst = self.instrumentation
+        if inst is None:
+            return self._parse_entry(entry, None)
+
+        started = time.perf_counter()
+        output = self._parse_entry(entry, inst)
+        inst.record_entry(output.entry_id, time.perf_counter() - started)
+        inst.count_hits(output.foods, output.symptoms)
+        return output
+
+    def _parse_entry(self, entry: dict[str, Any], inst: Optional[Instrumentation]) -> ParsedEntry:
+        output = ParsedEntry(entry_id=None, foods=(), symptoms=(), parse_errors=[], parser_version=self.parser_version)
+
+        if not isinstance(entry, dict):
+            output.parse_errors.append("invalid_entry")
+            return output
+
         entry_id = entry.get("entry_id")
         text = entry.get("text", "")
-
-        output: dict[str, Any] = {
-            "entry_id": entry_id,
-            "foods": [],
-            "symptoms": [],
-            "parse_errors": [],
-            "parser_version": self.parser_version,
-        }
+        output.entry_id = entry_id
 
         if not entry_id:
-            output["parse_errors"].append("missing_entry_id")
+            output.parse_errors.append("missing_entry_id")
         if not isinstance(text, str):
-            output["parse_errors"].append("invalid_text")
+            output.parse_errors.append("invalid_text")
             text = ""
 
+        user_id = entry.get("user_id")
+        if user_id is not None:
+            output.user_id = str(user_id)
+        timestamp = entry.get("timestamp")
+        if timestamp is not None:
+            output.timestamp = normalize_timestamp(timestamp)
+            if output.timestamp is None:
+                output.parse_errors.append("invalid_timestamp")
+
+        # Timing is skipped entirely when no instrumentation is attached.
+        clock = time.perf_counter
+        if inst is not None:
+            mark = clock()
+
+        doc = Document.from_text(text)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ParseCache.key(doc.lowered, self.parser_version, lexicon_fingerprint())
+            cached = self.cache.get(cache_key)
+            if inst is not None:
+                now = clock()
+                inst.add_time("cache_lookup", now - mark)
+                mark = now
+            if cached is not None:
+                output.foods, output.symptoms = cached
+                return output
+
+        parser_failed = False
         try:
-            output["foods"] = FoodParser.parse(text)
+            output.foods = FoodParser.parse_items(doc)
         except Exception as e:  # noqa: BLE001
-            output["parse_errors"].append(f"food_parser_error:{type(e).__name__}")
+            output.parse_errors.append(f"food_parser_error:{type(e).__name__}")
+            parser_failed = True
+        if inst is not None:
+            now = clock()
+            inst.add_time("food", now - mark)
+            mark = now
 
         try:
-            output["symptoms"] = SymptomParser.parse(text)
+            output.symptoms = SymptomParser.parse_items(doc)
         except Exception as e:  # noqa: BLE001
-            output["parse_errors"].append(f"symptom_parser_error:{type(e).__name__}")
+            output.parse_errors.append(f"symptom_parser_error:{type(e).__name__}")
+            parser_failed = True
+        if inst is not None:
+            inst.add_time("symptom", clock() - mark)
+
+        # Only clean parses are cached, so a parser failure is retried next time.
+        if self.cache is not None and cache_key is not None and not parser_failed:
+            self.cache.put(cache_key, output.foods, output.symptoms)
 
         return output
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import queue
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+from lightparse.pipeline.cache import ParseCache
+from lightparse.pipeline.light_pipeline import LightParsePipeline
+
+if TYPE_CHECKING:
+    from multiprocessing.pool import AsyncResult
+
+    from lightparse.pipeline.instrument import Instrumentation
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+# Set in each pool worker by `init_worker` so its cache lives across chunks.
+_worker_pipeline: Optional[LightParsePipeline] = None
+
+
+def make_pipeline(
+    parser_version: str,
+    cache_size: int = 0,
+    cache_path: Optional[str] = None,
+    instrumentation: Optional[Instrumentation] = None,
+) -> LightParsePipeline:
+    cache = None
+    if cache_size > 0 or cache_path:
+        cache = ParseCache(max_entries=cache_size, path=Path(cache_path) if cache_path else None)
+    return LightParsePipeline(parser_version=parser_version, cache=cache, instrumentation=instrumentation)
+
+
+def init_worker(parser_version: str, cache_size: int, cache_path: Optional[str], slowest: Optional[int] = None) -> None:
+    """Pool initializer; `slowest` turns on instrumentation in the worker when not None."""
+
+    global _worker_pipeline
+    instrumentation = None
+    if slowest is not None:
+        from lightparse.pipeline.instrument import Instrumentation
+
+        instrumentation = Instrumentation(slowest=slowest)
+    _worker_pipeline = make_pipeline(parser_version, cache_size, cache_path, instrumentation)
+
+
+def worker_pipeline() -> LightParsePipeline:
+    global _worker_pipeline
+    if _worker_pipeline is None:
+        _worker_pipeline = LightParsePipeline()
+    return _worker_pipeline
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    chunk: list[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_pool_chunks(
+    pool: Any,
+    func: Callable[[list[T]], list[R]],
+    chunks: Iterable[list[T]],
+    max_in_flight: int,
+    unordered: bool = False,
+) -> Iterator[list[R]]:
+    """Feed chunks to the pool while keeping at most `max_in_flight` outstanding.
+
+    `Pool.imap` drains its input eagerly, which would pull a whole export into
+    memory; submitting through a bounded window keeps RSS flat. Results are
+    yielded per chunk, in submission order unless `unordered` is set.
+    """
+
+    if not unordered:
+        pending: deque[AsyncResult] = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(func, (chunk,)))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+        return
+
+    done: queue.Queue = queue.Queue()
+    in_flight = 0
+
+    def _take() -> list[R]:
+        item = done.get()
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    for chunk in chunks:
+        pool.apply_async(func, (chunk,), callback=done.put, error_callback=done.put)
+        in_flight += 1
+        if in_flight >= max_in_flight:
+            yield _take()
+            in_flight -= 1
+    while in_flight:
+        yield _take()
+        in_flight -= 1
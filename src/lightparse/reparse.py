@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from itertools import tee
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from lightparse.pipeline.light_pipeline import lexicon_fingerprint
+from lightparse.pipeline.parallel import chunked, init_worker, iter_pool_chunks, make_pipeline, worker_pipeline
+from lightparse.store import StoredEntry, backend_for_path
+
+
+_CHECKPOINT_SUFFIX = ".reparse.json"
+
+
+@dataclass
+class ReparseReport:
+    scanned: int = 0
+    reparsed: int = 0
+    resumed_after: Optional[str] = None
+    elapsed: float = 0.0
+
+
+def _checkpoint_path(store: Path) -> Path:
+    return store.with_name(store.name + _CHECKPOINT_SUFFIX)
+
+
+def _read_checkpoint(store: Path, parser_version: str, fingerprint: str) -> Optional[str]:
+    """Return the last entry_id handled by an unfinished run for the same target."""
+
+    try:
+        obj = json.loads(_checkpoint_path(store).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(obj, dict):
+        return None
+    if obj.get("parser_version") != parser_version or obj.get("lexicon_fingerprint") != fingerprint:
+        return None
+    after = obj.get("after")
+    return after if isinstance(after, str) else None
+
+
+def _write_checkpoint(store: Path, after: str, parser_version: str, fingerprint: str) -> None:
+    path = _checkpoint_path(store)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(
+        json.dumps({"after": after, "parser_version": parser_version, "lexicon_fingerprint": fingerprint}),
+        encoding="utf-8",
+    )
+    os.replace(tmp, path)
+
+
+def _is_stale(entry: StoredEntry, parser_version: str, fingerprint: str) -> bool:
+    return entry.parser_version != parser_version or entry.lexicon_fingerprint != fingerprint
+
+
+def _reparse_chunk(chunk: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Worker entry point: parse a chunk of `{"entry_id", "text", ...}` dicts."""
+
+    return worker_pipeline().run_many(chunk)
+
+
+def _to_stored(entry: dict[str, Any], parsed: dict[str, Any], fingerprint: str) -> StoredEntry:
+    return StoredEntry(
+        entry_id=str(entry["entry_id"]),
+        raw_text=entry["text"],
+        foods=list(parsed.get("foods") or []),
+        symptoms=list(parsed.get("symptoms") or []),
+        parse_errors=list(parsed.get("parse_errors") or []),
+        parser_version=str(parsed.get("parser_version")),
+        lexicon_fingerprint=fingerprint,
+        user_id=parsed.get("user_id"),
+        timestamp=parsed.get("timestamp"),
+    )
+
+
+def reparse_store(
+    store: Path,
+    parser_version: str = "v1",
+    workers: int = 1,
+    chunk_size: int = 500,
+    resume: bool = True,
+) -> ReparseReport:
+    """Re-parse entries whose parser version or lexicon fingerprint is stale.
+
+    Stale entries are parsed in chunks and upserted back into `store`. After
+    each chunk the last entry_id is checkpointed next to the store, so an
+    interrupted run resumes from there instead of rescanning.
+    """
+
+    fingerprint = lexicon_fingerprint()
+    backend = backend_for_path(store)
+    report = ReparseReport()
+    started = time.perf_counter()
+
+    after = _read_checkpoint(store, parser_version, fingerprint) if resume else None
+    report.resumed_after = after
+
+    def _stale() -> Iterator[dict[str, Any]]:
+        for entry in backend.iter_entries(store, after=after):
+            report.scanned += 1
+            if _is_stale(entry, parser_version, fingerprint):
+                item = {"entry_id": entry.entry_id, "text": entry.raw_text}
+                if entry.user_id is not None:
+                    item["user_id"] = entry.user_id
+                if entry.timestamp is not None:
+                    item["timestamp"] = entry.timestamp
+                yield item
+
+    chunks = chunked(_stale(), chunk_size)
+
+    def _write_back(chunk: list[dict[str, Any]], results: Iterable[dict[str, Any]]) -> None:
+        backend.upsert_entries(store, [_to_stored(e, p, fingerprint) for e, p in zip(chunk, results)])
+        report.reparsed += len(chunk)
+        _write_checkpoint(store, chunk[-1]["entry_id"], parser_version, fingerprint)
+
+    if workers <= 1:
+        pipeline = make_pipeline(parser_version)
+        for chunk in chunks:
+            _write_back(chunk, pipeline.iter_run(chunk))
+    else:
+        # Results come back in submission order, so a tee of the chunks lines
+        # them up again; it buffers at most the in-flight window.
+        chunks, to_parse = tee(chunks)
+        with Pool(processes=workers, initializer=init_worker, initargs=(parser_version, 0, None)) as pool:
+            for chunk, results in zip(chunks, iter_pool_chunks(pool, _reparse_chunk, to_parse, workers * 2)):
+                _write_back(chunk, results)
+
+    _checkpoint_path(store).unlink(missing_ok=True)
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="light_parse reparse")
+    parser.add_argument("--store", required=True, help="parsed store to update in place (JSONL, or SQLite by .sqlite3/.db suffix)")
+    parser.add_argument("--parser-version", default="v1")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes (1 = in-process)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="entries parsed and written back per chunk")
+    parser.add_argument("--restart", action="store_true", help="ignore any checkpoint and rescan from the start")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be >= 1")
+
+    report = reparse_store(
+        Path(args.store),
+        parser_version=args.parser_version,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        resume=not args.restart,
+    )
+
+    if report.resumed_after is not None:
+        print(f"light_parse reparse: resumed after {report.resumed_after}", file=sys.stderr)
+    print(
+        f"light_parse reparse: scanned {report.scanned}, reparsed {report.reparsed} in {report.elapsed:.2f}s",
+        file=sys.stderr,
+    )
+    return 0
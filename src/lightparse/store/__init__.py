@@ -0,0 +1,4 @@
+from lightparse.store.backends import backend_for_path, get_backend
+from lightparse.store.jsonl import EntryFilter, StoredEntry, StorePage
+
+__all__ = ["EntryFilter", "StorePage", "StoredEntry", "backend_for_path", "get_backend"]
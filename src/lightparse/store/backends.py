@@ -0,0 +1,24 @@
+import importlib
+from pathlib import Path
+from types import ModuleType
+from typing import Union
+
+
+# Store backends share one function API (upsert_entries, find_entry,
+# list_page, iter_entries, store_stats, ...) and are imported on first use.
+_BACKENDS = {"jsonl": "lightparse.store.jsonl", "sqlite": "lightparse.store.sqlite"}
+
+_SQLITE_SUFFIXES = {".sqlite", ".sqlite3", ".db"}
+
+
+def get_backend(name: str) -> ModuleType:
+    try:
+        return importlib.import_module(_BACKENDS[name])
+    except KeyError:
+        raise ValueError(f"unknown store backend {name!r}; expected one of {sorted(_BACKENDS)}") from None
+
+
+def backend_for_path(path: Union[str, Path]) -> ModuleType:
+    """Pick the backend for a store given on the command line, by file suffix."""
+
+    return get_backend("sqlite" if Path(path).suffix in _SQLITE_SUFFIXES else "jsonl")
@@ -0,0 +1,684 @@
+import base64
+import binascii
+import json
+import os
+import sqlite3
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+
+# The store is an append-only JSONL log: an upsert appends the new version of
+# each record and a sidecar SQLite index maps entry_id to the byte offset of
+# its latest version. Superseded records stay in the log until compaction.
+_INDEX_SUFFIX = ".idx"
+_LOCK_SUFFIX = ".lock"
+_STATS_SUFFIX = ".stats.json"
+_INDEX_SCHEMA = "2"
+
+# Compact once superseded records outnumber live ones (and there are enough
+# of them to be worth a rewrite).
+_COMPACT_MIN_DEAD = 1024
+
+
+@dataclass(frozen=True)
+class StoredEntry:
+    entry_id: str
+    raw_text: str
+    foods: list[dict[str, Any]]
+    symptoms: list[dict[str, Any]]
+    parse_errors: list[str]
+    parser_version: str
+    lexicon_fingerprint: Optional[str] = None
+    user_id: Optional[str] = None
+    # ISO 8601, as normalized by the pipeline.
+    timestamp: Optional[str] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        out = {
+            "entry_id": self.entry_id,
+            "raw_text": self.raw_text,
+            "foods": self.foods,
+            "symptoms": self.symptoms,
+            "parse_errors": self.parse_errors,
+            "parser_version": self.parser_version,
+        }
+        if self.lexicon_fingerprint is not None:
+            out["lexicon_fingerprint"] = self.lexicon_fingerprint
+        if self.user_id is not None:
+            out["user_id"] = self.user_id
+        if self.timestamp is not None:
+            out["timestamp"] = self.timestamp
+        return out
+
+
+def _opt_str(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _entry_from_obj(obj: Any) -> Optional[StoredEntry]:
+    if not isinstance(obj, dict):
+        return None
+
+    entry_id = obj.get("entry_id")
+    raw_text = obj.get("raw_text")
+    if not entry_id or not isinstance(raw_text, str):
+        return None
+
+    return StoredEntry(
+        entry_id=str(entry_id),
+        raw_text=raw_text,
+        foods=list(obj.get("foods") or []),
+        symptoms=list(obj.get("symptoms") or []),
+        parse_errors=list(obj.get("parse_errors") or []),
+        parser_version=str(obj.get("parser_version") or "v1"),
+        lexicon_fingerprint=obj.get("lexicon_fingerprint"),
+        user_id=_opt_str(obj.get("user_id")),
+        timestamp=_opt_str(obj.get("timestamp")),
+    )
+
+
+def _decode_record(line: bytes) -> Optional[StoredEntry]:
+    try:
+        return _entry_from_obj(json.loads(line))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+
+def _encode_record(entry: StoredEntry) -> bytes:
+    return (json.dumps(entry.to_dict(), ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _iter_records(path: Path, start: int = 0) -> Iterator[tuple[int, int, Optional[StoredEntry]]]:
+    """Yield `(offset, length, entry)` for each line of the log from `start`."""
+
+    with path.open("rb") as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            length = len(line)
+            entry = _decode_record(line) if line.strip() else None
+            yield offset, length, entry
+            offset += length
+
+
+def iter_log(path: Path, start: int = 0) -> Iterator[tuple[int, Optional[StoredEntry]]]:
+    """Yield `(end_offset, entry)` for each complete record from `start`, superseded versions included.
+
+    A trailing line still being appended is not yielded, so the last
+    `end_offset` is always a safe place to resume from.
+    """
+
+    with path.open("rb") as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            if not line.endswith(b"\n"):
+                return
+            offset += len(line)
+            yield offset, _decode_record(line) if line.strip() else None
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(path.name + _INDEX_SUFFIX)
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Serialize writers of one store across processes."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.with_name(path.name + _LOCK_SUFFIX).open("a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _connect_index(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(_index_path(path))
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    schema = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+    if schema is not None and schema[0] != _INDEX_SCHEMA:
+        with conn:
+            conn.execute("DROP TABLE IF EXISTS entries")
+            conn.execute("DELETE FROM meta")
+    # Per-entry counts let the dashboard page and total without decoding JSON.
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS entries ("
+        "entry_id TEXT PRIMARY KEY, offset INTEGER NOT NULL, length INTEGER NOT NULL, "
+        "food_count INTEGER NOT NULL, symptom_count INTEGER NOT NULL, negated_count INTEGER NOT NULL)"
+    )
+    return conn
+
+
+_Counts = tuple[int, int, int]
+
+
+def _entry_counts(entry: StoredEntry) -> _Counts:
+    return (
+        len(entry.foods),
+        len(entry.symptoms),
+        sum(1 for s in entry.symptoms if s.get("negated") is True),
+    )
+
+
+def _put_index_row(conn: sqlite3.Connection, entry: StoredEntry, offset: int, length: int) -> Optional[_Counts]:
+    """Point the index at a new record for `entry`.
+
+    Returns the counts of the version it replaced, or None for a new entry.
+    """
+
+    old = conn.execute(
+        "SELECT food_count, symptom_count, negated_count FROM entries WHERE entry_id = ?", (entry.entry_id,)
+    ).fetchone()
+    conn.execute(
+        "INSERT OR REPLACE INTO entries "
+        "(entry_id, offset, length, food_count, symptom_count, negated_count) VALUES (?, ?, ?, ?, ?, ?)",
+        (entry.entry_id, offset, length, *_entry_counts(entry)),
+    )
+    return tuple(old) if old is not None else None  # type: ignore[return-value]
+
+
+def _get_meta(conn: sqlite3.Connection) -> dict[str, str]:
+    return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+
+
+def _set_meta(conn: sqlite3.Connection, **values: Any) -> None:
+    conn.executemany(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+        [(k, str(v)) for k, v in values.items()],
+    )
+
+
+def _log_stat(path: Path) -> tuple[int, int]:
+    if not path.exists():
+        return 0, 0
+    st = path.stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def _has_torn_tail(path: Path) -> bool:
+    """True if the log ends in a partial record, e.g. from a writer that crashed mid-append."""
+
+    if _log_stat(path)[0] == 0:
+        return False
+    with path.open("rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+def _index_records(conn: sqlite3.Connection, path: Path, start: int) -> int:
+    """Index log records from `start`; return how many were superseded."""
+
+    dead = 0
+    if not path.exists():
+        return dead
+    for offset, length, entry in _iter_records(path, start):
+        if entry is None:
+            if length > 1:
+                dead += 1
+            continue
+        if _put_index_row(conn, entry, offset, length) is not None:
+            dead += 1
+    return dead
+
+
+def _index_is_current(meta: dict[str, str], path: Path) -> bool:
+    size, mtime_ns = _log_stat(path)
+    return (
+        meta.get("schema") == _INDEX_SCHEMA
+        and int(meta.get("log_size", -1)) == size
+        and int(meta.get("log_mtime_ns", -1)) == mtime_ns
+    )
+
+
+def _sync_index(conn: sqlite3.Connection, path: Path) -> None:
+    """Bring the index up to date with the log.
+
+    Growth since the last sync is indexed incrementally; anything else (missing
+    index, truncated or replaced log, old schema) triggers a full rebuild.
+    """
+
+    meta = _get_meta(conn)
+    if _index_is_current(meta, path):
+        return
+
+    size, mtime_ns = _log_stat(path)
+    indexed_size = int(meta.get("log_size", -1))
+
+    with conn:
+        if meta.get("schema") == _INDEX_SCHEMA and 0 <= indexed_size < size:
+            dead = int(meta.get("dead", 0)) + _index_records(conn, path, indexed_size)
+        else:
+            conn.execute("DELETE FROM entries")
+            dead = _index_records(conn, path, 0)
+        _set_meta(conn, schema=_INDEX_SCHEMA, log_size=size, log_mtime_ns=mtime_ns, dead=dead)
+
+
+def _read_at(path: Path, offset: int, length: int) -> Optional[StoredEntry]:
+    with path.open("rb") as f:
+        f.seek(offset)
+        return _decode_record(f.read(length))
+
+
+def read_store(path: Path) -> list[StoredEntry]:
+    """Return the latest version of every entry, ordered by entry_id."""
+
+    if not path.exists():
+        return []
+
+    by_id: dict[str, StoredEntry] = {}
+    for _, _, entry in _iter_records(path):
+        if entry is not None:
+            by_id[entry.entry_id] = entry
+
+    return [by_id[k] for k in sorted(by_id.keys())]
+
+
+def write_store(path: Path, entries: Iterable[StoredEntry]) -> None:
+    """Replace the whole store with `entries` and rebuild its index."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _locked(path):
+        _rewrite(path, entries)
+
+
+def _rewrite(path: Path, entries: Iterable[StoredEntry]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        for e in entries:
+            f.write(_encode_record(e))
+    os.replace(tmp, path)
+
+    conn = _connect_index(path)
+    try:
+        with conn:
+            conn.execute("DELETE FROM meta")
+        _sync_index(conn, path)
+    finally:
+        conn.close()
+
+
+def _stats_path(path: Path) -> Path:
+    return path.with_name(path.name + _STATS_SUFFIX)
+
+
+def _empty_stats() -> dict[str, int]:
+    return {"total": 0, "food_count": 0, "symptom_count": 0, "negated": 0}
+
+
+def _apply_counts(stats: dict[str, int], counts: Optional[_Counts], sign: int) -> None:
+    if counts is None:
+        return
+    food_count, symptom_count, negated_count = counts
+    stats["total"] += sign
+    stats["food_count"] += sign * (food_count > 0)
+    stats["symptom_count"] += sign * (symptom_count > 0)
+    stats["negated"] += sign * negated_count
+
+
+def _read_stats_sidecar(path: Path) -> Optional[dict[str, int]]:
+    """Return the stored aggregates if they were written for the current log."""
+
+    try:
+        obj = json.loads(_stats_path(path).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(obj, dict) or [obj.get("log_size"), obj.get("log_mtime_ns")] != list(_log_stat(path)):
+        return None
+    try:
+        return {k: int(obj[k]) for k in _empty_stats()}
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _write_stats_sidecar(path: Path, stats: dict[str, int]) -> None:
+    size, mtime_ns = _log_stat(path)
+    tmp = _stats_path(path).with_name(_stats_path(path).name + ".tmp")
+    tmp.write_text(json.dumps({**stats, "log_size": size, "log_mtime_ns": mtime_ns}), encoding="utf-8")
+    os.replace(tmp, _stats_path(path))
+
+
+def _stats_from_index(conn: sqlite3.Connection) -> dict[str, int]:
+    total, food_count, symptom_count, negated = conn.execute(
+        "SELECT COUNT(*), SUM(food_count > 0), SUM(symptom_count > 0), SUM(negated_count) FROM entries"
+    ).fetchone()
+    return {"total": total, "food_count": food_count or 0, "symptom_count": symptom_count or 0, "negated": negated or 0}
+
+
+def upsert_entries(path: Path, new_entries: Iterable[StoredEntry]) -> None:
+    """Append new versions of `new_entries`; cost is proportional to the batch.
+
+    The dashboard aggregates are updated from each entry's old and new counts
+    and written to the stats sidecar alongside the log.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _locked(path):
+        conn = _connect_index(path)
+        try:
+            stats = _read_stats_sidecar(path)
+            _sync_index(conn, path)
+            if stats is None:
+                stats = _stats_from_index(conn)
+            dead = int(_get_meta(conn).get("dead", 0))
+
+            torn = _has_torn_tail(path)
+            with conn, path.open("ab") as f:
+                if torn:
+                    # End the partial line so the batch's first record is not
+                    # glued onto it (the partial record is counted as dead).
+                    f.write(b"\n")
+                offset = f.tell()
+                for e in new_entries:
+                    record = _encode_record(e)
+                    f.write(record)
+                    old = _put_index_row(conn, e, offset, len(record))
+                    if old is not None:
+                        dead += 1
+                    _apply_counts(stats, old, -1)
+                    _apply_counts(stats, _entry_counts(e), 1)
+                    offset += len(record)
+                f.flush()
+                os.fsync(f.fileno())
+
+                size, mtime_ns = _log_stat(path)
+                _set_meta(conn, log_size=size, log_mtime_ns=mtime_ns, dead=dead)
+        finally:
+            conn.close()
+
+        if dead >= _COMPACT_MIN_DEAD and dead > stats["total"]:
+            _compact(path)
+        _write_stats_sidecar(path, stats)
+
+
+def _iter_live(path: Path) -> Iterator[StoredEntry]:
+    conn = _connect_index(path)
+    try:
+        _sync_index(conn, path)
+        rows = conn.execute("SELECT offset, length FROM entries ORDER BY entry_id")
+        with path.open("rb") as f:
+            for offset, length in rows:
+                f.seek(offset)
+                entry = _decode_record(f.read(length))
+                if entry is not None:
+                    yield entry
+    finally:
+        conn.close()
+
+
+def _compact(path: Path) -> None:
+    _rewrite(path, _iter_live(path))
+
+
+def compact_store(path: Path) -> None:
+    """Drop superseded records, leaving one line per entry in entry_id order."""
+
+    if not path.exists():
+        return
+    with _locked(path):
+        _compact(path)
+
+
+def _ensure_current(conn: sqlite3.Connection, path: Path) -> None:
+    if not _index_is_current(_get_meta(conn), path):
+        with _locked(path):
+            _sync_index(conn, path)
+
+
+def find_entry(path: Path, entry_id: str) -> Optional[StoredEntry]:
+    """Look `entry_id` up in the index and decode only that record."""
+
+    if not path.exists():
+        return None
+
+    conn = _connect_index(path)
+    try:
+        for _ in range(2):
+            _ensure_current(conn, path)
+
+            row = conn.execute("SELECT offset, length FROM entries WHERE entry_id = ?", (entry_id,)).fetchone()
+            if row is None:
+                return None
+
+            entry = _read_at(path, row[0], row[1])
+            if entry is not None and entry.entry_id == entry_id:
+                return entry
+
+            # The log was rewritten between the index lookup and the read;
+            # force a rebuild and try once more.
+            with conn:
+                conn.execute("DELETE FROM meta")
+        return None
+    finally:
+        conn.close()
+
+
+@dataclass(frozen=True)
+class EntryFilter:
+    """Dashboard filter: a food (optionally at a meal) and/or a symptom (optionally by negation).
+
+    `food` and `meal` must match the same food item, and `symptom` and
+    `negated` the same symptom item, so "paneer at dinner" does not match
+    paneer at lunch plus rice at dinner.
+    """
+
+    food: Optional[str] = None
+    meal: Optional[str] = None
+    symptom: Optional[str] = None
+    negated: Optional[bool] = None
+
+    def __bool__(self) -> bool:
+        return any(v is not None for v in (self.food, self.meal, self.symptom, self.negated))
+
+    def matches(self, entry: StoredEntry) -> bool:
+        if self.food is not None or self.meal is not None:
+            if not any(
+                (self.food is None or f.get("name") == self.food) and (self.meal is None or f.get("meal") == self.meal)
+                for f in entry.foods
+            ):
+                return False
+        if self.symptom is not None or self.negated is not None:
+            if not any(
+                (self.symptom is None or s.get("name") == self.symptom)
+                and (self.negated is None or (s.get("negated") is True) == self.negated)
+                for s in entry.symptoms
+            ):
+                return False
+        return True
+
+
+@dataclass(frozen=True)
+class StorePage:
+    entries: list[StoredEntry]
+    next_token: Optional[str]
+    prev_token: Optional[str]
+
+
+def encode_page_token(entry_id: str) -> str:
+    return base64.urlsafe_b64encode(entry_id.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_page_token(token: str) -> Optional[str]:
+    try:
+        return base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def list_page(
+    path: Path,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    limit: int = 50,
+    filters: Optional[EntryFilter] = None,
+) -> StorePage:
+    """Return up to `limit` entries in entry_id order, keyed off a cursor.
+
+    `after` / `before` are page tokens from a previous page. Only the entries
+    on the returned page are read and decoded from the log. With `filters`
+    the log has no index to use, so live entries are scanned and decoded
+    until the page is full; the SQLite backend answers the same query from
+    its indexes.
+    """
+
+    if not path.exists():
+        return StorePage(entries=[], next_token=None, prev_token=None)
+
+    after_id = decode_page_token(after) if after else None
+    before_id = decode_page_token(before) if before else None
+    if filters:
+        return _scan_page(path, filters, after_id, before_id, limit)
+
+    conn = _connect_index(path)
+    try:
+        _ensure_current(conn, path)
+        if before_id is not None:
+            rows = conn.execute(
+                "SELECT entry_id, offset, length FROM entries WHERE entry_id < ? ORDER BY entry_id DESC LIMIT ?",
+                (before_id, limit + 1),
+            ).fetchall()
+            has_more_before = len(rows) > limit
+            rows = list(reversed(rows[:limit]))
+            has_more_after = True
+        else:
+            rows = conn.execute(
+                "SELECT entry_id, offset, length FROM entries WHERE entry_id > ? ORDER BY entry_id LIMIT ?",
+                (after_id if after_id is not None else "", limit + 1),
+            ).fetchall()
+            has_more_after = len(rows) > limit
+            rows = rows[:limit]
+            has_more_before = after_id is not None
+    finally:
+        conn.close()
+
+    entries: list[StoredEntry] = []
+    with path.open("rb") as f:
+        for entry_id, offset, length in rows:
+            f.seek(offset)
+            entry = _decode_record(f.read(length))
+            if entry is None or entry.entry_id != entry_id:
+                # Compacted since the index was read; fall back to a fresh lookup.
+                entry = find_entry(path, entry_id)
+            if entry is not None:
+                entries.append(entry)
+
+    return StorePage(
+        entries=entries,
+        next_token=encode_page_token(rows[-1][0]) if rows and has_more_after else None,
+        prev_token=encode_page_token(rows[0][0]) if rows and has_more_before else None,
+    )
+
+
+def _scan_page(
+    path: Path, filters: EntryFilter, after_id: Optional[str], before_id: Optional[str], limit: int
+) -> StorePage:
+    entries: list[StoredEntry]
+    if before_id is not None:
+        window: deque[StoredEntry] = deque(maxlen=limit + 1)
+        for e in iter_entries(path):
+            if e.entry_id >= before_id:
+                break
+            if filters.matches(e):
+                window.append(e)
+        has_more_before = len(window) > limit
+        entries = list(window)[-limit:] if limit else []
+        has_more_after = True
+    else:
+        entries = []
+        has_more_after = False
+        for e in iter_entries(path, after=after_id):
+            if not filters.matches(e):
+                continue
+            if len(entries) >= limit:
+                has_more_after = True
+                break
+            entries.append(e)
+        has_more_before = after_id is not None
+
+    return StorePage(
+        entries=entries,
+        next_token=encode_page_token(entries[-1].entry_id) if entries and has_more_after else None,
+        prev_token=encode_page_token(entries[0].entry_id) if entries and has_more_before else None,
+    )
+
+
+def iter_entries(path: Path, after: Optional[str] = None, batch_size: int = 500) -> Iterator[StoredEntry]:
+    """Yield live entries in entry_id order, starting after `after`.
+
+    The index is queried one batch at a time, so no read transaction stays
+    open while the caller writes back to the same store.
+    """
+
+    if not path.exists():
+        return
+
+    cursor = after if after is not None else ""
+    while True:
+        conn = _connect_index(path)
+        try:
+            _ensure_current(conn, path)
+            rows = conn.execute(
+                "SELECT entry_id, offset, length FROM entries WHERE entry_id > ? ORDER BY entry_id LIMIT ?",
+                (cursor, batch_size),
+            ).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return
+
+        with path.open("rb") as f:
+            for entry_id, offset, length in rows:
+                f.seek(offset)
+                entry = _decode_record(f.read(length))
+                if entry is None or entry.entry_id != entry_id:
+                    entry = find_entry(path, entry_id)
+                if entry is not None:
+                    yield entry
+        cursor = rows[-1][0]
+
+
+def store_stats(path: Path) -> dict[str, int]:
+    """Dashboard totals, read from the stats sidecar when it is current."""
+
+    if not path.exists():
+        return _empty_stats()
+
+    stats = _read_stats_sidecar(path)
+    if stats is not None:
+        return stats
+
+    with _locked(path):
+        conn = _connect_index(path)
+        try:
+            _sync_index(conn, path)
+            stats = _stats_from_index(conn)
+        finally:
+            conn.close()
+        _write_stats_sidecar(path, stats)
+    return stats
+
+
+def rebuild_store_stats(path: Path) -> dict[str, int]:
+    """Recompute the aggregates by decoding every live record and store them."""
+
+    stats = _empty_stats()
+    if not path.exists():
+        return stats
+
+    with _locked(path):
+        for e in read_store(path):
+            _apply_counts(stats, _entry_counts(e), 1)
+        _write_stats_sidecar(path, stats)
+    return stats
@@ -0,0 +1,364 @@
+import json
+import sqlite3
+from contextlib import closing
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from lightparse.store import jsonl
+from lightparse.store.jsonl import EntryFilter, StorePage, StoredEntry, decode_page_token, encode_page_token
+
+
+# Same functions as `lightparse.store.jsonl`, over a SQLite database with one row per
+# entry, food and symptom. Filters on food name, meal, symptom name and
+# negation are answered from indexes instead of decoding every entry.
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    entry_id TEXT PRIMARY KEY,
+    raw_text TEXT NOT NULL,
+    parse_errors TEXT NOT NULL,
+    parser_version TEXT NOT NULL,
+    lexicon_fingerprint TEXT,
+    user_id TEXT,
+    timestamp TEXT
+);
+CREATE TABLE IF NOT EXISTS foods (
+    entry_id TEXT NOT NULL,
+    pos INTEGER NOT NULL,
+    name TEXT,
+    quantity,
+    unit,
+    meal TEXT,
+    confidence,
+    PRIMARY KEY (entry_id, pos)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS symptoms (
+    entry_id TEXT NOT NULL,
+    pos INTEGER NOT NULL,
+    name TEXT,
+    severity,
+    time_hint,
+    negated INTEGER NOT NULL,
+    confidence,
+    PRIMARY KEY (entry_id, pos)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS foods_name_meal ON foods (name, meal, entry_id);
+CREATE INDEX IF NOT EXISTS foods_meal ON foods (meal, entry_id);
+CREATE INDEX IF NOT EXISTS symptoms_name_negated ON symptoms (name, negated, entry_id);
+CREATE INDEX IF NOT EXISTS symptoms_negated ON symptoms (negated, entry_id);
+CREATE INDEX IF NOT EXISTS entries_user_timestamp ON entries (user_id, timestamp);
+"""
+
+# Script that upgrades a database from schema version N to N + 1.
+_MIGRATIONS = {
+    1: """
+ALTER TABLE entries ADD COLUMN user_id TEXT;
+ALTER TABLE entries ADD COLUMN timestamp TEXT;
+CREATE INDEX IF NOT EXISTS entries_user_timestamp ON entries (user_id, timestamp);
+""",
+}
+
+# Rows per executemany call inside an upsert transaction.
+_WRITE_BATCH = 1000
+
+_FOOD_COLUMNS = ("name", "quantity", "unit", "meal", "confidence")
+_SYMPTOM_COLUMNS = ("name", "severity", "time_hint", "negated", "confidence")
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    # WAL lets the dashboard read while an upload or reparse is writing.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    (version,) = conn.execute("PRAGMA user_version").fetchone()
+    if version != _SCHEMA_VERSION:
+        if version > _SCHEMA_VERSION:
+            conn.close()
+            raise RuntimeError(f"{path} was written by a newer store schema ({version})")
+        with conn:
+            if version == 0:
+                conn.executescript(_SCHEMA)
+            else:
+                for v in range(version, _SCHEMA_VERSION):
+                    conn.executescript(_MIGRATIONS[v])
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    return conn
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _food_rows(entry: StoredEntry) -> Iterator[tuple[Any, ...]]:
+    for pos, f in enumerate(entry.foods):
+        yield (entry.entry_id, pos, *(f.get(col) for col in _FOOD_COLUMNS))
+
+
+def _symptom_rows(entry: StoredEntry) -> Iterator[tuple[Any, ...]]:
+    for pos, s in enumerate(entry.symptoms):
+        yield (
+            entry.entry_id,
+            pos,
+            s.get("name"),
+            s.get("severity"),
+            s.get("time_hint"),
+            1 if s.get("negated") is True else 0,
+            s.get("confidence"),
+        )
+
+
+def upsert_entries(path: Path, new_entries: Iterable[StoredEntry]) -> None:
+    """Insert or replace `new_entries` in one transaction; the last version of a repeated entry_id wins."""
+
+    latest = {e.entry_id: e for e in new_entries}
+    if not latest:
+        return
+
+    with closing(_connect(path)) as conn, conn:
+        _write_entries(conn, latest.values())
+
+
+def _write_entries(conn: sqlite3.Connection, entries: Iterable[StoredEntry]) -> None:
+    """Replace the rows of each of `entries` inside the caller's transaction."""
+
+    for chunk in _chunks(entries, _WRITE_BATCH):
+        ids = [(e.entry_id,) for e in chunk]
+        conn.executemany("DELETE FROM foods WHERE entry_id = ?", ids)
+        conn.executemany("DELETE FROM symptoms WHERE entry_id = ?", ids)
+        conn.executemany(
+            "INSERT OR REPLACE INTO entries "
+            "(entry_id, raw_text, parse_errors, parser_version, lexicon_fingerprint, user_id, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    e.entry_id,
+                    e.raw_text,
+                    json.dumps(e.parse_errors, ensure_ascii=False),
+                    e.parser_version,
+                    e.lexicon_fingerprint,
+                    e.user_id,
+                    e.timestamp,
+                )
+                for e in chunk
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO foods (entry_id, pos, name, quantity, unit, meal, confidence) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [row for e in chunk for row in _food_rows(e)],
+        )
+        conn.executemany(
+            "INSERT INTO symptoms (entry_id, pos, name, severity, time_hint, negated, confidence) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [row for e in chunk for row in _symptom_rows(e)],
+        )
+
+
+def write_store(path: Path, entries: Iterable[StoredEntry]) -> None:
+    """Replace the whole store with `entries` in one transaction, so a failure leaves the old contents."""
+
+    latest = {e.entry_id: e for e in entries}
+    with closing(_connect(path)) as conn, conn:
+        conn.execute("DELETE FROM entries")
+        conn.execute("DELETE FROM foods")
+        conn.execute("DELETE FROM symptoms")
+        _write_entries(conn, latest.values())
+
+
+def _load(conn: sqlite3.Connection, rows: list[tuple[Any, ...]]) -> list[StoredEntry]:
+    """Build entries for rows selected with `_ENTRY_SELECT`, in order."""
+
+    if not rows:
+        return []
+
+    ids = [r[0] for r in rows]
+    foods: dict[str, list[dict[str, Any]]] = {i: [] for i in ids}
+    symptoms: dict[str, list[dict[str, Any]]] = {i: [] for i in ids}
+    marks = ",".join("?" * len(ids))
+
+    for entry_id, *values in conn.execute(
+        f"SELECT entry_id, name, quantity, unit, meal, confidence FROM foods "
+        f"WHERE entry_id IN ({marks}) ORDER BY entry_id, pos",
+        ids,
+    ):
+        foods[entry_id].append(dict(zip(_FOOD_COLUMNS, values)))
+    for entry_id, *values in conn.execute(
+        f"SELECT entry_id, name, severity, time_hint, negated, confidence FROM symptoms "
+        f"WHERE entry_id IN ({marks}) ORDER BY entry_id, pos",
+        ids,
+    ):
+        s = dict(zip(_SYMPTOM_COLUMNS, values))
+        s["negated"] = bool(s["negated"])
+        symptoms[entry_id].append(s)
+
+    return [
+        StoredEntry(
+            entry_id=entry_id,
+            raw_text=raw_text,
+            foods=foods[entry_id],
+            symptoms=symptoms[entry_id],
+            parse_errors=json.loads(parse_errors),
+            parser_version=parser_version,
+            lexicon_fingerprint=fingerprint,
+            user_id=user_id,
+            timestamp=timestamp,
+        )
+        for entry_id, raw_text, parse_errors, parser_version, fingerprint, user_id, timestamp in rows
+    ]
+
+
+_ENTRY_SELECT = (
+    "SELECT e.entry_id, e.raw_text, e.parse_errors, e.parser_version, e.lexicon_fingerprint, e.user_id, e.timestamp "
+    "FROM entries e"
+)
+
+# Entries are read in pages; SQLite caps the number of bound parameters.
+_READ_BATCH = 500
+
+
+def _filter_sql(filters: Optional[EntryFilter]) -> tuple[str, list[Any]]:
+    """Turn `filters` into `AND entry_id IN (...)` clauses answered from the child-table indexes."""
+
+    if not filters:
+        return "", []
+
+    sql = ""
+    params: list[Any] = []
+    if filters.food is not None or filters.meal is not None:
+        cond = []
+        for col, value in (("name", filters.food), ("meal", filters.meal)):
+            if value is not None:
+                cond.append(f"{col} = ?")
+                params.append(value)
+        sql += f" AND e.entry_id IN (SELECT entry_id FROM foods WHERE {' AND '.join(cond)})"
+    if filters.symptom is not None or filters.negated is not None:
+        cond = []
+        if filters.symptom is not None:
+            cond.append("name = ?")
+            params.append(filters.symptom)
+        if filters.negated is not None:
+            cond.append("negated = ?")
+            params.append(1 if filters.negated else 0)
+        sql += f" AND e.entry_id IN (SELECT entry_id FROM symptoms WHERE {' AND '.join(cond)})"
+    return sql, params
+
+
+def read_store(path: Path) -> list[StoredEntry]:
+    """Return every entry, ordered by entry_id."""
+
+    return list(iter_entries(path))
+
+
+def find_entry(path: Path, entry_id: str) -> Optional[StoredEntry]:
+    if not path.exists():
+        return None
+
+    with closing(_connect(path)) as conn:
+        rows = conn.execute(_ENTRY_SELECT + " WHERE e.entry_id = ?", (entry_id,)).fetchall()
+        entries = _load(conn, rows)
+    return entries[0] if entries else None
+
+
+def list_page(
+    path: Path,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    limit: int = 50,
+    filters: Optional[EntryFilter] = None,
+) -> StorePage:
+    """Return up to `limit` entries matching `filters` in entry_id order, keyed off a cursor."""
+
+    if not path.exists():
+        return StorePage(entries=[], next_token=None, prev_token=None)
+
+    after_id = decode_page_token(after) if after else None
+    before_id = decode_page_token(before) if before else None
+    where, params = _filter_sql(filters)
+
+    with closing(_connect(path)) as conn:
+        if before_id is not None:
+            rows = conn.execute(
+                _ENTRY_SELECT + f" WHERE e.entry_id < ?{where} ORDER BY e.entry_id DESC LIMIT ?",
+                (before_id, *params, limit + 1),
+            ).fetchall()
+            has_more_before = len(rows) > limit
+            rows = list(reversed(rows[:limit]))
+            has_more_after = True
+        else:
+            rows = conn.execute(
+                _ENTRY_SELECT + f" WHERE e.entry_id > ?{where} ORDER BY e.entry_id LIMIT ?",
+                (after_id if after_id is not None else "", *params, limit + 1),
+            ).fetchall()
+            has_more_after = len(rows) > limit
+            rows = rows[:limit]
+            has_more_before = after_id is not None
+        entries = _load(conn, rows)
+
+    return StorePage(
+        entries=entries,
+        next_token=encode_page_token(rows[-1][0]) if rows and has_more_after else None,
+        prev_token=encode_page_token(rows[0][0]) if rows and has_more_before else None,
+    )
+
+
+def iter_entries(path: Path, after: Optional[str] = None, batch_size: int = _READ_BATCH) -> Iterator[StoredEntry]:
+    """Yield entries in entry_id order, starting after `after`, one batch per read transaction."""
+
+    if not path.exists():
+        return
+
+    cursor = after if after is not None else ""
+    while True:
+        with closing(_connect(path)) as conn:
+            rows = conn.execute(
+                _ENTRY_SELECT + " WHERE e.entry_id > ? ORDER BY e.entry_id LIMIT ?",
+                (cursor, min(batch_size, _READ_BATCH)),
+            ).fetchall()
+            entries = _load(conn, rows)
+        if not rows:
+            return
+        yield from entries
+        cursor = rows[-1][0]
+
+
+def store_stats(path: Path) -> dict[str, int]:
+    """Dashboard totals, counted from the indexes."""
+
+    if not path.exists():
+        return jsonl._empty_stats()
+
+    with closing(_connect(path)) as conn:
+        total, food_count, symptom_count, negated = conn.execute(
+            "SELECT (SELECT COUNT(*) FROM entries), "
+            "(SELECT COUNT(DISTINCT entry_id) FROM foods), "
+            "(SELECT COUNT(DISTINCT entry_id) FROM symptoms), "
+            "(SELECT COUNT(*) FROM symptoms WHERE negated = 1)"
+        ).fetchone()
+    return {"total": total, "food_count": food_count, "symptom_count": symptom_count, "negated": negated}
+
+
+def rebuild_store_stats(path: Path) -> dict[str, int]:
+    """Totals are always computed from the tables, so there is nothing to rebuild."""
+
+    return store_stats(path)
+
+
+def compact_store(path: Path) -> None:
+    if not path.exists():
+        return
+    with closing(_connect(path)) as conn:
+        conn.execute("VACUUM")
+
+
+def migrate_jsonl(source: Path, dest: Path, batch_size: int = _WRITE_BATCH) -> int:
+    """Copy every live entry of a JSONL store into the SQLite store at `dest`; return the count."""
+
+    count = 0
+    for chunk in _chunks(jsonl.iter_entries(source), batch_size):
+        upsert_entries(dest, chunk)
+        count += len(chunk)
+    return count
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import json
+import math
+from json.encoder import encode_basestring
+from typing import Any, Optional
+
+
+def json_value(value: Any) -> str:
+    """Encode `value` exactly as `json.dumps(value, ensure_ascii=False)` would.
+
+    Scalars take a fast path so result records can write themselves out
+    without building an intermediate dict.
+    """
+
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, str):
+        return encode_basestring(value)
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, float) and math.isfinite(value):
+        return float.__repr__(value)
+    return json.dumps(value, ensure_ascii=False)
+
+
+def json_str(value: str) -> str:
+    return encode_basestring(value)
+
+
+def json_opt_str(value: Optional[str]) -> str:
+    return "null" if value is None else encode_basestring(value)
+
+
+def json_array(items: Any) -> str:
+    """Join already-encoded JSON values into an array, matching `json.dumps` spacing."""
+
+    return "[" + ", ".join(items) + "]"
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+
+_BUNDLED_DIR = Path(__file__).resolve().parent.parent / "lexicons"
+
+# Bump when the on-disk layout changes; it is part of the cache key.
+_FORMAT_VERSION = b"lplex-1"
+_MAGIC = b"LPLEX\x00\x01" + (b"L" if sys.byteorder == "little" else b"B")
+
+# magic, term count, most words in any term
+_HEADER = struct.Struct("=8sII")
+
+# Lookups are memoized per process; the hot vocabulary of a journal is small.
+_MEMO_LIMIT = 65_536
+
+
+def lexicon_dir() -> Optional[Path]:
+    """Directory of override lexicon files, from `LIGHTPARSE_LEXICON_DIR`."""
+
+    value = os.environ.get("LIGHTPARSE_LEXICON_DIR")
+    return Path(value) if value else None
+
+
+def lexicon_path(filename: str) -> Path:
+    """Resolve a lexicon file, preferring the override directory over the bundled copy."""
+
+    override = lexicon_dir()
+    if override is not None and (override / filename).is_file():
+        return override / filename
+    return _BUNDLED_DIR / filename
+
+
+def _cache_dir() -> Path:
+    value = os.environ.get("LIGHTPARSE_LEXICON_CACHE")
+    if value:
+        return Path(value)
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "lightparse"
+
+
+class TermIndex:
+    """Sorted, immutable term table over a compiled lexicon buffer.
+
+    The buffer is normally a read-only mmap of the cached index file, so
+    worker processes share the same pages and opening a large lexicon costs
+    one `mmap` call. Terms are looked up by binary search over UTF-8 bytes;
+    each term may carry a string value (e.g. a symptom's canonical name).
+    """
+
+    def __init__(self, buf: Any, digest: str) -> None:
+        magic, count, max_words = _HEADER.unpack_from(buf, 0)
+        if magic != _MAGIC:
+            raise ValueError("not a compiled lexicon index")
+
+        self.digest = digest
+        self.max_words = max_words
+        self._count = count
+        self._buf = buf
+
+        view = memoryview(buf)
+        pos = _HEADER.size
+        size = 4 * (count + 1)
+        self._key_offsets = view[pos : pos + size].cast("I")
+        pos += size
+        self._value_offsets = view[pos : pos + size].cast("I")
+        pos += size
+        self._keys = view[pos : pos + self._key_offsets[count]]
+        pos += self._key_offsets[count]
+        self._values = view[pos : pos + self._value_offsets[count]]
+
+        self._memo: dict[str, int] = {}
+        self._prefix_memo: dict[str, bool] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _key_at(self, i: int) -> bytes:
+        return bytes(self._keys[self._key_offsets[i] : self._key_offsets[i + 1]])
+
+    def _value_at(self, i: int) -> str:
+        return bytes(self._values[self._value_offsets[i] : self._value_offsets[i + 1]]).decode("utf-8")
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, term: str) -> int:
+        i = self._memo.get(term)
+        return i if i is not None else self._search(term)
+
+    def _search(self, term: str) -> int:
+        key = term.encode("utf-8")
+        i = self._lower_bound(key)
+        if i >= self._count or self._key_at(i) != key:
+            i = -1
+        if len(self._memo) >= _MEMO_LIMIT:
+            self._memo.clear()
+        self._memo[term] = i
+        return i
+
+    def __contains__(self, term: object) -> bool:
+        # Inlined memo check: this sits on the parser's hot path.
+        i = self._memo.get(term)  # type: ignore[call-overload]
+        if i is None:
+            if not isinstance(term, str):
+                return False
+            i = self._search(term)
+        return i >= 0
+
+    def get(self, term: str, default: Optional[str] = None) -> Optional[str]:
+        i = self._find(term)
+        return self._value_at(i) if i >= 0 else default
+
+    def has_prefix(self, prefix: str) -> bool:
+        hit = self._prefix_memo.get(prefix)
+        if hit is None:
+            key = prefix.encode("utf-8")
+            i = self._lower_bound(key)
+            hit = i < self._count and self._key_at(i).startswith(key)
+            if len(self._prefix_memo) >= _MEMO_LIMIT:
+                self._prefix_memo.clear()
+            self._prefix_memo[prefix] = hit
+        return hit
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self._key_at(i).decode("utf-8")
+
+    def items(self) -> Iterator[tuple[str, str]]:
+        for i in range(self._count):
+            yield self._key_at(i).decode("utf-8"), self._value_at(i)
+
+
+def compile_index(entries: Iterable[tuple[str, str]]) -> bytes:
+    """Build the binary layout for `(term, value)` pairs; the first value for a term wins."""
+
+    table: dict[bytes, bytes] = {}
+    for term, value in entries:
+        table.setdefault(term.encode("utf-8"), value.encode("utf-8"))
+    keys = sorted(table)
+
+    key_offsets = array("I", [0])
+    value_offsets = array("I", [0])
+    for k in keys:
+        key_offsets.append(key_offsets[-1] + len(k))
+        value_offsets.append(value_offsets[-1] + len(table[k]))
+
+    max_words = max((k.count(b" ") + 1 for k in keys), default=0)
+    return b"".join(
+        [
+            _HEADER.pack(_MAGIC, len(keys), max_words),
+            key_offsets.tobytes(),
+            value_offsets.tobytes(),
+            *keys,
+            *(table[k] for k in keys),
+        ]
+    )
+
+
+def _source_lines(raw: str) -> Iterator[str]:
+    for line in raw.splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def _normalize_term(term: str) -> str:
+    return " ".join(term.lower().split())
+
+
+def parse_word_list(raw: str) -> Iterator[tuple[str, str]]:
+    """One term per line; blank lines and `#` comments are skipped."""
+
+    for line in _source_lines(raw):
+        yield _normalize_term(line), ""
+
+
+def parse_term_map(raw: str) -> Iterator[tuple[str, str]]:
+    """Tab-separated `term<TAB>value` lines."""
+
+    for line in _source_lines(raw):
+        term, sep, value = line.partition("\t")
+        if not sep:
+            raise ValueError(f"lexicon line without a tab: {line!r}")
+        yield _normalize_term(term), value.strip()
+
+
+def load_term_index(name: str, source: Path, parse: Any = parse_word_list) -> TermIndex:
+    """Open the compiled index for `source`, compiling and caching it on first use.
+
+    Cache files are named by a hash of the source contents, so an edited
+    lexicon gets a fresh index and the old one is simply never opened again.
+    """
+
+    raw = source.read_bytes()
+    digest = hashlib.blake2b(_FORMAT_VERSION + _MAGIC + raw, digest_size=16).hexdigest()
+    path = _cache_dir() / f"{name}-{digest}.idx"
+
+    try:
+        with path.open("rb") as f:
+            return TermIndex(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), digest)
+    except (OSError, ValueError):
+        pass
+
+    data = compile_index(parse(raw.decode("utf-8")))
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with path.open("rb") as f:
+            return TermIndex(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), digest)
+    except OSError:
+        # Read-only cache location: keep the compiled index in memory instead.
+        return TermIndex(data, digest)
+
+
+@lru_cache(maxsize=None)
+def food_index() -> TermIndex:
+    return load_term_index("foods", lexicon_path("foods.txt"), parse_word_list)
+
+
+@lru_cache(maxsize=None)
+def symptom_index() -> TermIndex:
+    """Symptom variants mapped to their canonical names."""
+
+    return load_term_index("symptoms", lexicon_path("symptoms.tsv"), parse_term_map)
+
+
+@lru_cache(maxsize=None)
+def meal_rules() -> dict[str, Any]:
+    """Meal keywords and Hinglish / skipped-meal patterns, as stored in meals.json."""
+
+    return json.loads(lexicon_path("meals.json").read_text(encoding="utf-8"))
@@ -1,13 +1,20 @@
 import re
 from dataclasses import dataclass
-from typing import Iterable
+from functools import cached_property
+from typing import Iterable, NamedTuple
 
 
 _WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?", re.IGNORECASE)
 
+# Runs of word characters become one token, any other visible character is a
+# token of its own, and newlines are kept because they separate fragments.
+_TOKEN_RE = re.compile(r"\n|[a-z0-9\-']+|\S")
+
+_FRAGMENT_SEPARATORS = frozenset({"+", "&", ",", ";", "\n", "and"})
+
 
 def normalize_whitespace(text: str) -> str:
-    return re.sub(r"\s+", " ", text).strip()
+    return " ".join(text.split())
 
 
 def strip_non_text(text: str) -> str:
@@ -25,6 +32,75 @@ def split_on_separators(text: str) -> list[str]:
     return [normalize_whitespace(p) for p in parts if normalize_whitespace(p)]
 
 
+class Token(NamedTuple):
+    value: str
+    start: int
+    end: int
+    spaced: bool
+
+    @property
+    def is_word(self) -> bool:
+        return self.value[0] in _WORD_CHARS
+
+
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789-'")
+
+
+def join_tokens(tokens: Iterable[Token]) -> str:
+    """Rebuild whitespace-normalized text from tokens without a regex pass."""
+
+    out: list[str] = []
+    for t in tokens:
+        if out and t.spaced:
+            out.append(" ")
+        out.append(t.value)
+    return "".join(out)
+
+
+@dataclass(frozen=True)
+class Document:
+    """An entry's text, normalized once and shared by every parser.
+
+    `tokens` and `fragments` are built lazily from a single scan of `lowered`,
+    so a parser that only needs the lowered string does not pay for them.
+    """
+
+    text: str
+    lowered: str
+
+    @classmethod
+    def from_text(cls, text: str) -> "Document":
+        text = strip_non_text(text)
+        return cls(text=text, lowered=text.lower())
+
+    @cached_property
+    def tokens(self) -> tuple[Token, ...]:
+        tokens: list[Token] = []
+        prev_end = 0
+        for m in _TOKEN_RE.finditer(self.lowered):
+            start = m.start()
+            tokens.append(Token(m.group(0), start, m.end(), start > prev_end))
+            prev_end = m.end()
+        return tuple(tokens)
+
+    @cached_property
+    def fragments(self) -> tuple[tuple[Token, ...], ...]:
+        """Token runs between separators (`+ & , ;`, newlines and "and")."""
+
+        fragments: list[tuple[Token, ...]] = []
+        current: list[Token] = []
+        for t in self.tokens:
+            if t.value in _FRAGMENT_SEPARATORS:
+                if current:
+                    fragments.append(tuple(current))
+                    current = []
+                continue
+            current.append(t)
+        if current:
+            fragments.append(tuple(current))
+        return tuple(fragments)
+
+
 @dataclass(frozen=True)
 class SpanMatch:
     value: str
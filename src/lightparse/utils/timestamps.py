@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Read an entry timestamp: an ISO 8601 string or Unix epoch seconds.
+
+    Epoch values become UTC. ISO strings keep their offset, if any; naive ones
+    are left naive and treated as UTC by `epoch_seconds`, which is all the
+    lag arithmetic needs as long as a user's entries are consistent.
+    """
+
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        try:
+            return datetime.fromtimestamp(value, tz=timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            return None
+    if not isinstance(value, str) or not value.strip():
+        return None
+
+    text = value.strip()
+    # fromisoformat only reads a "Z" suffix from Python 3.11 on.
+    if text[-1] in "Zz":
+        text = text[:-1] + "+00:00"
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromtimestamp(float(text), tz=timezone.utc)
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+def normalize_timestamp(value: Any) -> Optional[str]:
+    """`parse_timestamp`, written back out as an ISO 8601 string."""
+
+    dt = parse_timestamp(value)
+    return dt.isoformat() if dt is not None else None
+
+
+def epoch_seconds(value: str) -> Optional[float]:
+    """Seconds since the epoch for a normalized timestamp; naive times count as UTC."""
+
+    dt = parse_timestamp(value)
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, JsonResponse
+
+from lightparse.pipeline.cache import ParseCache
+from lightparse.pipeline.light_pipeline import LightParsePipeline, ParsedEntry
+from lightparse.utils.jsonout import json_array
+
+
+# Request latencies kept for the percentile metrics.
+_LATENCY_WINDOW = 2048
+
+
+class QueueFull(Exception):
+    pass
+
+
+@dataclass
+class _Job:
+    entries: list[Any]
+    future: Future
+    submitted: float
+
+
+def _deliver(resolve: Callable[[Any], None], value: Any) -> None:
+    # This runs on the only batcher thread: one future that cannot take its
+    # result must not stop the others from being resolved.
+    try:
+        resolve(value)
+    except InvalidStateError:
+        pass
+
+
+class MicroBatcher:
+    """Groups entries from concurrent requests into batches for one pipeline.
+
+    Requests submit their entries and get a `concurrent.futures.Future`; a
+    single background thread waits up to `max_wait` seconds for `max_batch`
+    entries to accumulate, parses them with `run_many` semantics and resolves
+    each request's future with its own slice of the results. The number of
+    queued entries is bounded by `capacity`: submissions beyond it raise
+    `QueueFull` instead of growing the backlog.
+
+    A thread (not an asyncio task) does the batching so that it works the
+    same under ASGI and under WSGI, where every async view gets its own loop.
+    """
+
+    def __init__(
+        self,
+        pipeline: LightParsePipeline,
+        max_batch: int = 64,
+        max_wait: float = 0.005,
+        capacity: int = 4096,
+    ) -> None:
+        self.pipeline = pipeline
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.capacity = capacity
+
+        self._cond = threading.Condition()
+        self._jobs: deque[_Job] = deque()
+        self._depth = 0
+        self._thread: Optional[threading.Thread] = None
+
+        self.requests = 0
+        self.entries = 0
+        self.batches = 0
+        self.rejected = 0
+        self.largest_batch = 0
+        self._latencies: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    def submit(self, entries: list[Any]) -> Future:
+        future: Future = Future()
+        with self._cond:
+            # An empty queue always admits a request, however large, so one
+            # oversized batch cannot be refused forever.
+            if self._depth and self._depth + len(entries) > self.capacity:
+                self.rejected += 1
+                raise QueueFull(f"{self._depth} entries already queued")
+            self._jobs.append(_Job(entries, future, time.perf_counter()))
+            self._depth += len(entries)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="lightparse-batcher", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def _take_batch(self) -> list[_Job]:
+        with self._cond:
+            while not self._jobs:
+                self._cond.wait()
+
+            # Give concurrent requests a moment to join, unless the batch is full.
+            deadline = time.monotonic() + self.max_wait
+            while self._depth < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            jobs = [self._jobs.popleft()]
+            size = len(jobs[0].entries)
+            while self._jobs and size + len(self._jobs[0].entries) <= self.max_batch:
+                job = self._jobs.popleft()
+                jobs.append(job)
+                size += len(job.entries)
+            self._depth -= size
+            return jobs
+
+    def _loop(self) -> None:
+        while True:
+            # A request whose client went away has its future cancelled by
+            # `asyncio.wrap_future`; claiming the rest means none can be
+            # cancelled while its batch is parsed.
+            jobs = [job for job in self._take_batch() if job.future.set_running_or_notify_cancel()]
+            if not jobs:
+                continue
+            batch = [entry for job in jobs for entry in job.entries]
+            try:
+                results = list(self.pipeline.iter_records(batch))
+            except Exception as e:  # noqa: BLE001
+                for job in jobs:
+                    _deliver(job.future.set_exception, e)
+                continue
+
+            done = time.perf_counter()
+            start = 0
+            with self._cond:
+                self.batches += 1
+                self.largest_batch = max(self.largest_batch, len(batch))
+                for job in jobs:
+                    self.requests += 1
+                    self.entries += len(job.entries)
+                    self._latencies.append(done - job.submitted)
+            for job in jobs:
+                end = start + len(job.entries)
+                _deliver(job.future.set_result, results[start:end])
+                start = end
+
+    def metrics(self) -> dict[str, Any]:
+        with self._cond:
+            latencies = sorted(self._latencies)
+            depth = self._depth
+            out: dict[str, Any] = {
+                "queue_depth": depth,
+                "queue_capacity": self.capacity,
+                "requests": self.requests,
+                "entries": self.entries,
+                "batches": self.batches,
+                "rejected": self.rejected,
+                "largest_batch": self.largest_batch,
+                "mean_batch_size": round(self.entries / self.batches, 2) if self.batches else 0.0,
+            }
+
+        def _pct(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000, 3)
+
+        out["latency_ms"] = {"p50": _pct(50), "p99": _pct(99), "max": _pct(100)}
+        return out
+
+
+_batcher: Optional[MicroBatcher] = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher() -> MicroBatcher:
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = MicroBatcher(
+                LightParsePipeline(parser_version="v1", cache=ParseCache(max_entries=10_000)),
+                max_batch=int(getattr(settings, "LIGHTPARSE_API_MAX_BATCH", 64)),
+                max_wait=float(getattr(settings, "LIGHTPARSE_API_MAX_WAIT_MS", 5)) / 1000,
+                capacity=int(getattr(settings, "LIGHTPARSE_API_QUEUE_SIZE", 4096)),
+            )
+        return _batcher
+
+
+def _max_entries() -> int:
+    return int(getattr(settings, "LIGHTPARSE_API_MAX_ENTRIES", 1000))
+
+
+def _error(status: int, message: str) -> JsonResponse:
+    return JsonResponse({"error": message}, status=status)
+
+
+async def parse_api_view(request: HttpRequest) -> HttpResponse:
+    """`POST /api/parse` with one entry object, or `{"entries": [...]}` / a bare list.
+
+    A single entry gets its result object back; a batch gets
+    `{"results": [...]}` in request order. When the parse queue is full the
+    request is refused with 503 and `Retry-After`.
+    """
+
+    if request.method != "POST":
+        return _error(405, "POST a JSON entry or batch")
+
+    try:
+        body = json.loads(request.body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return _error(400, "request body is not valid JSON")
+
+    single = isinstance(body, dict) and "entries" not in body
+    entries = [body] if single else body.get("entries") if isinstance(body, dict) else body
+    if not isinstance(entries, list) or not entries:
+        return _error(400, "expected an entry object or a non-empty list of entries")
+    if len(entries) > _max_entries():
+        return _error(413, f"at most {_max_entries()} entries per request")
+
+    try:
+        future = get_batcher().submit(entries)
+    except QueueFull:
+        response = _error(503, "parse queue is full, retry shortly")
+        response["Retry-After"] = "1"
+        return response
+
+    results: list[ParsedEntry] = await asyncio.wrap_future(future)
+
+    if single:
+        content = results[0].to_json()
+    else:
+        content = '{"results": ' + json_array(r.to_json() for r in results) + "}"
+    return HttpResponse(content, content_type="application/json")
+
+
+# Token-less clients (the mobile sync backend) post here. Set the flag directly:
+# Django 4.2's csrf_exempt wrapper would turn this async view into a sync one.
+parse_api_view.csrf_exempt = True  # type: ignore[attr-defined]
+
+
+async def api_metrics_view(request: HttpRequest) -> HttpResponse:
+    return JsonResponse(get_batcher().metrics())
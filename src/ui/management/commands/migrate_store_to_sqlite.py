@@ -0,0 +1,32 @@
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from lightparse.store.sqlite import migrate_jsonl, store_stats
+
+
+class Command(BaseCommand):
+    help = "Copy a JSONL parsed store into a SQLite store for LIGHTPARSE_STORE_BACKEND = 'sqlite'."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--source", help="JSONL store to read (default: LIGHTPARSE_STORE_PATH)")
+        parser.add_argument("--out", required=True, help="SQLite database to create or update")
+        parser.add_argument("--batch-size", type=int, default=1000, help="entries written per transaction")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        source = Path(options["source"] or settings.LIGHTPARSE_STORE_PATH)
+        out = Path(options["out"])
+        if not source.exists():
+            raise CommandError(f"store not found: {source}")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be >= 1")
+
+        copied = migrate_jsonl(source, out, batch_size=options["batch_size"])
+        self.stdout.write(f"Copied {copied} entries to {out}")
+
+        stats = store_stats(out)
+        for key, value in stats.items():
+            self.stdout.write(f"{key}: {value}")
+        self.stdout.write(self.style.SUCCESS("Set LIGHTPARSE_STORE_BACKEND = 'sqlite' and point LIGHTPARSE_STORE_PATH at it."))
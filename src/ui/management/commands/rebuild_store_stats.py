@@ -0,0 +1,26 @@
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from lightparse.store import get_backend
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard aggregates from every stored entry and report any drift."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        path = Path(settings.LIGHTPARSE_STORE_PATH)
+        backend = get_backend(getattr(settings, "LIGHTPARSE_STORE_BACKEND", "jsonl"))
+        before = backend.store_stats(path)
+        after = backend.rebuild_store_stats(path)
+
+        for key, value in after.items():
+            marker = "" if before[key] == value else f" (was {before[key]})"
+            self.stdout.write(f"{key}: {value}{marker}")
+
+        if before != after:
+            self.stdout.write(self.style.WARNING("Incremental aggregates had drifted; sidecar rewritten."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Aggregates verified."))
@@ -1,9 +1,12 @@
 from django.urls import path
 
-from ui import views
+from ui import api, views
 
 urlpatterns = [
     path("upload/", views.upload_view, name="upload"),
     path("dashboard/", views.dashboard_view, name="dashboard"),
+    path("analytics/", views.analytics_view, name="analytics"),
     path("entry/<str:entry_id>/", views.entry_detail_view, name="entry_detail"),
+    path("api/parse", api.parse_api_view, name="api_parse"),
+    path("api/metrics", api.api_metrics_view, name="api_metrics"),
 ]
@@ -1,22 +1,91 @@
 from __future__ import annotations
 
+import codecs
 import json
+import threading
 from pathlib import Path
-from typing import Any
+from types import ModuleType
+from typing import Any, Iterator, Optional
+from urllib.parse import urlencode
 
 from django.conf import settings
 from django.contrib import messages
+from django.core.files.uploadedfile import UploadedFile
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect, render
 
-from lightparse.pipeline.light_pipeline import LightParsePipeline
-from ui.storage import StoredEntry, find_entry, upsert_entries, read_store
+from lightparse.analytics import StoreCooccurrence
+from lightparse.pipeline.light_pipeline import LightParsePipeline, lexicon_fingerprint
+from lightparse.store import EntryFilter, StoredEntry, get_backend
 
 
 def _store_path() -> Path:
     return Path(settings.LIGHTPARSE_STORE_PATH)
 
 
+def _backend() -> ModuleType:
+    return get_backend(getattr(settings, "LIGHTPARSE_STORE_BACKEND", "jsonl"))
+
+
+def _upload_batch_size() -> int:
+    return int(getattr(settings, "LIGHTPARSE_UPLOAD_BATCH_SIZE", 1000))
+
+
+def _iter_upload_lines(f: UploadedFile) -> Iterator[str]:
+    """Decode an upload chunk by chunk, yielding one line at a time.
+
+    The incremental decoder carries multi-byte characters that straddle chunk
+    boundaries, so only the current chunk and a partial line are held.
+    """
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    for chunk in f.chunks():
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        yield from lines
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _entry_from_line(line: str) -> Optional[dict[str, Any]]:
+    try:
+        obj = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(obj, dict):
+        return None
+
+    entry_id = obj.get("entry_id")
+    text = obj.get("text", "")
+    if not entry_id or not isinstance(text, str):
+        return None
+    entry = {"entry_id": entry_id, "text": text}
+    for key in ("user_id", "timestamp"):
+        if obj.get(key) is not None:
+            entry[key] = obj[key]
+    return entry
+
+
+def _store_batch(pipeline: LightParsePipeline, batch: list[dict[str, Any]]) -> None:
+    new_entries = [
+        StoredEntry(
+            entry_id=str(entry["entry_id"]),
+            raw_text=entry["text"],
+            foods=[f.to_dict() for f in parsed.foods],
+            symptoms=[s.to_dict() for s in parsed.symptoms],
+            parse_errors=parsed.parse_errors,
+            parser_version=parsed.parser_version or "v1",
+            lexicon_fingerprint=lexicon_fingerprint(),
+            user_id=parsed.user_id,
+            timestamp=parsed.timestamp,
+        )
+        for entry, parsed in zip(batch, pipeline.iter_records(batch))
+    ]
+    _backend().upsert_entries(_store_path(), new_entries)
+
+
 def upload_view(request: HttpRequest) -> HttpResponse:
     if request.method == "POST":
         f = request.FILES.get("file")
@@ -29,99 +98,91 @@ def upload_view(request: HttpRequest) -> HttpResponse:
             return redirect("upload")
 
         pipeline = LightParsePipeline(parser_version="v1")
-        new_entries: list[StoredEntry] = []
+        batch_size = _upload_batch_size()
+        batch: list[dict[str, Any]] = []
+        accepted = 0
+        rejected = 0
+        line_num = 0
+        read_error = False
 
         try:
-            content = f.read().decode("utf-8")
-        except Exception:  # noqa: BLE001
-            messages.error(request, "Could not read file")
-            return redirect("upload")
-
-        for idx, line in enumerate(content.splitlines(), start=1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-
-            entry_id = obj.get("entry_id")
-            text = obj.get("text", "")
-            if not entry_id or not isinstance(text, str):
-                continue
-
-            parsed = pipeline.run({"entry_id": entry_id, "text": text})
-            new_entries.append(
-                StoredEntry(
-                    entry_id=str(entry_id),
-                    raw_text=text,
-                    foods=list(parsed.get("foods") or []),
-                    symptoms=list(parsed.get("symptoms") or []),
-                    parse_errors=list(parsed.get("parse_errors") or []),
-                    parser_version=str(parsed.get("parser_version") or "v1"),
-                )
-            )
-
-        if not new_entries:
-            messages.error(request, "No valid entries found in file")
+            for line_num, line in enumerate(_iter_upload_lines(f), start=1):
+                line = line.strip()
+                if not line:
+                    continue
+
+                entry = _entry_from_line(line)
+                if entry is None:
+                    rejected += 1
+                    continue
+
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    _store_batch(pipeline, batch)
+                    accepted += len(batch)
+                    batch = []
+        except UnicodeDecodeError:
+            read_error = True
+
+        if batch:
+            _store_batch(pipeline, batch)
+            accepted += len(batch)
+
+        if read_error:
+            messages.error(request, f"Could not read file past line {line_num}: not valid UTF-8")
+        if not accepted:
+            if not read_error:
+                messages.error(request, f"No valid entries found in file ({rejected} lines rejected)")
             return redirect("upload")
 
-        upsert_entries(_store_path(), new_entries)
-        messages.success(request, f"Parsed {len(new_entries)} entries")
+        summary = f"Parsed {accepted} entries"
+        if rejected:
+            summary += f", rejected {rejected} invalid lines"
+        messages.success(request, summary)
         return redirect("dashboard")
 
     return render(request, "upload.html")
 
 
-def dashboard_view(request: HttpRequest) -> HttpResponse:
-    entries = read_store(_store_path())
-
-    total = len(entries)
-    food_count = sum(1 for e in entries if len(e.foods) > 0)
-    symptom_count = sum(1 for e in entries if len(e.symptoms) > 0)
-    negated = 0
-    for e in entries:
-        for s in e.symptoms:
-            if s.get("negated") is True:
-                negated += 1
-
-    def _with_confidence_pct(entry: dict[str, Any]) -> dict[str, Any]:
-        foods = []
-        for f in list(entry.get("foods") or []):
-            f2 = dict(f)
-            try:
-                f2["confidence_pct"] = int(float(f2.get("confidence") or 0.0) * 100)
-            except (TypeError, ValueError):
-                f2["confidence_pct"] = 0
-            foods.append(f2)
-
-        symptoms = []
-        for s in list(entry.get("symptoms") or []):
-            s2 = dict(s)
-            try:
-                s2["confidence_pct"] = int(float(s2.get("confidence") or 0.0) * 100)
-            except (TypeError, ValueError):
-                s2["confidence_pct"] = 0
-            symptoms.append(s2)
-
-        entry2 = dict(entry)
-        entry2["foods"] = foods
-        entry2["symptoms"] = symptoms
-        return entry2
+def _page_size() -> int:
+    return int(getattr(settings, "LIGHTPARSE_PAGE_SIZE", 50))
+
 
+_FILTER_PARAMS = ("food", "meal", "symptom", "negated")
+
+
+def _entry_filter(request: HttpRequest) -> EntryFilter:
+    values = {k: request.GET.get(k, "").strip().lower() or None for k in _FILTER_PARAMS}
+    negated = values.pop("negated")
+    return EntryFilter(**values, negated=None if negated is None else negated in ("1", "true", "yes"))
+
+
+def dashboard_view(request: HttpRequest) -> HttpResponse:
+    backend = _backend()
+    filters = _entry_filter(request)
+    page = backend.list_page(
+        _store_path(),
+        after=request.GET.get("after") or None,
+        before=request.GET.get("before") or None,
+        limit=_page_size(),
+        filters=filters,
+    )
+
+    # Carried over to the pagination links.
+    active = {k: request.GET[k] for k in _FILTER_PARAMS if request.GET.get(k)}
     context: dict[str, Any] = {
-        "entries": [_with_confidence_pct(e.to_dict()) for e in entries],
-        "total": total,
-        "food_count": food_count,
-        "symptom_count": symptom_count,
-        "negated": negated,
+        "entries": page.entries,
+        "next_token": page.next_token,
+        "prev_token": page.prev_token,
+        "filters": active,
+        "filter_query": "&" + urlencode(active) if active else "",
+        **backend.store_stats(_store_path()),
     }
     return render(request, "dashboard.html", context)
 
 
 def entry_detail_view(request: HttpRequest, entry_id: str) -> HttpResponse:
-    e = find_entry(_store_path(), entry_id)
+    e = _backend().find_entry(_store_path(), entry_id)
     if not e:
         messages.error(request, f"Entry not found: {entry_id}")
         return redirect("dashboard")
@@ -152,3 +213,39 @@ def entry_detail_view(request: HttpRequest, entry_id: str) -> HttpResponse:
         "entry": entry_dict,
     }
     return render(request, "entry_detail.html", context)
+
+
+# One incrementally maintained co-occurrence index per store, shared by requests.
+_cooccurrence: dict[tuple[str, str], StoreCooccurrence] = {}
+_cooccurrence_lock = threading.Lock()
+
+
+def _store_cooccurrence() -> StoreCooccurrence:
+    name = getattr(settings, "LIGHTPARSE_STORE_BACKEND", "jsonl")
+    key = (name, str(_store_path()))
+    with _cooccurrence_lock:
+        if key not in _cooccurrence:
+            _cooccurrence[key] = StoreCooccurrence(_store_path(), backend=get_backend(name))
+        return _cooccurrence[key]
+
+
+def _int_param(request: HttpRequest, name: str, default: int) -> int:
+    try:
+        return max(1, int(request.GET.get(name, default)))
+    except ValueError:
+        return default
+
+
+def analytics_view(request: HttpRequest) -> HttpResponse:
+    min_count = _int_param(request, "min_count", 3)
+    top = _int_param(request, "top", 100)
+    entries, rows = _store_cooccurrence().associations(min_count)
+
+    context: dict[str, Any] = {
+        "entries": entries,
+        "pairs": len(rows),
+        "rows": rows[:top],
+        "min_count": min_count,
+        "top": top,
+    }
+    return render(request, "analytics.html", context)
@@ -0,0 +1,40 @@
+from typing import Any, Iterable, Union
+
+from lightparse.store import StoredEntry
+
+
+FoodSpec = Union[str, dict[str, Any]]
+SymptomSpec = Union[str, tuple[str, bool], dict[str, Any]]
+
+
+def _food(spec: FoodSpec) -> dict[str, Any]:
+    if isinstance(spec, dict):
+        return spec
+    return {"name": spec, "quantity": None, "unit": None, "meal": "unknown", "confidence": 0.8}
+
+
+def _symptom(spec: SymptomSpec) -> dict[str, Any]:
+    if isinstance(spec, dict):
+        return spec
+    name, negated = (spec, False) if isinstance(spec, str) else spec
+    return {"name": name, "severity": None, "time_hint": None, "negated": negated, "confidence": 0.85}
+
+
+def stored_entry(
+    entry_id: str, foods: Iterable[FoodSpec] = (), symptoms: Iterable[SymptomSpec] = (), **fields: Any
+) -> StoredEntry:
+    """Build a `StoredEntry` the way the pipeline would have stored it.
+
+    Foods and symptoms are given as full dicts or by name; a symptom may also
+    be `(name, negated)`. Any other `StoredEntry` field can be passed by keyword.
+    """
+
+    fields.setdefault("raw_text", "")
+    fields.setdefault("parse_errors", [])
+    fields.setdefault("parser_version", "v1")
+    return StoredEntry(
+        entry_id=entry_id,
+        foods=[_food(f) for f in foods],
+        symptoms=[_symptom(s) for s in symptoms],
+        **fields,
+    )
@@ -0,0 +1,115 @@
+import json
+import random
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from lightparse.analytics import CooccurrenceIndex, StoreCooccurrence
+from lightparse.cli import main
+from lightparse.store import jsonl, sqlite
+
+from tests.helpers import stored_entry
+
+
+@pytest.fixture(params=[False, True], ids=["counter", "numpy"])
+def dense(request) -> bool:
+    if request.param:
+        pytest.importorskip("numpy")
+    return request.param
+
+
+def test_counts_match_brute_force_after_replacements(dense: bool) -> None:
+    rng = random.Random(7)
+    rows = {
+        f"e{i}": (rng.sample(["rice", "dal", "paneer", "milk"], 2), rng.sample(["bloating", "headache", "gas"], 1))
+        for i in range(100)
+    }
+    index = CooccurrenceIndex(dense=dense)
+    for entry_id, (foods, symptoms) in rows.items():
+        index.add(entry_id, foods, symptoms)
+    # Re-adding an entry replaces its old row.
+    for entry_id in ("e3", "e50", "e3"):
+        rows[entry_id] = (rng.sample(["rice", "milk", "tea"], 2), rng.sample(["gas", "nausea"], 1))
+        index.add(entry_id, *rows[entry_id])
+
+    expected = Counter((f, s) for foods, symptoms in rows.values() for f in foods for s in symptoms)
+    got = {(a.food, a.symptom): a for a in index.associations()}
+    assert {k: a.count for k, a in got.items()} == dict(expected)
+    assert index.food_counts == Counter(f for foods, _ in rows.values() for f in foods)
+
+    a = got[("milk", "gas")]
+    milk = sum("milk" in f for f, _ in rows.values())
+    gas = sum("gas" in s for _, s in rows.values())
+    assert (a.food_count, a.symptom_count, a.entries) == (milk, gas, 100)
+    assert a.lift == pytest.approx(expected[("milk", "gas")] * 100 / (milk * gas))
+
+
+def test_dense_counts_match_counter_across_batches(monkeypatch) -> None:
+    pytest.importorskip("numpy")
+    monkeypatch.setattr("lightparse.analytics._MATRIX_BATCH", 7)
+    rng = random.Random(3)
+    foods = [f"food{i}" for i in range(150)]
+    symptoms = [f"symptom{i}" for i in range(40)]
+    dense_index, plain = CooccurrenceIndex(dense=True), CooccurrenceIndex(dense=False)
+    for i in range(600):
+        row = (f"e{rng.randrange(300)}", rng.sample(foods, rng.randint(0, 4)), rng.sample(symptoms, rng.randint(0, 3)))
+        dense_index.add(*row)
+        plain.add(*row)
+
+    assert dense_index.associations() == plain.associations()
+    assert dense_index.associations(min_count=3) == plain.associations(min_count=3)
+    assert dense_index.symptom_counts == plain.symptom_counts
+
+
+def test_store_index_follows_appends_and_ignores_negated(tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    jsonl.upsert_entries(store, [stored_entry("a", ["milk"], [("bloating", False)]), stored_entry("b", ["milk"], [("bloating", True)])])
+    follower = StoreCooccurrence(store)
+
+    entries, rows = follower.associations()
+    assert entries == 2
+    assert [(a.food, a.symptom, a.count) for a in rows] == [("milk", "bloating", 1)]
+
+    jsonl.upsert_entries(store, [stored_entry("b", ["milk"], [("bloating", False)]), stored_entry("c", ["tea"], [])])
+    entries, rows = follower.associations()
+    assert entries == 3
+    assert [(a.food, a.symptom, a.count) for a in rows] == [("milk", "bloating", 2)]
+
+    jsonl.compact_store(store)
+    assert follower.associations()[1][0].count == 2
+
+
+def test_cooccur_cli_on_sqlite_store(tmp_path: Path, capsys) -> None:
+    db = tmp_path / "store.sqlite3"
+    sqlite.upsert_entries(
+        db,
+        [stored_entry(f"e{i}", ["paneer"] if i % 2 else ["rice"], [("bloating", False)] if i % 2 else []) for i in range(10)],
+    )
+
+    assert main(["cooccur", "--store", str(db), "--min-count", "2", "--json"]) == 0
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert rows == [
+        {
+            "food": "paneer",
+            "symptom": "bloating",
+            "count": 5,
+            "food_count": 5,
+            "symptom_count": 5,
+            "entries": 10,
+            "p_symptom_given_food": 1.0,
+            "p_food_given_symptom": 1.0,
+            "lift": 2.0,
+        }
+    ]
+
+
+@pytest.mark.django_db
+def test_analytics_page(client, settings, tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    settings.LIGHTPARSE_STORE_PATH = str(store)
+    jsonl.upsert_entries(store, [stored_entry(f"e{i}", ["paneer"], [("bloating", False)]) for i in range(3)])
+
+    response = client.get("/analytics/", {"min_count": "2"})
+    assert response.status_code == 200
+    assert [(a.food, a.symptom, a.count) for a in response.context["rows"]] == [("paneer", "bloating", 3)]
@@ -0,0 +1,98 @@
+import json
+import threading
+
+import pytest
+
+from lightparse.pipeline.light_pipeline import LightParsePipeline
+from ui import api
+
+
+@pytest.fixture(autouse=True)
+def _fresh_batcher(monkeypatch):
+    monkeypatch.setattr(api, "_batcher", None)
+
+
+def test_parse_single_entry_and_batch(client) -> None:
+    response = client.post("/api/parse", {"entry_id": "e1", "text": "2 eggs. no headache"}, content_type="application/json")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["entry_id"] == "e1"
+    assert body["foods"][0]["name"] == "egg"
+    assert body["symptoms"][0]["negated"] is True
+
+    entries = [{"entry_id": f"e{i}", "text": "rice"} for i in range(3)] + [{"text": "no id"}]
+    response = client.post("/api/parse", {"entries": entries}, content_type="application/json")
+    results = response.json()["results"]
+    assert [r["entry_id"] for r in results] == ["e0", "e1", "e2", None]
+    assert results[3]["parse_errors"] == ["missing_entry_id"]
+
+    metrics = client.get("/api/metrics").json()
+    assert metrics["requests"] == 2
+    assert metrics["entries"] == 5
+    assert metrics["queue_depth"] == 0
+
+
+def test_parse_rejects_bad_requests(client, settings) -> None:
+    settings.LIGHTPARSE_API_MAX_ENTRIES = 2
+
+    assert client.post("/api/parse", "not json", content_type="application/json").status_code == 400
+    assert client.post("/api/parse", {"entries": []}, content_type="application/json").status_code == 400
+    too_many = [{"entry_id": str(i), "text": "tea"} for i in range(3)]
+    assert client.post("/api/parse", too_many, content_type="application/json").status_code == 413
+    assert client.get("/api/parse").status_code == 405
+
+
+class _GatedPipeline(LightParsePipeline):
+    """Blocks each batch until released, so the test controls the queue."""
+
+    def __init__(self) -> None:
+        super().__init__(parser_version="v1")
+        self.gate = threading.Event()
+        self.started = threading.Event()
+
+    def iter_records(self, entries):
+        self.started.set()
+        self.gate.wait(5)
+        return super().iter_records(entries)
+
+
+def test_batcher_groups_concurrent_requests_and_applies_backpressure() -> None:
+    pipeline = _GatedPipeline()
+    batcher = api.MicroBatcher(pipeline, max_batch=8, max_wait=0.0, capacity=4)
+
+    first = batcher.submit([{"entry_id": "warmup", "text": "tea"}])
+    assert pipeline.started.wait(5)
+
+    # The worker is busy, so these queue up and are parsed as one batch.
+    futures = [batcher.submit([{"entry_id": f"e{i}", "text": "2 eggs"}]) for i in range(3)]
+    with pytest.raises(api.QueueFull):
+        batcher.submit([{"entry_id": "x", "text": "tea"}, {"entry_id": "y", "text": "tea"}])
+    assert batcher.metrics()["queue_depth"] == 3
+
+    pipeline.gate.set()
+    assert first.result(5)[0].entry_id == "warmup"
+    assert [f.result(5)[0].entry_id for f in futures] == ["e0", "e1", "e2"]
+
+    metrics = batcher.metrics()
+    assert metrics["batches"] == 2
+    assert metrics["largest_batch"] == 3
+    assert metrics["rejected"] == 1
+    assert json.loads(futures[0].result()[0].to_json())["foods"][0]["quantity"] == "2"
+
+
+def test_batcher_skips_cancelled_requests() -> None:
+    pipeline = _GatedPipeline()
+    batcher = api.MicroBatcher(pipeline, max_batch=8, max_wait=0.0)
+
+    first = batcher.submit([{"entry_id": "warmup", "text": "tea"}])
+    assert pipeline.started.wait(5)
+
+    # A client that disconnects cancels its queued request.
+    gone = batcher.submit([{"entry_id": "gone", "text": "tea"}])
+    assert gone.cancel()
+
+    pipeline.gate.set()
+    assert first.result(5)[0].entry_id == "warmup"
+    second = batcher.submit([{"entry_id": "after", "text": "rice"}])
+    assert second.result(5)[0].entry_id == "after"
+    assert batcher.metrics()["requests"] == 2
@@ -0,0 +1,34 @@
+from benchmarks.corpus import generate_corpus
+from benchmarks.run import compare, meal_rules_per_pattern, run_benchmarks
+from lightparse.parsers import food
+
+
+def test_corpus_is_deterministic_and_seeded() -> None:
+    first = list(generate_corpus(50, seed=7))
+
+    assert first == list(generate_corpus(50, seed=7))
+    assert first != list(generate_corpus(50, seed=8))
+    assert len({e["entry_id"] for e in first}) == 50
+
+
+def test_run_benchmarks_reports_latency_and_flags_regressions() -> None:
+    report = run_benchmarks(30, seed=0, repeat=1, cli_workers=[])
+
+    row = report["results"]["pipeline_run"]
+    assert row["entries"] == 30
+    assert 0 < row["p50_us"] <= row["p99_us"]
+
+    baseline = {"results": {"pipeline_run": {"entries_per_s": row["entries_per_s"] * 2}}}
+    assert compare(report, baseline, tolerance=0.1) and not compare(report, report, tolerance=0.1)
+
+
+def test_merged_meal_scanner_matches_per_pattern_rules() -> None:
+    texts = [e["text"].lower() for e in generate_corpus(500, seed=3)] + [
+        "skipped dinner, had bf late",
+        "aaj dinner skip kiya",
+        "lunch mein rajma, skipped breakfast",
+        "snacks after lunch",
+        "",
+    ]
+    for text in texts:
+        assert food._scan_meal_rules(text) == meal_rules_per_pattern(text), text
@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from lightparse.pipeline.cache import ParseCache
+from lightparse.pipeline.light_pipeline import LightParsePipeline
+
+
+def test_cache_returns_identical_results_and_counts_hits() -> None:
+    cache = ParseCache(max_entries=10)
+    cached = LightParsePipeline(parser_version="v1", cache=cache)
+    plain = LightParsePipeline(parser_version="v1")
+
+    first = cached.run({"entry_id": "a", "text": "Oats + coffee. No headache"})
+    second = cached.run({"entry_id": "b", "text": "oats + COFFEE. no headache"})
+
+    assert first == plain.run({"entry_id": "a", "text": "Oats + coffee. No headache"})
+    assert second["entry_id"] == "b"
+    assert second["foods"] == first["foods"]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    second["foods"][0]["name"] = "mutated"
+    assert cached.run({"entry_id": "c", "text": "oats + coffee. no headache"})["foods"] == first["foods"]
+
+
+def test_cache_key_includes_parser_version() -> None:
+    assert ParseCache.key("chai", "v1") != ParseCache.key("chai", "v2")
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache = ParseCache(max_entries=2)
+    for key in ("a", "b", "a", "c"):
+        if cache.get(key) is None:
+            cache.put(key, [], [])
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+
+
+def test_disk_tier_survives_across_instances(tmp_path: Path) -> None:
+    path = tmp_path / "cache.sqlite3"
+    first = ParseCache(max_entries=0, path=path)
+    LightParsePipeline(cache=first).run({"entry_id": "a", "text": "skipped breakfast"})
+    first.close()
+
+    second = ParseCache(max_entries=10, path=path)
+    out = LightParsePipeline(cache=second).run({"entry_id": "b", "text": "skipped breakfast"})
+    assert out["foods"][0]["name"] == "skipped_meal"
+    assert second.stats()["disk_hits"] == 1
+    second.close()
+
+
+def test_lexicon_edit_misses_the_disk_tier(tmp_path: Path) -> None:
+    src_dir = str(Path(__file__).resolve().parent.parent / "src")
+    lexicons = tmp_path / "lexicons"
+    lexicons.mkdir()
+    foods = Path(src_dir) / "lightparse" / "lexicons" / "foods.txt"
+    (lexicons / "foods.txt").write_text(foods.read_text(encoding="utf-8"), encoding="utf-8")
+    entries = tmp_path / "in.jsonl"
+    entries.write_text('{"entry_id": "a", "text": "jalebi"}\n', encoding="utf-8")
+    env = {
+        **os.environ,
+        "PYTHONPATH": src_dir,
+        "LIGHTPARSE_LEXICON_DIR": str(lexicons),
+        "LIGHTPARSE_LEXICON_CACHE": str(tmp_path / "idx"),
+    }
+    args = ["--in", str(entries), "--out", "-", "--cache-path", str(tmp_path / "pc.sqlite")]
+
+    def run() -> tuple[dict, str]:
+        proc = subprocess.run(
+            [sys.executable, "-m", "lightparse.cli", *args], env=env, capture_output=True, text=True, check=True
+        )
+        return json.loads(proc.stdout), proc.stderr
+
+    first, _ = run()
+    assert first["foods"] == []
+
+    with (lexicons / "foods.txt").open("a", encoding="utf-8") as f:
+        f.write("jalebi\n")
+    second, stderr = run()
+    assert [f["name"] for f in second["foods"]] == ["jalebi"]
+    assert "disk_hits=0 misses=1" in stderr
@@ -0,0 +1,134 @@
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from lightparse.cli import main
+
+
+def _read_out(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_cli_workers_preserve_input_order(tmp_path: Path) -> None:
+    src = Path(__file__).parent / "entries.jsonl"
+    serial = tmp_path / "serial.jsonl"
+    parallel = tmp_path / "parallel.jsonl"
+
+    assert main(["--in", str(src), "--out", str(serial)]) == 0
+    assert main(["--in", str(src), "--out", str(parallel), "--workers", "2", "--chunk-size", "4"]) == 0
+
+    assert _read_out(parallel) == _read_out(serial)
+
+
+def test_cli_bad_line_does_not_drop_its_chunk(tmp_path: Path) -> None:
+    src = tmp_path / "in.jsonl"
+    src.write_text(
+        '{"entry_id": "a", "text": "2 eggs"}\n'
+        "{not json\n"
+        "[1, 2]\n"
+        '{"entry_id": "b", "text": "no headache"}\n',
+        encoding="utf-8",
+    )
+    out = tmp_path / "out.jsonl"
+
+    assert main(["--in", str(src), "--out", str(out), "--workers", "2", "--chunk-size", "10", "--unordered"]) == 0
+
+    rows = _read_out(out)
+    assert [r["entry_id"] for r in rows] == ["a", None, None, "b"]
+    assert rows[1]["parse_errors"][-1].startswith("json_decode_error_line_2")
+    assert "invalid_entry_line_3" in rows[2]["parse_errors"]
+
+
+def test_cli_cache_error_only_fails_its_line(tmp_path: Path, monkeypatch) -> None:
+    import sqlite3
+
+    from lightparse.pipeline.cache import ParseCache
+
+    real_get = ParseCache.get
+
+    def flaky_get(self, key):
+        if flaky_get.calls == 1:
+            flaky_get.calls += 1
+            raise sqlite3.OperationalError("database is locked")
+        flaky_get.calls += 1
+        return real_get(self, key)
+
+    flaky_get.calls = 0
+    monkeypatch.setattr(ParseCache, "get", flaky_get)
+
+    src = tmp_path / "in.jsonl"
+    src.write_text(
+        '{"entry_id": "a", "text": "2 eggs"}\n{"entry_id": "b", "text": "poha"}\n{"entry_id": "c", "text": "chai"}\n',
+        encoding="utf-8",
+    )
+    out = tmp_path / "out.jsonl"
+
+    assert main(["--in", str(src), "--out", str(out)]) == 0
+
+    rows = _read_out(out)
+    assert [r["entry_id"] for r in rows] == ["a", "b", "c"]
+    assert rows[1]["parse_errors"] == ["pipeline_error_line_2:OperationalError"]
+    assert rows[0]["foods"] and rows[2]["foods"]
+
+
+def test_cli_streams_stdin_to_stdout(monkeypatch, capsys) -> None:
+    monkeypatch.setattr("sys.stdin", io.StringIO('{"entry_id": "a", "text": "chai. tired"}\n\n{"entry_id": "b", "text": "poha"}\n'))
+
+    assert main(["--in", "-", "--out", "-", "--flush-every", "1"]) == 0
+
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [r["entry_id"] for r in rows] == ["a", "b"]
+    assert rows[0]["symptoms"][0]["name"] == "fatigue"
+
+
+def test_cli_stats_sinks_merge_worker_snapshots(tmp_path: Path) -> None:
+    src = Path(__file__).parent / "entries.jsonl"
+    log = tmp_path / "stats.jsonl"
+    prom = tmp_path / "stats.prom"
+
+    args = ["--in", str(src), "--out", str(tmp_path / "out.jsonl"), "--workers", "2", "--chunk-size", "4"]
+    assert main(args + ["--stats-json", str(log), "--stats-prom", str(prom), "--cache-size", "0"]) == 0
+
+    n = len(_read_out(tmp_path / "out.jsonl"))
+    snapshot = json.loads(log.read_text(encoding="utf-8"))
+    assert snapshot["entries"] == n
+    assert snapshot["stages"]["food"]["calls"] == n
+    assert snapshot["stages"]["write"]["calls"] == n
+    assert snapshot["caches"]["food_names"]["hits"] + snapshot["caches"]["food_names"]["misses"] > 0
+    assert f"lightparse_entries_total {n}" in prom.read_text(encoding="utf-8")
+    assert 'lightparse_cache_hits_total{cache="food_names"}' in prom.read_text(encoding="utf-8")
+
+
+def test_cli_import_defers_heavy_modules() -> None:
+    code = (
+        "import sys, lightparse.cli; "
+        "print([m for m in ('multiprocessing', 'sqlite3', 'cProfile', 'pstats') if m in sys.modules])"
+    )
+    src_dir = str(Path(__file__).resolve().parent.parent / "src")
+    out = subprocess.run(
+        [sys.executable, "-c", code], env={**os.environ, "PYTHONPATH": src_dir}, capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "[]"
+
+
+def test_library_does_not_import_the_django_app() -> None:
+    code = (
+        "import sys, lightparse.analytics, lightparse.export, lightparse.reparse; "
+        "print([m for m in sys.modules if m == 'ui' or m.startswith(('ui.', 'django'))])"
+    )
+    src_dir = str(Path(__file__).resolve().parent.parent / "src")
+    out = subprocess.run(
+        [sys.executable, "-c", code], env={**os.environ, "PYTHONPATH": src_dir}, capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "[]"
+
+
+def test_cli_selftest_startup_reports_json(capsys) -> None:
+    assert main(["--selftest-startup", "1"]) == 0
+
+    report = json.loads(capsys.readouterr().out)
+    assert report["runs"] == 1
+    assert report["first_output_p50_ms"] > 0
@@ -0,0 +1,97 @@
+import json
+import random
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from lightparse.cli import main
+from lightparse.correlate import lagged_associations, parse_duration
+from lightparse.store import StoredEntry, jsonl
+
+from tests.helpers import stored_entry
+
+_HOUR = 3600
+
+
+def _stored(entry_id: str, ts: float | None, foods: list[str], symptoms: list[str], user: str | None = None) -> StoredEntry:
+    return stored_entry(entry_id, foods, symptoms, user_id=user, timestamp=None if ts is None else f"{ts:.0f}")
+
+
+def test_duration_parsing() -> None:
+    assert parse_duration("90") == 90
+    assert parse_duration("30m") == 1800
+    assert parse_duration("6H") == 6 * _HOUR
+    assert parse_duration("1.5d") == 1.5 * 86400
+    with pytest.raises(ValueError):
+        parse_duration("soon")
+
+
+def test_window_join_matches_brute_force() -> None:
+    rng = random.Random(3)
+    entries = [
+        _stored(
+            f"e{i}",
+            rng.randrange(0, 72 * _HOUR),
+            rng.sample(["rice", "dal", "milk", "tea"], rng.randrange(0, 3)),
+            rng.sample(["bloating", "gas"], rng.randrange(0, 2)),
+            user=rng.choice(["u1", "u2"]),
+        )
+        for i in range(400)
+    ]
+    min_lag, max_lag = 1 * _HOUR, 5 * _HOUR
+
+    expected: Counter[tuple[str, str]] = Counter()
+    for s in entries:
+        for symptom in {x["name"] for x in s.symptoms}:
+            foods = {
+                f["name"]
+                for e in entries
+                if e.user_id == s.user_id
+                and min_lag <= float(s.timestamp) - float(e.timestamp) <= max_lag
+                for f in e.foods
+            }
+            for food in foods:
+                expected[food, symptom] += 1
+
+    report = lagged_associations(entries, min_lag, max_lag)
+    assert {(p.food, p.symptom): p.count for p in report.pairs} == dict(expected)
+    assert report.users == 2
+    assert report.symptom_events == sum(len(e.symptoms) for e in entries)
+
+
+def test_window_keeps_users_apart_and_skips_untimed_entries() -> None:
+    entries = [
+        _stored("a", 0, ["milk"], [], user="u1"),
+        _stored("b", 2 * _HOUR, [], ["bloating"], user="u1"),
+        _stored("c", 1 * _HOUR, ["paneer"], [], user="u2"),
+        _stored("d", 1 * _HOUR, ["tea"], ["bloating"], user="u1"),
+        _stored("e", None, ["rice"], ["bloating"], user="u1"),
+    ]
+
+    report = lagged_associations(entries, max_lag=3 * _HOUR)
+    assert [(p.food, p.count, p.symptom_count) for p in report.pairs] == [("milk", 2, 2), ("tea", 2, 2)]
+    assert report.skipped_entries == 1
+
+    # A symptom reported with the food in the same entry is not a lagged link.
+    report = lagged_associations(entries, min_lag=30 * 60, max_lag=3 * _HOUR)
+    assert [(p.food, p.count) for p in report.pairs] == [("milk", 2), ("tea", 1)]
+
+
+def test_cooccur_cli_window(tmp_path: Path, capsys) -> None:
+    store = tmp_path / "store.jsonl"
+    jsonl.upsert_entries(
+        store,
+        [_stored(f"f{i}", i * 24 * _HOUR, ["paneer"], []) for i in range(4)]
+        + [_stored(f"s{i}", i * 24 * _HOUR + 3 * _HOUR, [], ["bloating"]) for i in range(4)],
+    )
+
+    assert main(["cooccur", "--store", str(store), "--window", "6h", "--min-count", "2", "--json"]) == 0
+    captured = capsys.readouterr()
+    assert [json.loads(line) for line in captured.out.splitlines()] == [
+        {"food": "paneer", "symptom": "bloating", "count": 4, "symptom_count": 4, "share": 1.0}
+    ]
+    assert "4 symptom reports from 1 users" in captured.err
+
+    assert main(["cooccur", "--store", str(store), "--window", "2h", "--json"]) == 0
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,55 @@
+import json
+import math
+from pathlib import Path
+
+from lightparse.cli import main
+from lightparse.export import read_npy
+from lightparse.store.jsonl import upsert_entries
+
+from tests.helpers import stored_entry
+
+
+def test_export_writes_dictionary_encoded_columns(tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    upsert_entries(
+        store,
+        [
+            stored_entry(
+                "b",
+                [{"name": "dal", "quantity": "half", "unit": "bowl", "meal": "lunch", "confidence": 0.9}],
+                [{"name": "headache", "severity": None, "time_hint": "night", "negated": True, "confidence": 0.95}],
+            ),
+            stored_entry(
+                "a",
+                [
+                    {"name": "egg", "quantity": "2", "unit": None, "meal": "breakfast", "confidence": 0.9},
+                    {"name": "dal", "quantity": None, "unit": None, "meal": "breakfast", "confidence": 0.7},
+                ],
+                [],
+            ),
+        ],
+    )
+    out = tmp_path / "export"
+
+    assert main(["export", "--store", str(store), "--out", str(out)]) == 0
+
+    manifest = json.loads((out / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["tables"]["foods"]["rows"] == 3
+    assert manifest["tables"]["symptoms"]["rows"] == 1
+
+    entry_ids = read_npy(out / "dict" / "entry_id.npy")
+    food_names = read_npy(out / "dict" / "food_name.npy")
+    units = read_npy(out / "dict" / "unit.npy")
+    entries = [entry_ids[c] for c in read_npy(out / "foods" / "entry.npy")]
+    names = [food_names[c] for c in read_npy(out / "foods" / "name.npy")]
+    quantities = list(read_npy(out / "foods" / "quantity.npy"))
+
+    assert list(zip(entries, names)) == [("a", "egg"), ("a", "dal"), ("b", "dal")]
+    assert quantities[0] == 2.0 and math.isnan(quantities[1]) and quantities[2] == 0.5
+    assert [units[c] if c >= 0 else None for c in read_npy(out / "foods" / "unit.npy")] == [None, None, "bowl"]
+    assert list(read_npy(out / "symptoms" / "severity.npy")) == [-1]
+    assert list(read_npy(out / "symptoms" / "negated.npy")) == [1]
+
+    # Re-exporting replaces the previous export in place.
+    assert main(["export", "--store", str(store), "--out", str(out)]) == 0
+    assert not [p for p in tmp_path.iterdir() if p.name.startswith("export.")]
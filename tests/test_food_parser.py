@@ -1,6 +1,8 @@
 import pytest
 
+from lightparse.parsers import food as food_module
 from lightparse.parsers.food import FoodParser
+from lightparse.utils.lexicon import food_index
 
 
 def _names(items: list[dict]) -> set[str]:
@@ -31,3 +33,32 @@ def test_food_parser_hinglish_embedded_phrase_with_qty_after_name() -> None:
 def test_food_parser_does_not_emit_symptoms_as_foods() -> None:
     foods = FoodParser.parse("Cramps started by noon")
     assert foods == []
+
+
+def test_food_parser_multiword_longest_match_with_word_boundaries() -> None:
+    foods = FoodParser.parse("Egg biryani for dinner, then ice creams")
+    assert {"egg biryani", "ice cream"} <= _names(foods)
+    assert "biryani" not in _names(foods)
+
+    assert "ice cream" not in _names(FoodParser.parse("rice creamy soup"))
+
+
+def test_food_parser_emits_multiword_foods_first_longest_first() -> None:
+    foods = FoodParser.parse("Skipped lunch. Salad, ice cream and egg biryani")
+    assert [f["name"] for f in foods] == ["skipped_meal", "egg biryani", "ice cream", "salad"]
+
+
+def test_food_for_word_matches_singularizing_every_word() -> None:
+    words = {w for food in food_index() for w in food.split()}
+    words |= {w + suffix for w in set(words) for suffix in ("s", "es", "ies", "ss")}
+    words |= {w[:-1] + "ies" for w in set(words) if w.endswith("y")}
+
+    for word in words:
+        n = food_module._singularize(word)
+        assert food_module._food_for_word(word) == (n if n in food_index() else None), word
+
+
+def test_meal_scanner_sees_every_rule_starting_at_one_offset() -> None:
+    # "dinner skip" is both the dinner keyword and a skipped-dinner rule.
+    assert food_module._scan_meal_rules("dinner skip kiya") == ("dinner", ["dinner"])
+    assert food_module._scan_meal_rules("nothing to see") == ("unknown", [])
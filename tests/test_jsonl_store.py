@@ -0,0 +1,145 @@
+from pathlib import Path
+
+from lightparse.store import jsonl
+from lightparse.store.jsonl import (
+    StoredEntry,
+    compact_store,
+    find_entry,
+    list_page,
+    read_store,
+    rebuild_store_stats,
+    store_stats,
+    upsert_entries,
+)
+
+from tests.helpers import stored_entry
+
+
+def _entry(entry_id: str, text: str = "chai", negated: bool = False) -> StoredEntry:
+    return stored_entry(entry_id, ["chai"], [("headache", negated)], raw_text=text)
+
+
+def test_upsert_appends_and_latest_version_wins(tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    upsert_entries(store, [_entry("b"), _entry("a")])
+    size_before = store.stat().st_size
+
+    upsert_entries(store, [_entry("a", text="updated")])
+
+    assert store.read_bytes()[:size_before].count(b"\n") == 2
+    assert [e.entry_id for e in read_store(store)] == ["a", "b"]
+    assert find_entry(store, "a").raw_text == "updated"
+
+
+def test_compaction_drops_superseded_records(tmp_path: Path, monkeypatch) -> None:
+    store = tmp_path / "store.jsonl"
+    monkeypatch.setattr(jsonl, "_COMPACT_MIN_DEAD", 2)
+
+    upsert_entries(store, [_entry("a"), _entry("b")])
+    upsert_entries(store, [_entry("a", text="v2")])
+    assert len(store.read_text(encoding="utf-8").splitlines()) == 3
+
+    upsert_entries(store, [_entry("a", text="v3"), _entry("a", text="v4")])
+    assert len(store.read_text(encoding="utf-8").splitlines()) == 2
+    assert find_entry(store, "a").raw_text == "v4"
+
+    upsert_entries(store, [_entry("c")])
+    compact_store(store)
+    assert [e.entry_id for e in read_store(store)] == ["a", "b", "c"]
+
+
+def test_index_catches_up_with_external_appends(tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    upsert_entries(store, [_entry("a")])
+    with store.open("ab") as f:
+        f.write(jsonl._encode_record(_entry("z", text="external")))
+
+    upsert_entries(store, [_entry("b")])
+
+    assert [e.entry_id for e in read_store(store)] == ["a", "b", "z"]
+
+
+def test_find_entry_reads_only_the_indexed_record(tmp_path: Path, monkeypatch) -> None:
+    store = tmp_path / "store.jsonl"
+    upsert_entries(store, [_entry(f"e_{i:03d}") for i in range(50)])
+
+    def _no_full_scan(path: Path) -> list[StoredEntry]:
+        raise AssertionError("find_entry must not scan the store")
+
+    monkeypatch.setattr(jsonl, "read_store", _no_full_scan)
+
+    assert find_entry(store, "e_042").entry_id == "e_042"
+    assert find_entry(store, "missing") is None
+
+
+def test_find_entry_rebuilds_missing_or_stale_index(tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    upsert_entries(store, [_entry("a"), _entry("b")])
+
+    jsonl._index_path(store).unlink()
+    assert find_entry(store, "b").entry_id == "b"
+
+    store.write_bytes(jsonl._encode_record(_entry("c", text="replaced")))
+    assert find_entry(store, "a") is None
+    assert find_entry(store, "c").raw_text == "replaced"
+
+
+def test_list_page_walks_cursor_tokens_in_both_directions(tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    upsert_entries(store, [_entry(f"e_{i:02d}") for i in range(7)])
+
+    first = list_page(store, limit=3)
+    assert [e.entry_id for e in first.entries] == ["e_00", "e_01", "e_02"]
+    assert first.prev_token is None
+
+    second = list_page(store, after=first.next_token, limit=3)
+    third = list_page(store, after=second.next_token, limit=3)
+    assert [e.entry_id for e in third.entries] == ["e_06"]
+    assert third.next_token is None
+
+    back = list_page(store, before=third.prev_token, limit=3)
+    assert back.entries == second.entries
+    assert [e.entry_id for e in list_page(store, before=back.prev_token, limit=3).entries] == ["e_00", "e_01", "e_02"]
+
+
+def test_store_stats_follow_latest_versions(tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    upsert_entries(store, [_entry("a", negated=True), _entry("b")])
+    upsert_entries(store, [_entry("a", negated=False)])
+
+    assert store_stats(store) == {"total": 2, "food_count": 2, "symptom_count": 2, "negated": 0}
+
+
+def test_incremental_stats_match_a_full_rebuild(tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    upsert_entries(store, [_entry("a", negated=True), _entry("b", negated=True)])
+    upsert_entries(store, [_entry("a"), _entry("c", negated=True), _entry("c")])
+
+    incremental = store_stats(store)
+    assert incremental == {"total": 3, "food_count": 3, "symptom_count": 3, "negated": 1}
+    assert rebuild_store_stats(store) == incremental
+
+
+def test_store_stats_recovers_from_external_changes(tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    upsert_entries(store, [_entry("a", negated=True)])
+    with store.open("ab") as f:
+        f.write(jsonl._encode_record(_entry("b", negated=True)))
+
+    assert store_stats(store)["negated"] == 2
+
+
+def test_upsert_after_a_torn_tail_keeps_the_new_records(tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    upsert_entries(store, [_entry("a"), _entry("b")])
+    # A writer that crashed mid-record leaves a partial last line.
+    with store.open("ab") as f:
+        f.write(jsonl._encode_record(_entry("x"))[:20])
+
+    upsert_entries(store, [_entry("c")])
+
+    assert [e.entry_id for e in read_store(store)] == ["a", "b", "c"]
+    assert find_entry(store, "c").entry_id == "c"
+    assert [e.entry_id for _, e in jsonl.iter_log(store) if e is not None] == ["a", "b", "c"]
+    assert store_stats(store)["total"] == 3
+    assert rebuild_store_stats(store) == store_stats(store)
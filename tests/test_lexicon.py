@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from lightparse.utils.lexicon import TermIndex, compile_index, lexicon_path, load_term_index, parse_term_map
+
+
+def test_term_index_lookups_and_prefixes() -> None:
+    index = TermIndex(compile_index([("ice cream", ""), ("egg", ""), ("moong dal dosa", ""), ("egg", "dup")]), "x")
+
+    assert len(index) == 3
+    assert index.max_words == 3
+    assert "egg" in index and "eggs" not in index
+    assert index.has_prefix("moong ") and not index.has_prefix("dal ")
+    assert list(index) == ["egg", "ice cream", "moong dal dosa"]
+    assert index.get("egg") == ""
+
+
+def test_load_term_index_caches_by_content_hash(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = tmp_path / "cache"
+    monkeypatch.setenv("LIGHTPARSE_LEXICON_CACHE", str(cache))
+    source = tmp_path / "symptoms.tsv"
+    source.write_text("# comment\nBloated\tbloating\ntired\tfatigue\n", encoding="utf-8")
+
+    first = load_term_index("symptoms", source, parse_term_map)
+    assert dict(first.items()) == {"bloated": "bloating", "tired": "fatigue"}
+    assert len(list(cache.iterdir())) == 1
+
+    assert load_term_index("symptoms", source, parse_term_map).digest == first.digest
+    assert len(list(cache.iterdir())) == 1
+
+    source.write_text("dizzy\tdizziness\n", encoding="utf-8")
+    assert load_term_index("symptoms", source, parse_term_map).get("dizzy") == "dizziness"
+    assert len(list(cache.iterdir())) == 2
+
+
+def test_lexicon_dir_overrides_bundled_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "foods.txt").write_text("jalebi\n", encoding="utf-8")
+    monkeypatch.setenv("LIGHTPARSE_LEXICON_DIR", str(tmp_path))
+
+    assert lexicon_path("foods.txt") == tmp_path / "foods.txt"
+    assert lexicon_path("meals.json").name == "meals.json"
+    assert lexicon_path("meals.json").parent != tmp_path
+
+
+def test_importing_the_parsers_loads_no_lexicon() -> None:
+    code = (
+        "import lightparse.pipeline.light_pipeline as p; "
+        "from lightparse.utils import lexicon as lx; "
+        "print([f.cache_info().currsize for f in (lx.food_index, lx.symptom_index, lx.meal_rules)]); "
+        "p.LightParsePipeline().run({'entry_id': 'a', 'text': 'skipped lunch, 2 eggs. mild headache'}); "
+        "print([f.cache_info().currsize for f in (lx.food_index, lx.symptom_index, lx.meal_rules)])"
+    )
+    src_dir = str(Path(__file__).resolve().parent.parent / "src")
+    out = subprocess.run(
+        [sys.executable, "-c", code], env={**os.environ, "PYTHONPATH": src_dir}, capture_output=True, text=True, check=True
+    )
+    assert out.stdout.split("\n")[:2] == ["[0, 0, 0]", "[1, 1, 1]"]
@@ -1,3 +1,6 @@
+import json
+
+from lightparse.pipeline.instrument import DictSink, Instrumentation
 from lightparse.pipeline.light_pipeline import LightParsePipeline
 
 
@@ -22,3 +25,89 @@ def test_pipeline_missing_entry_id_is_reported() -> None:
     pipeline = LightParsePipeline(parser_version="v1")
     out = pipeline.run({"text": "chips. Stomach pain after 30 mins."})
     assert "missing_entry_id" in out["parse_errors"]
+
+
+def test_pipeline_run_many_matches_run_per_entry() -> None:
+    pipeline = LightParsePipeline(parser_version="v1")
+    entries = [
+        {"entry_id": "e_001", "text": "2 eggs + 1 toast. Cramps started by noon"},
+        {"entry_id": "e_002", "text": 42},
+        "not an entry",
+        {"text": "chips. Stomach pain after 30 mins."},
+    ]
+
+    batch = pipeline.run_many(entries)
+
+    assert len(batch) == len(entries)
+    assert batch[0] == pipeline.run(entries[0])
+    assert "invalid_text" in batch[1]["parse_errors"]
+    assert batch[2]["parse_errors"] == ["invalid_entry"]
+    assert "missing_entry_id" in batch[3]["parse_errors"]
+
+
+def test_pipeline_instrumentation_records_stages_hits_and_slowest() -> None:
+    target: dict = {}
+    inst = Instrumentation(slowest=2, sinks=[DictSink(target)])
+    pipeline = LightParsePipeline(parser_version="v1", instrumentation=inst)
+    entries = [{"entry_id": f"e_{i}", "text": "2 eggs for breakfast. no headache at night"} for i in range(3)]
+
+    assert pipeline.run_many(entries) == LightParsePipeline(parser_version="v1").run_many(entries)
+
+    inst.emit()
+    assert target["entries"] == 3
+    assert target["stages"]["food"]["calls"] == 3
+    assert target["pattern_hits"]["food:egg"] == 3
+    assert target["pattern_hits"]["negation"] == 3
+    assert len(target["slowest"]) == 2
+
+
+def test_parsed_entry_json_matches_dict_dump() -> None:
+    pipeline = LightParsePipeline(parser_version="v1")
+    entries = [
+        {"entry_id": "é_1", "text": 'aaj lunch mein 2 plate rajma. "no" headache 4/10 ☕'},
+        {"entry_id": 7, "text": "skipped breakfast, tired by evening"},
+        {"text": "oats (1 bowl)"},
+    ]
+
+    for entry in entries:
+        record = next(pipeline.iter_records([entry]))
+        assert record.to_json() == json.dumps(pipeline.run(entry), ensure_ascii=False)
+        assert all(type(f).__slots__ for f in record.foods)
+
+
+def test_user_id_and_timestamp_pass_through() -> None:
+    pipeline = LightParsePipeline(parser_version="v1")
+
+    out = pipeline.run({"entry_id": "e1", "user_id": 42, "timestamp": "2024-05-01T08:30:00+05:30", "text": "2 eggs"})
+    assert list(out)[:3] == ["entry_id", "user_id", "timestamp"]
+    assert (out["user_id"], out["timestamp"], out["parse_errors"]) == ("42", "2024-05-01T08:30:00+05:30", [])
+    assert pipeline.run({"entry_id": "e2", "timestamp": 0, "text": "tea"})["timestamp"] == "1970-01-01T00:00:00+00:00"
+    assert pipeline.run({"entry_id": "e5", "timestamp": "2024-01-01T08:00:00Z", "text": "tea"})["timestamp"] == (
+        "2024-01-01T08:00:00+00:00"
+    )
+
+    bad = pipeline.run({"entry_id": "e3", "timestamp": "yesterday", "text": "tea"})
+    assert "timestamp" not in bad and bad["parse_errors"] == ["invalid_timestamp"]
+    assert "user_id" not in pipeline.run({"entry_id": "e4", "text": "tea"})
+
+
+def test_instrumentation_reports_food_name_cache_growth_and_merges_it() -> None:
+    inst = Instrumentation()
+    pipeline = LightParsePipeline(parser_version="v1", instrumentation=inst)
+    pipeline.run_many([{"entry_id": f"e_{i}", "text": "2 plates rajma (1 bowl), chai"} for i in range(4)])
+
+    row = inst.snapshot()["caches"]["food_names"]
+    assert row["hits"] > 0 and row["hits"] + row["misses"] >= 4
+    assert row["hit_rate"] == round(row["hits"] / (row["hits"] + row["misses"]), 4)
+
+    pipeline.run_many([{"entry_id": f"w_{i}", "text": "rajma with chai and curd"} for i in range(2)])
+    words = inst.snapshot()["caches"]["food_words"]
+    assert words["hits"] > 0
+
+    inst.reset()
+    assert inst.snapshot()["caches"]["food_names"]["hits"] == 0
+
+    parent = Instrumentation()
+    parent.merge({"caches": {"food_names": {"hits": 3, "misses": 1, "evictions": 0}}})
+    parent.merge({"caches": {"food_names": {"hits": 1, "misses": 3, "evictions": 2}}})
+    assert parent.snapshot()["caches"] == {"food_names": {"hits": 4, "misses": 4, "evictions": 2, "hit_rate": 0.5}}
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from lightparse.cli import main
+from lightparse.pipeline.light_pipeline import lexicon_fingerprint
+from lightparse.reparse import _checkpoint_path, _write_checkpoint, reparse_store
+from lightparse.store.jsonl import find_entry, read_store, upsert_entries
+
+from tests.helpers import stored_entry
+
+
+def test_reparse_only_touches_stale_entries(tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    upsert_entries(
+        store,
+        [
+            stored_entry("a", raw_text="2 eggs"),
+            stored_entry("b", raw_text="chai", lexicon_fingerprint=lexicon_fingerprint()),
+            stored_entry("c", raw_text="no headache", parser_version="v0", lexicon_fingerprint=lexicon_fingerprint()),
+        ],
+    )
+
+    report = reparse_store(store, chunk_size=1)
+
+    assert (report.scanned, report.reparsed) == (3, 2)
+    assert find_entry(store, "a").foods[0]["name"] == "egg"
+    assert find_entry(store, "b").foods == []
+    assert find_entry(store, "c").symptoms[0]["negated"] is True
+    assert not _checkpoint_path(store).exists()
+    assert reparse_store(store).reparsed == 0
+
+
+def test_reparse_resumes_from_checkpoint_with_workers(tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    upsert_entries(store, [stored_entry(f"e_{i}", raw_text="poha") for i in range(6)])
+    _write_checkpoint(store, "e_2", "v1", lexicon_fingerprint())
+
+    assert main(["reparse", "--store", str(store), "--workers", "2", "--chunk-size", "2"]) == 0
+
+    reparsed = [e.entry_id for e in read_store(store) if e.foods]
+    assert reparsed == ["e_3", "e_4", "e_5"]
@@ -0,0 +1,129 @@
+import sqlite3
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from lightparse.store import EntryFilter, StoredEntry, jsonl, sqlite
+
+from tests.helpers import stored_entry
+
+
+def _entry(entry_id: str, food: str, meal: str, symptom: str, negated: bool = False) -> StoredEntry:
+    return stored_entry(
+        entry_id,
+        [
+            {"name": food, "quantity": "2", "unit": None, "meal": meal, "confidence": 0.8},
+            {"name": "chai", "quantity": None, "unit": "cup", "meal": "breakfast", "confidence": 0.7},
+        ],
+        [{"name": symptom, "severity": 6, "time_hint": "after_meal", "negated": negated, "confidence": 0.85}],
+        raw_text=f"{food} at {meal}",
+        lexicon_fingerprint="abc",
+    )
+
+
+_ENTRIES = [
+    _entry("a", "paneer", "dinner", "bloating"),
+    _entry("b", "paneer", "lunch", "headache"),
+    _entry("c", "rice", "dinner", "bloating", negated=True),
+    _entry("d", "paneer", "dinner", "nausea"),
+    _entry("e", "paneer", "dinner", "bloating"),
+]
+
+
+def test_sqlite_store_round_trips_and_upserts(tmp_path: Path) -> None:
+    db = tmp_path / "store.sqlite3"
+    sqlite.upsert_entries(db, _ENTRIES)
+    assert sqlite.read_store(db) == _ENTRIES
+
+    updated = _entry("b", "dal", "dinner", "fatigue")
+    sqlite.upsert_entries(db, [_entry("b", "rice", "snack", "cramp"), updated])
+    assert sqlite.find_entry(db, "b") == updated
+    assert sqlite.find_entry(db, "zzz") is None
+    assert [e.entry_id for e in sqlite.iter_entries(db, after="b", batch_size=2)] == ["c", "d", "e"]
+    assert sqlite.store_stats(db) == {"total": 5, "food_count": 5, "symptom_count": 5, "negated": 1}
+
+
+def test_write_store_failure_keeps_old_contents(tmp_path: Path) -> None:
+    db = tmp_path / "store.sqlite3"
+    sqlite.upsert_entries(db, _ENTRIES)
+
+    broken = replace(_entry("z", "dal", "lunch", "gas"), parse_errors=[object()])
+    with pytest.raises(TypeError):
+        sqlite.write_store(db, [_entry("y", "dal", "lunch", "gas"), broken])
+
+    assert sqlite.read_store(db) == _ENTRIES
+
+
+@pytest.mark.parametrize(
+    "filters, expected",
+    [
+        (EntryFilter(food="paneer", meal="dinner"), ["a", "d", "e"]),
+        (EntryFilter(symptom="bloating"), ["a", "c", "e"]),
+        (EntryFilter(symptom="bloating", negated=False), ["a", "e"]),
+        (EntryFilter(negated=True), ["c"]),
+        (EntryFilter(food="paneer", symptom="bloating"), ["a", "e"]),
+        (EntryFilter(food="chai", meal="dinner"), []),
+    ],
+)
+def test_filtered_pages_match_across_backends(tmp_path: Path, filters: EntryFilter, expected: list[str]) -> None:
+    jsonl_path, db = tmp_path / "store.jsonl", tmp_path / "store.sqlite3"
+    jsonl.upsert_entries(jsonl_path, _ENTRIES)
+    sqlite.upsert_entries(db, _ENTRIES)
+
+    for backend, path in ((jsonl, jsonl_path), (sqlite, db)):
+        seen: list[str] = []
+        page = backend.list_page(path, limit=2, filters=filters)
+        seen += [e.entry_id for e in page.entries]
+        while page.next_token:
+            page = backend.list_page(path, after=page.next_token, limit=2, filters=filters)
+            seen += [e.entry_id for e in page.entries]
+        assert seen == expected, backend.__name__
+
+        if len(expected) > 2:
+            back = backend.list_page(path, before=page.prev_token, limit=2, filters=filters)
+            assert [e.entry_id for e in back.entries] == expected[:2]
+
+
+def test_migrate_from_jsonl(tmp_path: Path) -> None:
+    jsonl_path, db = tmp_path / "store.jsonl", tmp_path / "store.sqlite3"
+    jsonl.upsert_entries(jsonl_path, _ENTRIES)
+    jsonl.upsert_entries(jsonl_path, [_entry("a", "poha", "breakfast", "headache")])
+
+    assert sqlite.migrate_jsonl(jsonl_path, db, batch_size=2) == 5
+    assert sqlite.read_store(db) == jsonl.read_store(jsonl_path)
+    assert sqlite.store_stats(db) == jsonl.store_stats(jsonl_path)
+
+
+@pytest.mark.django_db
+def test_dashboard_filters_on_sqlite_backend(client, settings, tmp_path: Path) -> None:
+    db = tmp_path / "store.sqlite3"
+    settings.LIGHTPARSE_STORE_BACKEND = "sqlite"
+    settings.LIGHTPARSE_STORE_PATH = str(db)
+    settings.LIGHTPARSE_PAGE_SIZE = 1
+    sqlite.upsert_entries(db, _ENTRIES)
+
+    response = client.get("/dashboard/", {"food": "Paneer", "meal": "dinner"})
+    assert [e.entry_id for e in response.context["entries"]] == ["a"]
+    assert "&amp;food=Paneer&amp;meal=dinner" in response.content.decode()
+    assert client.get("/entry/c/").context["entry"]["symptoms"][0]["negated"] is True
+
+
+def test_version_1_store_is_upgraded_in_place(tmp_path: Path) -> None:
+    db = tmp_path / "store.sqlite3"
+    sqlite.upsert_entries(db, _ENTRIES)
+    conn = sqlite3.connect(db)
+    conn.executescript(
+        """
+        DROP INDEX entries_user_timestamp;
+        ALTER TABLE entries DROP COLUMN user_id;
+        ALTER TABLE entries DROP COLUMN timestamp;
+        PRAGMA user_version = 1;
+        """
+    )
+    conn.close()
+
+    assert sqlite.read_store(db) == _ENTRIES
+    stamped = replace(_ENTRIES[0], user_id="u1", timestamp="2024-05-01T08:30:00+05:30")
+    sqlite.upsert_entries(db, [stamped])
+    assert sqlite.find_entry(db, "a") == stamped
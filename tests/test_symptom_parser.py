@@ -35,3 +35,19 @@ def test_symptom_parser_hinglish_time_hint_raat() -> None:
 def test_symptom_parser_ignores_emotions() -> None:
     symptoms = SymptomParser.parse("Mood a bit low. Anxiety spiked later.")
     assert symptoms == []
+
+
+def test_symptom_parser_negation_is_scoped_to_its_span() -> None:
+    symptoms = SymptomParser.parse("Had cramps but no headache. Avocado toast, no sugar. Nausea in the morning.")
+    assert any(s["name"] == "cramps" and s["negated"] is False for s in symptoms)
+    assert any(s["name"] == "headache" and s["negated"] is True for s in symptoms)
+    assert any(s["name"] == "nausea" and s["negated"] is False for s in symptoms)
+
+
+def test_symptom_parser_time_hint_resolved_per_clause() -> None:
+    symptoms = SymptomParser.parse("Headache in the morning. Cramps 7/10 at night. Felt tired")
+    by_name = {s["name"]: s for s in symptoms}
+    assert by_name["headache"]["time_hint"] == "morning"
+    assert by_name["cramps"]["time_hint"] == "night"
+    assert by_name["cramps"]["severity"] == 7
+    assert by_name["fatigue"]["time_hint"] == "morning"
@@ -0,0 +1,16 @@
+from lightparse.utils.text import Document, join_tokens
+
+
+def test_document_tokens_keep_offsets_and_spacing() -> None:
+    doc = Document.from_text("Paneer salad (1 bowl).\nNo  headache")
+
+    values = [t.value for t in doc.tokens]
+    assert values[:7] == ["paneer", "salad", "(", "1", "bowl", ")", "."]
+    assert all(doc.lowered[t.start : t.end] == t.value for t in doc.tokens)
+    assert join_tokens(doc.tokens[:7]) == "paneer salad (1 bowl)."
+
+
+def test_document_fragments_split_on_separators() -> None:
+    doc = Document.from_text("dal chawal + dahi, chai and 2 cookies\nsalad")
+
+    assert [join_tokens(f) for f in doc.fragments] == ["dal chawal", "dahi", "chai", "2 cookies", "salad"]
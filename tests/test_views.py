@@ -0,0 +1,40 @@
+from pathlib import Path
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from lightparse.store.jsonl import find_entry, store_stats
+from ui.views import _iter_upload_lines
+
+
+class _ChunkedUpload:
+    def __init__(self, chunks: list[bytes]) -> None:
+        self._chunks = chunks
+
+    def chunks(self):
+        return iter(self._chunks)
+
+
+def test_upload_lines_survive_chunk_boundaries() -> None:
+    data = '{"entry_id": "a", "text": "chai ☕"}\n{"entry_id": "b", "text": "poha"}'.encode("utf-8")
+    split = data.index("☕".encode("utf-8")) + 1
+    lines = list(_iter_upload_lines(_ChunkedUpload([data[:split], data[split:]])))
+    assert lines == ['{"entry_id": "a", "text": "chai ☕"}', '{"entry_id": "b", "text": "poha"}']
+
+
+@pytest.mark.django_db
+def test_upload_streams_in_batches_and_counts_rejects(client, settings, tmp_path: Path) -> None:
+    store = tmp_path / "store.jsonl"
+    settings.LIGHTPARSE_STORE_PATH = str(store)
+    settings.LIGHTPARSE_UPLOAD_BATCH_SIZE = 2
+
+    lines = [f'{{"entry_id": "e_{i}", "text": "2 eggs. no headache"}}' for i in range(5)]
+    lines[2:2] = ["not json", "[1, 2]", '{"text": "no id"}']
+    upload = SimpleUploadedFile("entries.jsonl", "\n".join(lines).encode("utf-8"))
+
+    response = client.post("/upload/", {"file": upload}, follow=True)
+
+    assert response.status_code == 200
+    assert "Parsed 5 entries, rejected 3 invalid lines" in response.content.decode()
+    assert store_stats(store)["total"] == 5
+    assert find_entry(store, "e_4").foods[0]["name"] == "egg"